@@ -1,9 +1,10 @@
 from app import create_app
-import logging
+from app.startup import configure_logging
+from config import Config
 
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging; records are written by a background thread unless LOG_QUEUE_ENABLED is False
+configure_logging(level=getattr(Config, 'LOG_LEVEL', 'INFO'), queued=getattr(Config, 'LOG_QUEUE_ENABLED', True))
 
 
 app = create_app()
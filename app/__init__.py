@@ -1,6 +1,12 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import OperationalError
 from config import Config
+from . import migrations
+from .sqlite_profile import configure_engine_options, get_pragmas, register_pragmas
+from .templating import configure_templates, precompile_templates
+from .startup import LazyProxy, SchemaInitializer
+import importlib
 import os
 
 db = SQLAlchemy()
@@ -8,35 +14,137 @@ db = SQLAlchemy()
 def init_db(app):
     """
     Initialize the database and create the database file if it doesn't exist.
+    Pending schema migrations are then applied unless AUTO_MIGRATE is False.
+
+    With AUTO_MIGRATE, a database already at the latest schema version is
+    recognized from its ``user_version`` with a single PRAGMA read. Otherwise
+    the migrations are applied while holding SQLite's write lock, so processes
+    starting together initialize it only once; a new database is built by the
+    same migrations, starting from the original tables.
 
     :param app: The Flask application instance
     """
     db_path = os.path.join(app.config['SQLALCHEMY_DATABASE_URI'].replace('sqlite:///', ''))
     db_dir = os.path.dirname(db_path)
-    if not os.path.exists(db_path):
-        os.makedirs(db_dir, exist_ok=True)  # Ensure the directory exists
-        with app.app_context():
+    with app.app_context():
+        if app.config.get('AUTO_MIGRATE', True):
+            try:
+                current = migrations.is_current(db.engine)
+            except OperationalError:
+                os.makedirs(db_dir, exist_ok=True)  # SQLite cannot create the file in a missing directory
+                current = False
+            if not current:
+                migrations.upgrade(db.engine)
+            return
+
+        if not os.path.exists(db_path):
+            os.makedirs(db_dir, exist_ok=True)  # Ensure the directory exists
             db.create_all()
             print('Database file created successfully')
 
-def create_app():
+def create_app(config_overrides=None):
     """
     Factory function to create and configure the Flask application.
 
+    :param config_overrides: Optional dictionary of settings applied over Config,
+        e.g. to point benchmarks at a scratch database.
     :return: Configured Flask application instance.
     """
     app = Flask(__name__, static_folder='../static')  # Set the static folder
     app.config.from_object(Config)
+    app.config.update(config_overrides or {})
+    configure_templates(app)  # Bytecode cache, set before the Jinja environment is built
+    configure_engine_options(app)  # Explicit connection pool for the SQLite file
 
     db.init_app(app)
 
     with app.app_context():
+        # WAL journaling and tuned pragmas on every new connection
+        if app.config.get('SQLITE_PROFILE_ENABLED', True):
+            register_pragmas(db.engine, get_pragmas(app))
+
         # Import models and data manager
-        from .data_manager.sqlite_data_manager import User, Movie, SQLiteDataManager
-        init_db(app)  # Ensure database file is created if it doesn't exist
-        app.data_manager = SQLiteDataManager()
+        from .data_manager.sqlite_data_manager import User, Movie, Title, SQLiteDataManager
+
+        # Create the schema now, or on the first request in fast startup mode
+        fast_startup = app.config.get('FAST_STARTUP', False)
+        app.schema = SchemaInitializer(app, init_db)
+        if app.config.get('DEFERRED_DB_INIT', fast_startup):
+            app.before_request(app.schema.ensure)
+        else:
+            app.schema.ensure()
+        data_manager = SQLiteDataManager()
+        if app.config.get('DATA_CACHE_ENABLED', False):
+            from .data_manager.caching_data_manager import CachingDataManager
+            data_manager = CachingDataManager(
+                data_manager,
+                maxsize=app.config.get('DATA_CACHE_SIZE', 2048),
+                ttl=app.config.get('DATA_CACHE_TTL', 30),
+                backend=app.config.get('DATA_CACHE_BACKEND')
+            )
+        app.data_manager = data_manager
+
+        # Committed writes are published here, for the dashboard event stream
+        from .events import EventBroker
+        app.event_broker = EventBroker.from_config(app)
+
+        # Per-request SQL, template and OMDb timings, exposed as Server-Timing and /metrics
+        instrumentation = None
+        if app.config.get('INSTRUMENTATION_ENABLED', True):
+            from .instrumentation import Instrumentation
+            instrumentation = app.instrumentation = Instrumentation.from_config(app)
+            instrumentation.install(app, db.engine)
 
-        # Import routes
+        # OMDb client with its persistent lookup cache, built on first use in fast startup mode
+        def build_omdb_client():
+            from .omdb.cache import OMDbCacheStore
+            from .omdb.client import OMDbClient
+            omdb_client = OMDbClient.from_config(app, store=OMDbCacheStore(db.engine))
+            if instrumentation is not None:
+                instrumentation.watch_omdb(omdb_client)
+            return omdb_client
+
+        if app.config.get('OMDB_CLIENT_LAZY', fast_startup):
+            app.omdb_client = LazyProxy(build_omdb_client)
+        else:
+            app.omdb_client = build_omdb_client()
+
+        # Rendered movie grids and user lists, keyed on the data versions they show
+        if app.config.get('FRAGMENT_CACHE_ENABLED', True):
+            from .fragments import FragmentCache
+            app.fragment_cache = FragmentCache.from_config(app)
+
+        # Background OMDb enrichment for movies added in async mode
+        if app.config.get('OMDB_ENRICHMENT_MODE', 'sync') == 'async':
+            from .enrichment import EnrichmentWorker
+            app.enrichment_worker = EnrichmentWorker.from_config(app)
+            if app.config.get('ENRICHMENT_WORKERS_AUTOSTART', True):
+                app.enrichment_worker.start()
+
+        # Similar users and movie recommendations, refreshed in the background after writes
+        if app.config.get('RECOMMENDATIONS_ENABLED', True):
+            from .recommendations import RecommendationRefresher
+            app.recommendation_refresher = RecommendationRefresher.from_config(app)
+            if app.config.get('RECOMMENDATIONS_AUTOSTART', False):
+                app.recommendation_refresher.start()
+
+        # Import routes. They register themselves on current_app when the module
+        # is executed, so another app created in the same process (benchmarks,
+        # tests) needs the module to run again.
         from . import routes
+        if 'home' not in app.view_functions:
+            importlib.reload(routes)
+
+        # Compile every template now rather than on the first requests
+        if app.config.get('PRECOMPILE_TEMPLATES', True):
+            precompile_templates(app)
+
+        # Register CLI commands
+        from .cli import import_movies_command, schema_cli, stats_cli, enrichment_cli, recommendations_cli
+        app.cli.add_command(import_movies_command)
+        app.cli.add_command(schema_cli)
+        app.cli.add_command(stats_cli)
+        app.cli.add_command(enrichment_cli)
+        app.cli.add_command(recommendations_cli)
 
     return app
@@ -0,0 +1,158 @@
+USER_FIELDS = ('id', 'name', 'movie_count')
+MOVIE_FIELDS = ('id', 'user_id', 'name', 'director', 'year', 'rating', 'enrichment_status')
+MAX_BATCH_SIZE = 1000
+
+
+class ValidationError(ValueError):
+    """
+    Raised when a request body or parameter is invalid; the message is sent to the client.
+    """
+    pass
+
+
+def parse_fields(value, allowed):
+    """
+    Parse a ``fields`` query parameter into the attributes to return.
+
+    :param value: The comma-separated parameter value, or None for all fields.
+    :param allowed: The fields the resource has, in output order.
+    :return: A tuple of field names.
+    :raises ValidationError: If an unknown field is requested.
+    """
+    if not value:
+        return tuple(allowed)
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValidationError(f"Unknown fields: {', '.join(unknown)}; use any of: {', '.join(allowed)}")
+    return fields
+
+
+def project(obj, fields):
+    """
+    Build the JSON representation of an object restricted to some fields.
+
+    :param obj: A model instance or record.
+    :param fields: The attributes to include.
+    :return: A dictionary.
+    """
+    return {field: getattr(obj, field) for field in fields}
+
+
+def recent_movies_payload(movies):
+    """
+    Build the JSON representation of the recent movies, as /api/recent_movies returns it.
+
+    :param movies: The movie records, newest first.
+    :return: A list of dictionaries.
+    """
+    return [{'name': movie.name, 'director': movie.director, 'year': movie.year} for movie in movies]
+
+
+def statistics_payload(statistics):
+    """
+    Build the JSON representation of the statistics, as /api/user_statistics returns it.
+
+    :param statistics: The dictionary returned by the data manager's get_statistics.
+    :return: A dictionary with total_users, total_movies and recent_activity.
+    """
+    return {
+        'total_users': statistics['total_users'],
+        'total_movies': statistics['total_movies'],
+        'recent_activity': statistics['movies_in_year']
+    }
+
+
+def dashboard_payload(dashboard):
+    """
+    Build the JSON representation of the dashboard.
+
+    The two parts are the bodies of /api/recent_movies and /api/user_statistics.
+
+    :param dashboard: The dictionary returned by the data manager's get_dashboard.
+    :return: A dictionary with 'recent_movies' and 'statistics'.
+    """
+    return {
+        'recent_movies': recent_movies_payload(dashboard['recent_movies']),
+        'statistics': statistics_payload(dashboard['statistics'])
+    }
+
+
+def validate_movie(data, partial=False):
+    """
+    Validate and normalize the fields of a movie from a JSON body.
+
+    :param data: The decoded JSON object.
+    :param partial: Whether fields may be omitted, as in PATCH.
+    :return: A dictionary with the valid name, director, year and rating given.
+    :raises ValidationError: If a field is missing or has the wrong type.
+    """
+    if not isinstance(data, dict):
+        raise ValidationError("A movie must be a JSON object")
+
+    movie = {}
+    for field in ('name', 'director'):
+        if field in data:
+            if not isinstance(data[field], str) or not data[field].strip():
+                raise ValidationError(f"'{field}' must be a non-empty string")
+            movie[field] = data[field].strip()
+    if 'year' in data:
+        if isinstance(data['year'], bool) or not isinstance(data['year'], int):
+            raise ValidationError("'year' must be an integer")
+        movie['year'] = data['year']
+    if 'rating' in data:
+        if isinstance(data['rating'], bool) or not isinstance(data['rating'], (int, float)):
+            raise ValidationError("'rating' must be a number")
+        movie['rating'] = float(data['rating'])
+
+    if not partial:
+        missing = [field for field in ('name', 'director', 'year', 'rating') if field not in movie]
+        if missing:
+            raise ValidationError(f"Missing fields: {', '.join(missing)}")
+    elif not movie:
+        raise ValidationError("Nothing to update; send any of name, director, year and rating")
+    return movie
+
+
+def validate_batch(data):
+    """
+    Validate a batch of movie operations.
+
+    :param data: The decoded JSON object with optional "create", "update" and "delete" lists.
+    :return: A tuple of (create, update, delete) lists ready for apply_movie_changes.
+    :raises ValidationError: If the batch is malformed or too large.
+    """
+    if not isinstance(data, dict):
+        raise ValidationError("The batch must be a JSON object")
+    create = data.get('create', [])
+    update = data.get('update', [])
+    delete = data.get('delete', [])
+    if not all(isinstance(items, list) for items in (create, update, delete)):
+        raise ValidationError("'create', 'update' and 'delete' must be lists")
+    if len(create) + len(update) + len(delete) > MAX_BATCH_SIZE:
+        raise ValidationError(f"A batch can hold at most {MAX_BATCH_SIZE} operations")
+
+    def movie_id(value, where):
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValidationError(f"{where}: 'id' must be an integer")
+        return value
+
+    validated_create = []
+    for index, movie in enumerate(create):
+        try:
+            validated_create.append(validate_movie(movie))
+        except ValidationError as e:
+            raise ValidationError(f"create #{index}: {e}") from e
+    validated_update = []
+    for index, movie in enumerate(update):
+        try:
+            fields = validate_movie(movie, partial=True)
+        except ValidationError as e:
+            raise ValidationError(f"update #{index}: {e}") from e
+        validated_update.append(dict(fields, id=movie_id(movie.get('id'), f"update #{index}")))
+    validated_delete = [movie_id(value, f"delete #{index}") for index, value in enumerate(delete)]
+
+    ids = [movie['id'] for movie in validated_update] + validated_delete
+    if len(ids) != len(set(ids)):
+        raise ValidationError("A movie can only appear once in 'update' and 'delete'")
+    return validated_create, validated_update, validated_delete
@@ -0,0 +1,487 @@
+import asyncio
+import json
+from collections import Counter
+from datetime import datetime
+from email.utils import formatdate, parsedate_to_datetime
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from sqlalchemy.exc import SQLAlchemyError
+from .api import dashboard_payload, recent_movies_payload, statistics_payload
+from .data_manager.async_sqlite_data_manager import AsyncSQLiteDataManager
+from .data_manager.sqlite_data_manager import year_statistic
+from .events import OVERFLOW
+from .http_cache import cache_control, validators
+
+# Sent to a stream client's queue when the feed stops
+CLOSED = object()
+
+
+def json_body(payload):
+    """
+    Serialize a payload the way Flask's jsonify does.
+
+    :param payload: A JSON-serializable value.
+    :return: The encoded response body.
+    """
+    return (json.dumps(payload, sort_keys=True, separators=(',', ':')) + '\n').encode()
+
+
+def etag_matches(header, etag):
+    """
+    Check an If-None-Match header against an ETag, using weak comparison.
+
+    :param header: The raw If-None-Match header value.
+    :param etag: The unquoted ETag of the current representation.
+    :return: True if any listed tag (or '*') matches.
+    """
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag == '*' or tag.removeprefix('W/').strip('"') == etag:
+            return True
+    return False
+
+
+def not_modified_since(header, last_modified):
+    """
+    Check an If-Modified-Since header against a Last-Modified time.
+
+    :param header: The raw If-Modified-Since header value.
+    :param last_modified: Epoch second of the newest write, or None.
+    :return: True if the client's copy is still current.
+    """
+    if last_modified is None:
+        return False
+    try:
+        return last_modified <= parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def sse_message(event, payload):
+    """
+    Encode a Server-Sent Events message.
+
+    :param event: The event name, e.g. 'snapshot'.
+    :param payload: A JSON-serializable value, sent as the message data.
+    :return: The encoded message.
+    """
+    return f"event: {event}\ndata: {json.dumps(payload, sort_keys=True, separators=(',', ':'))}\n\n".encode()
+
+
+class DashboardFeed:
+    """
+    Pushes dashboard changes to Server-Sent Events clients.
+
+    A single subscription to the EventBroker serves every client. Each
+    change is turned into one 'delta' message holding the parts of the
+    dashboard it touched, read again in one statement: the statistics when
+    a count changed, the recent movies when movies changed. The values are
+    absolute, so a client whose snapshot already includes a change it is
+    later sent counts it once. Changes arriving while a message is prepared
+    are folded into the next one, and the encoded message is put on every
+    client's queue. A client is a coroutine awaiting its queue, so an idle
+    dashboard costs a queue and a socket, not a thread.
+    """
+
+    def __init__(self, broker, data_manager, logger, queue_size=16):
+        """
+        Initialize the feed.
+
+        :param broker: The EventBroker the data manager publishes to.
+        :param data_manager: The async data manager.
+        :param logger: The logger for errors.
+        :param queue_size: The number of unsent messages kept per client before
+            its backlog is replaced with a fresh snapshot.
+        """
+        self.broker = broker
+        self.data_manager = data_manager
+        self.logger = logger
+        self.queue_size = queue_size
+        self._clients = set()
+        self._subscription = None
+        self._task = None
+
+    @property
+    def client_count(self):
+        """
+        The number of connected clients.
+        """
+        return len(self._clients)
+
+    def start(self):
+        """
+        Subscribe to the broker, unless already done. Runs on the event loop.
+        """
+        if self._task is None:
+            self._subscription = self.broker.subscribe()
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """
+        Unsubscribe from the broker and end every client's stream.
+        """
+        if self._task is None:
+            return
+        self._subscription.close()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = self._subscription = None
+        for queue in self._clients:
+            self.offer(queue, CLOSED)
+
+    def connect(self):
+        """
+        Register a client.
+
+        :return: The asyncio.Queue the client's messages are put on.
+        """
+        queue = asyncio.Queue(self.queue_size)
+        self._clients.add(queue)
+        return queue
+
+    def disconnect(self, queue):
+        """
+        Unregister a client.
+
+        :param queue: The queue returned by connect.
+        """
+        self._clients.discard(queue)
+
+    @staticmethod
+    def offer(queue, message):
+        """
+        Put a message on a client's queue without waiting.
+
+        A client too slow to keep up has its backlog replaced with OVERFLOW,
+        which makes its stream send a fresh snapshot instead.
+
+        :param queue: The client's queue.
+        :param message: The encoded message, OVERFLOW or CLOSED.
+        """
+        if queue.full():
+            while not queue.empty():
+                queue.get_nowait()
+            if message is not CLOSED:
+                message = OVERFLOW
+        queue.put_nowait(message)
+
+    async def run(self):
+        """
+        Turn published changes into messages for every client, until cancelled.
+        """
+        while True:
+            changes = [await self._subscription.get()]
+            changes.extend(self._subscription.drain())
+            try:
+                message = await self.message(changes)
+            except Exception as e:
+                self.logger.error(f"Dashboard feed error: {e}")
+                message = None
+            if message is not None:
+                for queue in list(self._clients):
+                    self.offer(queue, message)
+
+    async def message(self, changes):
+        """
+        Build the message describing some changes.
+
+        :param changes: Events published by the data manager, possibly OVERFLOW.
+        :return: The encoded 'delta' message, a 'snapshot' message if events
+            were dropped, or None if nothing on the dashboard changed.
+        """
+        if OVERFLOW in changes:
+            return await self.snapshot()
+        deltas, scopes = Counter(), set()
+        for change in changes:
+            deltas.update(change['statistics'])
+            scopes.update(change['scopes'])
+
+        year = datetime.utcnow().year
+        counted = any(deltas[name] for name in ('total_users', 'total_movies', year_statistic(year)))
+        payload = {}
+        if counted and 'movies' in scopes:
+            payload = dashboard_payload(await self.data_manager.get_dashboard(year, 3))
+        elif counted:
+            payload['statistics'] = statistics_payload(await self.data_manager.get_statistics(year))
+        elif 'movies' in scopes:
+            payload['recent_movies'] = recent_movies_payload(await self.data_manager.get_recent_movies(3))
+        return sse_message('delta', payload) if payload else None
+
+    async def snapshot(self):
+        """
+        Build a message with the whole dashboard, as /api/dashboard returns it.
+
+        :return: The encoded 'snapshot' message.
+        """
+        dashboard = await self.data_manager.get_dashboard(datetime.utcnow().year, 3)
+        return sse_message('snapshot', dashboard_payload(dashboard))
+
+
+class AsyncApi:
+    """
+    ASGI application serving the dashboard's read-only JSON endpoints.
+
+    ``/api/recent_movies``, ``/api/user_statistics`` and ``/api/dashboard``
+    are answered on the event loop through AsyncSQLiteDataManager, so many
+    concurrent pollers share one thread instead of holding one worker thread
+    each. Responses, ETags and 304s are the same as the Flask views produce.
+    ``/api/dashboard/events`` streams dashboard changes through a
+    DashboardFeed. Every other request is handed to the Flask application,
+    each in its own thread.
+    """
+
+    def __init__(self, flask_app, data_manager=None):
+        """
+        Initialize the ASGI application.
+
+        :param flask_app: The Flask application serving everything else.
+        :param data_manager: The async data manager; built from the Flask
+            configuration if omitted.
+        """
+        self.flask_app = flask_app
+        self.config = flask_app.config
+        self.logger = flask_app.logger
+        self.data_manager = data_manager or AsyncSQLiteDataManager.from_config(flask_app)
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.routes = {
+            '/api/recent_movies': ('recent_movies', self.recent_movies),
+            '/api/user_statistics': ('user_statistics', self.user_statistics),
+            '/api/dashboard': ('dashboard', self.dashboard)
+        }
+        self.feed = DashboardFeed(flask_app.event_broker, self.data_manager, self.logger,
+                                  queue_size=self.config.get('DASHBOARD_STREAM_QUEUE_SIZE', 16))
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+
+        if scope['type'] == 'http' and scope.get('path') == '/api/dashboard/events' and scope['method'] == 'GET':
+            await self.stream(receive, send)
+            return
+
+        route = self.routes.get(scope.get('path')) if scope['type'] == 'http' else None
+        if route is None or scope['method'] not in ('GET', 'HEAD'):
+            # A context per request gives each Flask request its own thread
+            async with ThreadSensitiveContext():
+                await self.wsgi(scope, receive, send)
+            return
+
+        endpoint, handler = route
+        await self.respond(scope, send, endpoint, handler)
+
+    async def lifespan(self, receive, send):
+        """
+        Handle the server's startup and shutdown messages.
+
+        :param receive: The ASGI receive callable.
+        :param send: The ASGI send callable.
+        """
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # The async handlers bypass Flask, so a deferred schema initialization runs here
+                await asyncio.to_thread(self.flask_app.schema.ensure)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.feed.stop()
+                await self.data_manager.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def respond(self, scope, send, endpoint, handler):
+        """
+        Answer a request with a conditional GET check, then the handler.
+
+        :param scope: The ASGI connection scope.
+        :param send: The ASGI send callable.
+        :param endpoint: The name of the matching Flask endpoint, used in the ETag.
+        :param handler: Coroutine function returning (status, payload).
+        """
+        headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+        response_headers = []
+        status = None
+
+        if self.config.get('HTTP_CACHE_ENABLED', True):
+            try:
+                versions = await self.data_manager.get_data_versions(self.scopes(endpoint))
+            except SQLAlchemyError:
+                versions = None
+            if versions is not None:
+                etag, last_modified = validators(endpoint, scope.get('query_string', b'').decode(), versions)
+                response_headers.append((b'etag', f'"{etag}"'.encode()))
+                if last_modified is not None:
+                    response_headers.append((b'last-modified', formatdate(last_modified, usegmt=True).encode()))
+                response_headers.append(
+                    (b'cache-control', cache_control(self.config.get('HTTP_CACHE_MAX_AGE', 0)).encode())
+                )
+                if 'if-none-match' in headers:
+                    if etag_matches(headers['if-none-match'], etag):
+                        status = 304
+                elif 'if-modified-since' in headers and not_modified_since(headers['if-modified-since'], last_modified):
+                    status = 304
+
+        body = b''
+        if status is None:
+            status, payload = await handler()
+            body = json_body(payload)
+            if status != 200:
+                response_headers = []
+            response_headers.append((b'content-type', b'application/json'))
+            response_headers.append((b'content-length', str(len(body)).encode()))
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
+
+    async def stream(self, receive, send):
+        """
+        Stream dashboard changes as Server-Sent Events.
+
+        The stream opens with a 'snapshot' event holding the whole dashboard,
+        then sends a 'delta' event per change: the current statistics when a
+        count changed, and the recent movies when they may have changed. A comment line is
+        sent every DASHBOARD_STREAM_KEEPALIVE seconds so proxies keep an idle
+        connection open. A browser's EventSource reconnects by itself and
+        gets a new snapshot.
+
+        :param receive: The ASGI receive callable.
+        :param send: The ASGI send callable.
+        """
+        self.feed.start()
+        queue = self.feed.connect()
+        disconnected = asyncio.create_task(self.wait_disconnect(receive))
+        message = None
+        try:
+            try:
+                message = await self.feed.snapshot()
+            except SQLAlchemyError as e:
+                self.logger.error(f"Database error occurred while opening the dashboard stream: {e}")
+                body = json_body({'error': 'Database error occurred while opening the dashboard stream'})
+                await send({'type': 'http.response.start', 'status': 500,
+                            'headers': [(b'content-type', b'application/json'),
+                                        (b'content-length', str(len(body)).encode())]})
+                await send({'type': 'http.response.body', 'body': body})
+                return
+
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no')  # Keep nginx from buffering the stream
+            ]})
+            retry = int(self.config.get('DASHBOARD_STREAM_RETRY', 5.0) * 1000)
+            await send({'type': 'http.response.body', 'body': f"retry: {retry}\n".encode() + message,
+                        'more_body': True})
+
+            keepalive = self.config.get('DASHBOARD_STREAM_KEEPALIVE', 15.0)
+            message = asyncio.ensure_future(queue.get())
+            while True:
+                done, _ = await asyncio.wait({message, disconnected}, timeout=keepalive,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if disconnected in done:
+                    return
+                if message not in done:
+                    body = b': keepalive\n\n'
+                else:
+                    body = message.result()
+                    message = asyncio.ensure_future(queue.get())
+                    if body is CLOSED:
+                        break
+                    if body is OVERFLOW:
+                        body = await self.feed.snapshot()
+                await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        except OSError:
+            pass  # The client went away while a message was sent
+        finally:
+            self.feed.disconnect(queue)
+            disconnected.cancel()
+            if isinstance(message, asyncio.Future):
+                message.cancel()
+
+    @staticmethod
+    async def wait_disconnect(receive):
+        """
+        Wait until the client closes the connection.
+
+        :param receive: The ASGI receive callable.
+        """
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    @staticmethod
+    def scopes(endpoint):
+        """
+        Name the data scopes an endpoint's response depends on.
+
+        :param endpoint: The endpoint name.
+        :return: A list of scope names.
+        """
+        return ['movies'] if endpoint == 'recent_movies' else ['users', 'movies']
+
+    async def recent_movies(self):
+        """
+        Get the three most recently added movies.
+
+        :return: A (status, payload) tuple.
+        """
+        try:
+            movies = await self.data_manager.get_recent_movies(3)
+            return 200, [{
+                'name': movie.name,
+                'director': movie.director,
+                'year': movie.year
+            } for movie in movies]
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error occurred while fetching recent movies: {e}")
+            return 500, {'error': 'Database error occurred while fetching recent movies'}
+        except Exception as e:
+            self.logger.error(f"Unexpected error occurred while fetching recent movies: {e}")
+            return 500, {'error': 'An unexpected error occurred while fetching recent movies'}
+
+    async def user_statistics(self):
+        """
+        Get the dashboard statistics from the precomputed counters.
+
+        :return: A (status, payload) tuple.
+        """
+        try:
+            statistics = await self.data_manager.get_statistics(datetime.utcnow().year)
+            return 200, statistics_payload(statistics)
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error occurred while fetching user statistics: {e}")
+            return 500, {'error': 'Database error occurred while fetching user statistics'}
+        except Exception as e:
+            self.logger.error(f"Unexpected error occurred while fetching user statistics: {e}")
+            return 500, {'error': 'An unexpected error occurred while fetching user statistics'}
+
+    async def dashboard(self):
+        """
+        Get the recent movies and user statistics from one snapshot.
+
+        :return: A (status, payload) tuple.
+        """
+        try:
+            dashboard = await self.data_manager.get_dashboard(datetime.utcnow().year, 3)
+            return 200, dashboard_payload(dashboard)
+        except SQLAlchemyError as e:
+            self.logger.error(f"Database error occurred while fetching the dashboard: {e}")
+            return 500, {'error': 'Database error occurred while fetching the dashboard'}
+        except Exception as e:
+            self.logger.error(f"Unexpected error occurred while fetching the dashboard: {e}")
+            return 500, {'error': 'An unexpected error occurred while fetching the dashboard'}
+
+
+def create_asgi_app(flask_app=None):
+    """
+    Factory function to create the ASGI application.
+
+    :param flask_app: The Flask application; created with create_app if omitted.
+    :return: An AsyncApi instance to run with an ASGI server such as uvicorn.
+    """
+    if flask_app is None:
+        from app import create_app
+        flask_app = create_app()
+    return AsyncApi(flask_app)
@@ -0,0 +1,181 @@
+import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from app.omdb.client import OMDbError, movie_details
+
+FORMATS = ('csv', 'jsonl')
+MOVIE_FIELDS = ('name', 'director', 'year', 'rating')
+
+
+def detect_format(filename=None, content_type=None):
+    """
+    Guess the import format from a file name or a content type.
+
+    :param filename: The name of the uploaded or local file.
+    :param content_type: The MIME type of the request body.
+    :return: 'csv', 'jsonl' or None if it cannot be told.
+    """
+    if content_type:
+        content_type = content_type.split(';')[0].strip().lower()
+        if content_type in ('text/csv', 'application/csv'):
+            return 'csv'
+        if content_type in ('application/x-ndjson', 'application/jsonl', 'application/x-jsonlines'):
+            return 'jsonl'
+    if filename:
+        lowered = filename.lower()
+        if lowered.endswith('.csv'):
+            return 'csv'
+        if lowered.endswith(('.jsonl', '.ndjson')):
+            return 'jsonl'
+    return None
+
+
+def parse_rows(lines, fmt):
+    """
+    Parse an import file lazily, one row at a time.
+
+    :param lines: An iterable of text lines, e.g. an open file.
+    :param fmt: The input format, 'csv' or 'jsonl'.
+    :return: A generator of (line_number, row) tuples, where row is a
+        dictionary, or a ValueError instance if the line could not be parsed.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, {key.strip().lower(): value for key, value in row.items() if key}
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, ValueError(f"Invalid JSON: {e}")
+                continue
+            if not isinstance(row, dict):
+                yield line_number, ValueError("Each line must be a JSON object.")
+                continue
+            yield line_number, {str(key).lower(): value for key, value in row.items()}
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def clean_row(row):
+    """
+    Validate a parsed row and convert it into movie fields.
+
+    Missing director, year or rating are left as None so they can be filled
+    in from OMDb.
+
+    :param row: The parsed row.
+    :return: A dictionary with name, director, year and rating.
+    :raises ValueError: If the row has no name or an invalid year or rating.
+    """
+    name = str(row.get('name') or row.get('title') or '').strip()
+    if not name:
+        raise ValueError("Movie name is required.")
+
+    director = str(row.get('director') or '').strip() or None
+    year = row.get('year')
+    rating = row.get('rating')
+    try:
+        year = int(year) if year not in (None, '') else None
+        rating = float(rating) if rating not in (None, '') else None
+    except (TypeError, ValueError):
+        raise ValueError("Year must be an integer and rating must be a number.")
+    return {'name': name, 'director': director, 'year': year, 'rating': rating}
+
+
+def _is_complete(movie):
+    return all(movie[field] is not None for field in MOVIE_FIELDS)
+
+
+def _enrich(omdb_client, movie):
+    """
+    Fill in a movie's missing fields from OMDb.
+
+    :param omdb_client: The OMDb client.
+    :param movie: The cleaned movie fields.
+    :return: The completed movie fields.
+    :raises OMDbError: If the lookup failed.
+    """
+    director, year, rating = movie_details(omdb_client.lookup(movie['name']))
+    enriched = dict(movie)
+    if enriched['director'] is None:
+        enriched['director'] = director
+    if enriched['year'] is None:
+        enriched['year'] = year
+    if enriched['rating'] is None:
+        enriched['rating'] = rating
+    return enriched
+
+
+def import_movies(data_manager, user_id, rows, batch_size=500, omdb_client=None, max_workers=4):
+    """
+    Import movies for a user in batched transactions.
+
+    Rows are consumed lazily, so only one batch is held in memory at a time.
+    When an OMDb client is given, rows with missing fields are enriched
+    concurrently, with at most ``max_workers`` lookups in flight.
+
+    :param data_manager: The data manager used to write the movies.
+    :param user_id: The unique identifier of the user.
+    :param rows: An iterable of (line_number, row) tuples as produced by parse_rows.
+    :param batch_size: The number of movies written per transaction.
+    :param omdb_client: Optional OMDb client used to fill in missing fields.
+    :param max_workers: The maximum number of concurrent OMDb lookups.
+    :return: A generator of progress events: an 'error' event per rejected
+        row, a 'progress' event per committed batch and a final 'done' event.
+    """
+    imported = failed = 0
+    rows = iter(rows)
+    executor = ThreadPoolExecutor(max_workers=max_workers) if omdb_client is not None else None
+
+    try:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+
+            pending = []
+            for line_number, row in batch:
+                try:
+                    if isinstance(row, Exception):
+                        raise row
+                    pending.append((line_number, clean_row(row)))
+                except ValueError as e:
+                    failed += 1
+                    yield {'type': 'error', 'line': line_number, 'error': str(e)}
+
+            if executor is not None:
+                lookups = {
+                    line_number: executor.submit(_enrich, omdb_client, movie)
+                    for line_number, movie in pending if not _is_complete(movie)
+                }
+                for index, (line_number, movie) in enumerate(pending):
+                    if line_number in lookups:
+                        try:
+                            pending[index] = (line_number, lookups[line_number].result())
+                        except OMDbError as e:
+                            pending[index] = (line_number, e)
+
+            movies = []
+            for line_number, movie in pending:
+                if isinstance(movie, OMDbError):
+                    failed += 1
+                    yield {'type': 'error', 'line': line_number, 'error': f"OMDb lookup failed: {movie}"}
+                elif not _is_complete(movie):
+                    failed += 1
+                    missing = ', '.join(field for field in MOVIE_FIELDS if movie[field] is None)
+                    yield {'type': 'error', 'line': line_number, 'error': f"Missing fields: {missing}."}
+                else:
+                    movies.append(movie)
+
+            imported += data_manager.add_movies(user_id, movies)
+            yield {'type': 'progress', 'imported': imported, 'failed': failed}
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    yield {'type': 'done', 'imported': imported, 'failed': failed}
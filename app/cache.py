@@ -0,0 +1,142 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    A thread-safe, size-bounded LRU cache whose entries expire after a TTL.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300, timer=time.monotonic):
+        """
+        Initialize the cache.
+
+        :param maxsize: The maximum number of entries kept before the least
+            recently used one is evicted.
+        :param ttl: Default time-to-live of an entry, in seconds.
+        :param timer: Clock used for expiry, mainly replaceable in tests.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Retrieve a live entry and mark it as recently used.
+
+        :param key: The cache key.
+        :param default: Value returned when the key is missing or expired.
+        :return: The cached value or ``default``.
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at <= self._timer():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """
+        Store an entry, evicting the least recently used one if full.
+
+        :param key: The cache key.
+        :param value: The value to store.
+        :param ttl: Time-to-live for this entry; defaults to the cache TTL.
+        """
+        expires_at = self._timer() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """
+        Remove an entry if present.
+
+        :param key: The cache key.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+class CacheBackend(ABC):
+    """
+    Interface of a cache shared between processes, such as Redis or memcached.
+
+    Values are JSON-compatible (lists, dicts, strings and numbers) so any
+    backend can serialize them.
+    """
+
+    @abstractmethod
+    def get(self, key):
+        """
+        Retrieve a value.
+
+        :param key: The cache key.
+        :return: The cached value or None if missing.
+        """
+        pass
+
+    @abstractmethod
+    def set(self, key, value, ttl):
+        """
+        Store a value.
+
+        :param key: The cache key.
+        :param value: A JSON-compatible value.
+        :param ttl: Time-to-live in seconds.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, *keys):
+        """
+        Remove values.
+
+        :param keys: The cache keys.
+        """
+        pass
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    A process-local stand-in for a shared cache backend, for development and tests.
+    """
+
+    def __init__(self, maxsize=10000):
+        self._cache = TTLCache(maxsize=maxsize)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, ttl):
+        self._cache.set(key, value, ttl=ttl)
+
+    def delete(self, *keys):
+        for key in keys:
+            self._cache.delete(key)
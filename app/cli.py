@@ -0,0 +1,150 @@
+import time
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from . import db, migrations
+from .bulk_import import FORMATS, detect_format, parse_rows, import_movies
+
+
+@click.command('import-movies')
+@click.argument('user_id', type=int)
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), help='Input format; guessed from the file name if omitted.')
+@click.option('--batch-size', default=500, show_default=True, help='Movies written per transaction.')
+@click.option('--enrich/--no-enrich', default=False, show_default=True,
+              help='Fill in missing director, year and rating from OMDb.')
+@click.option('--workers', default=4, show_default=True, help='Maximum concurrent OMDb lookups.')
+@with_appcontext
+def import_movies_command(user_id, path, fmt, batch_size, enrich, workers):
+    """
+    Import movies for a user from a CSV or JSON Lines file.
+    """
+    if current_app.data_manager.get_user_by_id(user_id) is None:
+        raise click.ClickException(f"User with ID {user_id} not found.")
+
+    fmt = fmt or detect_format(filename=path)
+    if fmt is None:
+        raise click.ClickException("Cannot tell the file format, please pass --format.")
+
+    omdb_client = current_app.omdb_client if enrich else None
+    with open(path, newline='', encoding='utf-8') as lines:
+        events = import_movies(current_app.data_manager, user_id, parse_rows(lines, fmt),
+                               batch_size=batch_size, omdb_client=omdb_client, max_workers=workers)
+        for event in events:
+            if event['type'] == 'error':
+                click.echo(f"Line {event['line']}: {event['error']}", err=True)
+            elif event['type'] == 'progress':
+                click.echo(f"Imported {event['imported']} movies ({event['failed']} rejected)...")
+            else:
+                click.echo(f"Done: {event['imported']} movies imported, {event['failed']} rejected.")
+
+
+@click.group('schema')
+def schema_cli():
+    """
+    Inspect and upgrade the database schema.
+    """
+
+
+@schema_cli.command('status')
+@with_appcontext
+def schema_status_command():
+    """
+    Show the current schema version and the pending migrations.
+    """
+    with db.engine.connect() as conn:
+        version = migrations.current_version(conn)
+        pending = migrations.pending_migrations(conn)
+    click.echo(f"Schema version {version} (latest {migrations.head_version()}).")
+    for number, description, _ in pending:
+        click.echo(f"  pending {number}: {description}")
+
+
+@schema_cli.command('upgrade')
+@with_appcontext
+def schema_upgrade_command():
+    """
+    Apply all pending schema migrations.
+    """
+    applied = migrations.upgrade(db.engine)
+    if applied:
+        click.echo(f"Applied migrations: {', '.join(str(number) for number in applied)}.")
+    else:
+        click.echo("Schema is up to date.")
+
+
+@click.group('stats')
+def stats_cli():
+    """
+    Maintain the precomputed dashboard statistics.
+    """
+
+
+@stats_cli.command('rebuild')
+@with_appcontext
+def stats_rebuild_command():
+    """
+    Recompute the statistics from the users and movies tables.
+    """
+    current_app.data_manager.rebuild_statistics()
+    click.echo("Statistics rebuilt.")
+
+
+@click.group('enrichment')
+def enrichment_cli():
+    """
+    Run the background OMDb enrichment of movies added in async mode.
+    """
+
+
+@enrichment_cli.command('run')
+@click.option('--workers', type=int, help='Number of worker threads (default: ENRICHMENT_WORKERS).')
+@with_appcontext
+def enrichment_run_command(workers):
+    """
+    Process the enrichment queue in the foreground until interrupted.
+    """
+    from .enrichment import EnrichmentWorker
+    worker = EnrichmentWorker.from_config(current_app._get_current_object())
+    if workers:
+        worker.workers = workers
+    worker.start()
+    click.echo(f"Enrichment worker running with {worker.workers} threads, press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        worker.stop(timeout=10)
+
+
+@click.group('recommendations')
+def recommendations_cli():
+    """
+    Maintain the precomputed similar users and movie recommendations.
+    """
+
+
+@recommendations_cli.command('refresh')
+@with_appcontext
+def recommendations_refresh_command():
+    """
+    Recompute the users queued by recent writes, and the users they affect.
+    """
+    from .recommendations import RecommendationRefresher
+    current_app.schema.ensure()
+    refresher = RecommendationRefresher.from_config(current_app._get_current_object())
+    count = refresher.recommender.refresh(current_app.data_manager)
+    click.echo(f"Recommendations refreshed for {count} users.")
+
+
+@recommendations_cli.command('rebuild')
+@with_appcontext
+def recommendations_rebuild_command():
+    """
+    Recompute the recommendations of every user.
+    """
+    from .recommendations import RecommendationRefresher
+    current_app.schema.ensure()
+    refresher = RecommendationRefresher.from_config(current_app._get_current_object())
+    count = refresher.recommender.refresh(current_app.data_manager, full=True)
+    click.echo(f"Recommendations rebuilt for {count} users.")
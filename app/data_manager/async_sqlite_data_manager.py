@@ -0,0 +1,196 @@
+import logging
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.sqlite_profile import get_pragmas, register_pragmas
+from .data_manager_interface import AsyncReadDataManagerInterface
+from .records import UserRecord, MovieRecord
+from .sqlite_data_manager import (User, Movie, Statistic, DataVersion, year_statistic, movie_columns, movies_with_titles,
+                                  dashboard_statement, dashboard_from_rows)
+
+logger = logging.getLogger(__name__)
+
+users = User.__table__
+movies = Movie.__table__
+
+
+def select_movies():
+    """
+    Select the movie columns, with their titles, in MovieRecord field order.
+
+    :return: A Core select.
+    """
+    return select(*movie_columns()).select_from(movies_with_titles())
+
+
+def async_database_uri(uri):
+    """
+    Turn an SQLite database URI into one using the aiosqlite driver.
+
+    :param uri: The SQLAlchemy database URI, e.g. 'sqlite:///data/database.db'.
+    :return: The same database with the 'sqlite+aiosqlite' driver.
+    """
+    return make_url(uri).set(drivername='sqlite+aiosqlite').render_as_string(hide_password=False)
+
+
+class AsyncSQLiteDataManager(AsyncReadDataManagerInterface):
+    """
+    Read-only data manager for asyncio code, backed by aiosqlite.
+
+    It does not depend on Flask-SQLAlchemy's scoped session or an
+    application context: every call checks a connection out of its own async
+    engine for the duration of one statement, so an event loop can have many
+    reads in flight at once. Results are immutable records, like the ones
+    returned by CachingDataManager.
+    """
+
+    def __init__(self, database_uri, pragmas=None, pool_size=10, max_overflow=10):
+        """
+        Initialize the data manager.
+
+        :param database_uri: The (synchronous) SQLAlchemy database URI.
+        :param pragmas: Pragmas to apply on every new connection, or None.
+        :param pool_size: Number of connections kept open.
+        :param max_overflow: Connections opened on top of pool_size under load.
+        """
+        # aiosqlite defaults to NullPool, which would open a file handle per read
+        self.engine = create_async_engine(async_database_uri(database_uri), poolclass=AsyncAdaptedQueuePool,
+                                          pool_size=pool_size, max_overflow=max_overflow)
+        if pragmas:
+            register_pragmas(self.engine.sync_engine, pragmas)
+
+    @classmethod
+    def from_config(cls, app):
+        """
+        Build a data manager from the Flask application configuration.
+
+        :param app: The Flask application instance.
+        :return: A configured AsyncSQLiteDataManager.
+        """
+        config = app.config
+        return cls(
+            config['SQLALCHEMY_DATABASE_URI'],
+            pragmas=get_pragmas(app) if config.get('SQLITE_PROFILE_ENABLED', True) else None,
+            pool_size=config.get('ASYNC_POOL_SIZE', 10),
+            max_overflow=config.get('ASYNC_MAX_OVERFLOW', 10)
+        )
+
+    async def dispose(self):
+        """
+        Close every pooled connection.
+        """
+        await self.engine.dispose()
+
+    async def get_all_users(self):
+        """
+        Retrieve a list of all users.
+
+        :return: A list of UserRecord.
+        """
+        rows = await self._fetch_all(select(users.c.id, users.c.name), 'get_all_users')
+        return [UserRecord(*row) for row in rows]
+
+    async def get_user_by_id(self, user_id):
+        """
+        Retrieve a user by their unique ID.
+
+        :param user_id: The unique identifier of the user.
+        :return: A UserRecord or None if not found.
+        """
+        rows = await self._fetch_all(select(users.c.id, users.c.name).where(users.c.id == user_id),
+                                     'get_user_by_id')
+        return UserRecord(*rows[0]) if rows else None
+
+    async def get_user_movies(self, user_id):
+        """
+        Retrieve a list of movies for a specific user.
+
+        :param user_id: The unique identifier of the user.
+        :return: A list of MovieRecord.
+        """
+        rows = await self._fetch_all(select_movies().where(movies.c.user_id == user_id),
+                                     'get_user_movies')
+        return [MovieRecord(*row) for row in rows]
+
+    async def get_movie_by_id(self, movie_id):
+        """
+        Retrieve a movie by its unique ID.
+
+        :param movie_id: The unique identifier of the movie.
+        :return: A MovieRecord or None if not found.
+        """
+        rows = await self._fetch_all(select_movies().where(movies.c.id == movie_id), 'get_movie_by_id')
+        return MovieRecord(*rows[0]) if rows else None
+
+    async def get_recent_movies(self, limit=3):
+        """
+        Retrieve the most recently added movies.
+
+        :param limit: The maximum number of movies.
+        :return: A list of MovieRecord, newest first.
+        """
+        rows = await self._fetch_all(select_movies().order_by(movies.c.id.desc()).limit(limit),
+                                     'get_recent_movies')
+        return [MovieRecord(*row) for row in rows]
+
+    async def get_statistics(self, year):
+        """
+        Retrieve the dashboard statistics from the precomputed counters.
+
+        :param year: The year whose movies are counted as recent activity.
+        :return: A dictionary with total_users, total_movies and movies_in_year.
+        """
+        names = {'total_users': 'total_users', 'total_movies': 'total_movies',
+                 year_statistic(year): 'movies_in_year'}
+        rows = await self._fetch_all(
+            select(Statistic.name, Statistic.value).where(Statistic.name.in_(names)), 'get_statistics'
+        )
+        statistics = dict.fromkeys(names.values(), 0)
+        statistics.update((names[name], value) for name, value in rows)
+        return statistics
+
+    async def get_dashboard(self, year, limit=3):
+        """
+        Retrieve the dashboard statistics and recent movies from one snapshot.
+
+        :param year: The year whose movies are counted as recent activity.
+        :param limit: The maximum number of movies.
+        :return: A dictionary with 'recent_movies' and 'statistics', as
+            returned by get_recent_movies and get_statistics.
+        """
+        rows = await self._fetch_all(dashboard_statement(year, limit), 'get_dashboard')
+        return dashboard_from_rows(rows)
+
+    async def get_data_versions(self, scopes):
+        """
+        Retrieve the change counters of several data scopes.
+
+        :param scopes: The scope names, e.g. ['users', 'user:1'].
+        :return: A dictionary mapping each scope to a (version, updated_at)
+            tuple; scopes never written to are reported as (0, 0.0).
+        """
+        rows = await self._fetch_all(
+            select(DataVersion.scope, DataVersion.version, DataVersion.updated_at)
+            .where(DataVersion.scope.in_(scopes)), 'get_data_versions'
+        )
+        versions = dict.fromkeys(scopes, (0, 0.0))
+        versions.update((scope, (version, updated_at)) for scope, version, updated_at in rows)
+        return versions
+
+    async def _fetch_all(self, statement, operation):
+        """
+        Run a read statement on a pooled connection.
+
+        :param statement: The select statement.
+        :param operation: The calling method's name, for the error log.
+        :return: A list of result rows.
+        """
+        try:
+            async with self.engine.connect() as connection:
+                result = await connection.execute(statement)
+                return result.all()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error in {operation}: {e}")
+            raise
@@ -0,0 +1,380 @@
+from app.cache import TTLCache
+from app.metrics import Counter
+from .data_manager_interface import DataManagerInterface
+from .records import UserRecord, MovieRecord, user_record, movie_record
+
+
+class CachingDataManager(DataManagerInterface):
+    """
+    Read-through cache in front of another data manager.
+
+    ``get_all_users``, ``get_user_by_id``, ``get_user_movies`` and
+    ``get_movie_by_id`` are answered from a bounded in-process LRU with TTL,
+    then from an optional shared backend, and only then from the wrapped
+    data manager. Results are cached as immutable records rather than ORM
+    objects, so they stay valid after the session that loaded them is gone.
+    Every mutating method invalidates exactly the entries it affects; other
+    calls are passed through unchanged.
+    """
+
+    def __init__(self, data_manager, maxsize=2048, ttl=30, backend=None):
+        """
+        Initialize the caching data manager.
+
+        :param data_manager: The data manager to wrap.
+        :param maxsize: Maximum number of entries in the in-process cache.
+        :param ttl: Time-to-live of an entry, in seconds. It also bounds how
+            long other processes may serve stale data without a shared backend.
+        :param backend: Optional shared CacheBackend consulted after the local cache.
+        """
+        self.data_manager = data_manager
+        self.ttl = ttl
+        self.backend = backend
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._stats = Counter()
+
+    def __getattr__(self, name):
+        return getattr(self.data_manager, name)
+
+    def get_all_users(self, with_movie_counts=False, with_movies=False):
+        """
+        Retrieve a list of all users.
+
+        :param with_movie_counts: Also load movie counts; such calls are passed through uncached.
+        :param with_movies: Also load movies; such calls are passed through uncached.
+        :return: A tuple of UserRecord, or the wrapped manager's result when loading extras.
+        """
+        if with_movie_counts or with_movies:
+            return self.data_manager.get_all_users(with_movie_counts=with_movie_counts, with_movies=with_movies)
+        return self._cached(
+            'users', self.data_manager.get_all_users,
+            dump=lambda users: tuple(user_record(user) for user in users),
+            load=lambda rows: tuple(UserRecord(*row) for row in rows)
+        )
+
+    def get_user_by_id(self, user_id):
+        """
+        Retrieve a user by their unique ID.
+
+        :param user_id: The unique identifier of the user.
+        :return: A UserRecord or None if not found.
+        """
+        return self._cached(
+            f'user:{user_id}', lambda: self.data_manager.get_user_by_id(user_id),
+            dump=user_record, load=lambda row: UserRecord(*row)
+        )
+
+    def get_user_movies(self, user_id):
+        """
+        Retrieve a list of movies for a specific user.
+
+        :param user_id: The unique identifier of the user.
+        :return: A tuple of MovieRecord.
+        """
+        return self._cached(
+            f'user_movies:{user_id}', lambda: self.data_manager.get_user_movies(user_id),
+            dump=lambda movies: tuple(movie_record(movie) for movie in movies),
+            load=lambda rows: tuple(MovieRecord(*row) for row in rows)
+        )
+
+    def get_movie_by_id(self, movie_id):
+        """
+        Retrieve a movie by its unique ID.
+
+        :param movie_id: The unique identifier of the movie.
+        :return: A MovieRecord or None if not found.
+        """
+        return self._cached(
+            f'movie:{movie_id}', lambda: self.data_manager.get_movie_by_id(movie_id),
+            dump=movie_record, load=lambda row: MovieRecord(*row)
+        )
+
+    def get_users_page(self, page=1, per_page=30, after=None, before=None, name_prefix=None,
+                       with_movie_counts=False, with_movies=False, with_total=True):
+        """
+        Pass through to the wrapped data manager; the result is not cached.
+        """
+        return self.data_manager.get_users_page(page=page, per_page=per_page, after=after, before=before,
+                                                name_prefix=name_prefix, with_movie_counts=with_movie_counts,
+                                                with_movies=with_movies, with_total=with_total)
+
+    def get_user_movies_page(self, user_id, page=1, per_page=20, after=None, before=None, with_total=True):
+        """
+        Pass through to the wrapped data manager; the result is not cached.
+        """
+        return self.data_manager.get_user_movies_page(user_id, page=page, per_page=per_page,
+                                                      after=after, before=before, with_total=with_total)
+
+    def get_user_summaries_page(self, page=1, per_page=30, after=None, before=None, name_prefix=None,
+                                with_total=True):
+        """
+        Pass through to the wrapped data manager; the result is not cached.
+        """
+        return self.data_manager.get_user_summaries_page(page=page, per_page=per_page, after=after, before=before,
+                                                         name_prefix=name_prefix, with_total=with_total)
+
+    def get_user_movie_records_page(self, user_id, page=1, per_page=20, after=None, before=None,
+                                    with_total=True):
+        """
+        Pass through to the wrapped data manager; the result is not cached.
+        """
+        return self.data_manager.get_user_movie_records_page(user_id, page=page, per_page=per_page,
+                                                             after=after, before=before, with_total=with_total)
+
+    def get_recent_movies(self, limit=3):
+        """
+        Pass through to the wrapped data manager; the result is not cached.
+        """
+        return self.data_manager.get_recent_movies(limit=limit)
+
+    def get_statistics(self, year):
+        """
+        Pass through to the wrapped data manager; the result is not cached.
+        """
+        return self.data_manager.get_statistics(year)
+
+    def get_dashboard(self, year, limit=3):
+        """
+        Pass through to the wrapped data manager; the result is not cached.
+        """
+        return self.data_manager.get_dashboard(year, limit=limit)
+
+    def get_data_versions(self, scopes):
+        """
+        Pass through to the wrapped data manager; the result is not cached.
+        """
+        return self.data_manager.get_data_versions(scopes)
+
+    def search(self, query, kind='movies', limit=20, after=None):
+        """
+        Pass through to the wrapped data manager; the result is not cached.
+        """
+        return self.data_manager.search(query, kind=kind, limit=limit, after=after)
+
+    def get_recommendations(self, user_id, limit=10):
+        """
+        Pass through to the wrapped data manager; the result is not cached.
+        """
+        return self.data_manager.get_recommendations(user_id, limit=limit)
+
+    def iter_user_movies(self, user_id, batch_size=1000):
+        """
+        Pass through to the wrapped data manager; the result is not cached.
+        """
+        return self.data_manager.iter_user_movies(user_id, batch_size=batch_size)
+
+    def iter_users(self, batch_size=1000):
+        """
+        Pass through to the wrapped data manager; the result is not cached.
+        """
+        return self.data_manager.iter_users(batch_size=batch_size)
+
+    def iter_movies(self, batch_size=1000):
+        """
+        Pass through to the wrapped data manager; the result is not cached.
+        """
+        return self.data_manager.iter_movies(batch_size=batch_size)
+
+    def iter_collection(self, batch_size=1000):
+        """
+        Pass through to the wrapped data manager; the result is not cached.
+        """
+        return self.data_manager.iter_collection(batch_size=batch_size)
+
+    def add_user(self, user_name):
+        """
+        Add a new user and invalidate the cached user list.
+
+        :param user_name: The name of the user to add.
+        :return: The unique identifier of the new user.
+        """
+        try:
+            return self.data_manager.add_user(user_name)
+        finally:
+            self._invalidate('users')
+
+    def add_movie(self, user_id, movie_name, director, year, rating):
+        """
+        Add a new movie and invalidate the user's cached movie list.
+
+        :param user_id: The unique identifier of the user.
+        :param movie_name: The name of the movie to add.
+        :param director: The director of the movie.
+        :param year: The year the movie was released.
+        :param rating: The rating of the movie.
+        :return: The unique identifier of the new movie.
+        """
+        try:
+            return self.data_manager.add_movie(user_id, movie_name, director, year, rating)
+        finally:
+            self._invalidate(f'user_movies:{user_id}')
+
+    def add_pending_movie(self, user_id, movie_name):
+        """
+        Add a movie pending enrichment and invalidate the user's cached movie list.
+
+        :param user_id: The unique identifier of the user.
+        :param movie_name: The name of the movie to add.
+        :return: The unique identifier of the new movie.
+        """
+        try:
+            return self.data_manager.add_pending_movie(user_id, movie_name)
+        finally:
+            self._invalidate(f'user_movies:{user_id}')
+
+    def complete_enrichment(self, job_id, director, year, rating, imdb_id=None):
+        """
+        Store a title's OMDb details and invalidate the cached entries of its movies.
+
+        :param job_id: The unique identifier of the enrichment job.
+        :param director: The director of the movie.
+        :param year: The year the movie was released.
+        :param rating: The rating of the movie.
+        :param imdb_id: The IMDb ID of the movie, if known.
+        :return: A list of (user_id, movie_id) tuples of the movies updated.
+        """
+        affected = self.data_manager.complete_enrichment(job_id, director, year, rating, imdb_id=imdb_id)
+        self._invalidate_movies(affected)
+        return affected
+
+    def fail_enrichment(self, job_id, error, retry_at=None):
+        """
+        Record a failed enrichment attempt and invalidate the movies if it was given up.
+
+        :param job_id: The unique identifier of the enrichment job.
+        :param error: A description of the failure.
+        :param retry_at: Epoch time of the next attempt, or None to give up.
+        :return: A list of (user_id, movie_id) tuples of the movies marked failed.
+        """
+        affected = self.data_manager.fail_enrichment(job_id, error, retry_at=retry_at)
+        self._invalidate_movies(affected)
+        return affected
+
+    def add_movies(self, user_id, movies):
+        """
+        Add several movies and invalidate the user's cached movie list.
+
+        :param user_id: The unique identifier of the user.
+        :param movies: A list of dictionaries with name, director, year and rating.
+        :return: The number of movies added.
+        """
+        try:
+            return self.data_manager.add_movies(user_id, movies)
+        finally:
+            self._invalidate(f'user_movies:{user_id}')
+
+    def update_movie(self, user_id, movie_id, **kwargs):
+        """
+        Update a movie and invalidate it and the user's cached movie list.
+
+        :param user_id: The unique identifier of the user.
+        :param movie_id: The unique identifier of the movie.
+        :param kwargs: A dictionary of attributes to update.
+        :return: True if the movie was found and updated, False otherwise.
+        """
+        try:
+            return self.data_manager.update_movie(user_id, movie_id, **kwargs)
+        finally:
+            self._invalidate(f'movie:{movie_id}', f'user_movies:{user_id}')
+
+    def delete_movie(self, user_id, movie_id):
+        """
+        Delete a movie and invalidate it and the user's cached movie list.
+
+        :param user_id: The unique identifier of the user.
+        :param movie_id: The unique identifier of the movie to delete.
+        :return: True if the movie was found and deleted, False otherwise.
+        """
+        try:
+            return self.data_manager.delete_movie(user_id, movie_id)
+        finally:
+            self._invalidate(f'movie:{movie_id}', f'user_movies:{user_id}')
+
+    def apply_movie_changes(self, user_id, create=(), update=(), delete=()):
+        """
+        Apply a batch of movie changes and invalidate every movie it touches.
+
+        :param user_id: The unique identifier of the user.
+        :param create: Dictionaries with name, director, year and rating.
+        :param update: Dictionaries with the movie's id and the fields to change.
+        :param delete: Ids of the movies to delete.
+        :return: A dictionary with the ids of the created movies and the
+            numbers of updated and deleted movies.
+        """
+        try:
+            return self.data_manager.apply_movie_changes(user_id, create=create, update=update, delete=delete)
+        finally:
+            movie_ids = [movie['id'] for movie in update] + list(delete)
+            self._invalidate(f'user_movies:{user_id}', *(f'movie:{movie_id}' for movie_id in movie_ids))
+
+    def cache_stats(self):
+        """
+        Report cache effectiveness.
+
+        :return: A dictionary with local and shared hits, misses,
+            invalidations, the hit ratio and the local cache size.
+        """
+        stats = self._stats.snapshot()
+        hits = stats.get('local_hits', 0) + stats.get('shared_hits', 0)
+        lookups = hits + stats.get('misses', 0)
+        return {
+            'local_hits': stats.get('local_hits', 0),
+            'shared_hits': stats.get('shared_hits', 0),
+            'misses': stats.get('misses', 0),
+            'invalidations': stats.get('invalidations', 0),
+            'hit_ratio': hits / lookups if lookups else 0.0,
+            'size': len(self._local)
+        }
+
+    def _cached(self, key, load_fresh, dump, load):
+        """
+        Look a key up in the local cache, the shared backend and the wrapped manager, in that order.
+
+        :param key: The cache key.
+        :param load_fresh: Callable returning the value from the wrapped data manager.
+        :param dump: Converts a fresh value into its cached record form.
+        :param load: Rebuilds records from the shared backend's JSON form.
+        :return: The cached or freshly loaded records; None results are not cached.
+        """
+        value = self._local.get(key)
+        if value is not None:
+            self._stats.inc('local_hits')
+            return value
+
+        if self.backend is not None:
+            shared = self.backend.get(key)
+            if shared is not None:
+                self._stats.inc('shared_hits')
+                value = load(shared)
+                self._local.set(key, value)
+                return value
+
+        self._stats.inc('misses')
+        value = dump(load_fresh())
+        if value is not None:
+            self._local.set(key, value)
+            if self.backend is not None:
+                self.backend.set(key, value, self.ttl)
+        return value
+
+    def _invalidate(self, *keys):
+        """
+        Remove entries from the local cache and the shared backend.
+
+        :param keys: The cache keys affected by a write.
+        """
+        for key in keys:
+            self._local.delete(key)
+        if self.backend is not None:
+            self.backend.delete(*keys)
+        self._stats.inc('invalidations', len(keys))
+
+    def _invalidate_movies(self, movies):
+        """
+        Remove the cached entries of some movies and of their users' movie lists.
+
+        :param movies: (user_id, movie_id) tuples.
+        """
+        if movies:
+            keys = {f'user_movies:{user_id}' for user_id, _ in movies}
+            self._invalidate(*keys, *(f'movie:{movie_id}' for _, movie_id in movies))
@@ -1,20 +1,75 @@
 from abc import ABC, abstractmethod
 
 
+class BatchOperationError(LookupError):
+    """
+    Raised when an operation of a batch cannot be applied, rolling back the whole batch.
+    """
+
+    def __init__(self, operation, index, movie_id):
+        """
+        Initialize the error.
+
+        :param operation: 'update' or 'delete'.
+        :param index: Position of the failed operation in its list.
+        :param movie_id: The movie that was not found.
+        """
+        super().__init__(f"Movie {movie_id} not found ({operation} #{index})")
+        self.operation = operation
+        self.index = index
+        self.movie_id = movie_id
+
+
 class DataManagerInterface(ABC):
     """
     An interface for data managers to handle user and movie data.
     """
 
     @abstractmethod
-    def get_all_users(self):
+    def get_all_users(self, with_movie_counts=False, with_movies=False):
         """
         Retrieve a list of all users.
 
+        :param with_movie_counts: Also load each user's movie_count.
+        :param with_movies: Also load each user's movies.
         :return: A list of user dictionaries containing user information.
         """
         pass
 
+    @abstractmethod
+    def get_users_page(self, page=1, per_page=30, after=None, before=None, name_prefix=None,
+                       with_movie_counts=False, with_movies=False, with_total=True):
+        """
+        Retrieve one page of users ordered by id.
+
+        :param page: The 1-based page number, used when no cursor is given.
+        :param per_page: The maximum number of users on the page.
+        :param after: Cursor (user id) to fetch the page following it.
+        :param before: Cursor (user id) to fetch the page preceding it.
+        :param name_prefix: Only include users whose name starts with this prefix.
+        :param with_movie_counts: Also load each user's movie_count.
+        :param with_movies: Also load each user's movies.
+        :param with_total: Include the number of matching users; otherwise the page's total is None.
+        :return: A Page of users.
+        """
+        pass
+
+    @abstractmethod
+    def get_user_summaries_page(self, page=1, per_page=30, after=None, before=None, name_prefix=None,
+                                with_total=True):
+        """
+        Retrieve one page of users with their movie counts as read-only records.
+
+        :param page: The 1-based page number, used when no cursor is given.
+        :param per_page: The maximum number of users on the page.
+        :param after: Cursor (user id) to fetch the page following it.
+        :param before: Cursor (user id) to fetch the page preceding it.
+        :param name_prefix: Only include users whose name starts with this prefix.
+        :param with_total: Include the number of matching users; otherwise the page's total is None.
+        :return: A Page of UserSummary.
+        """
+        pass
+
     @abstractmethod
     def get_user_movies(self, user_id):
         """
@@ -25,12 +80,54 @@ class DataManagerInterface(ABC):
         """
         pass
 
+    @abstractmethod
+    def get_user_movies_page(self, user_id, page=1, per_page=20, after=None, before=None, with_total=True):
+        """
+        Retrieve one page of a user's movies ordered by id.
+
+        :param user_id: The unique identifier of the user.
+        :param page: The 1-based page number, used when no cursor is given.
+        :param per_page: The maximum number of movies on the page.
+        :param after: Cursor (movie id) to fetch the page following it.
+        :param before: Cursor (movie id) to fetch the page preceding it.
+        :param with_total: Include the user's number of movies; otherwise the page's total is None.
+        :return: A Page of movies.
+        """
+        pass
+
+    @abstractmethod
+    def get_user_movie_records_page(self, user_id, page=1, per_page=20, after=None, before=None,
+                                    with_total=True):
+        """
+        Retrieve one page of a user's movies as read-only records.
+
+        :param user_id: The unique identifier of the user.
+        :param page: The 1-based page number, used when no cursor is given.
+        :param per_page: The maximum number of movies on the page.
+        :param after: Cursor (movie id) to fetch the page following it.
+        :param before: Cursor (movie id) to fetch the page preceding it.
+        :param with_total: Include the user's number of movies; otherwise the page's total is None.
+        :return: A Page of MovieRecord.
+        """
+        pass
+
+    @abstractmethod
+    def get_recent_movies(self, limit=3):
+        """
+        Retrieve the most recently added movies.
+
+        :param limit: The maximum number of movies.
+        :return: A list of movie records, newest first.
+        """
+        pass
+
     @abstractmethod
     def add_user(self, user_name):
         """
         Add a new user.
 
         :param user_name: The name of the user to add.
+        :return: The unique identifier of the new user.
         """
         pass
 
@@ -44,6 +141,29 @@ class DataManagerInterface(ABC):
         :param director: The director of the movie.
         :param year: The year the movie was released.
         :param rating: The rating of the movie.
+        :return: The unique identifier of the new movie.
+        """
+        pass
+
+    @abstractmethod
+    def add_pending_movie(self, user_id, movie_name):
+        """
+        Add a movie right away and queue the lookup of its details.
+
+        :param user_id: The unique identifier of the user.
+        :param movie_name: The name of the movie to add.
+        :return: The unique identifier of the new movie.
+        """
+        pass
+
+    @abstractmethod
+    def add_movies(self, user_id, movies):
+        """
+        Add several movies for a specific user in a single transaction.
+
+        :param user_id: The unique identifier of the user.
+        :param movies: A list of dictionaries with name, director, year and rating.
+        :return: The number of movies added.
         """
         pass
 
@@ -55,6 +175,7 @@ class DataManagerInterface(ABC):
         :param user_id: The unique identifier of the user.
         :param movie_id: The unique identifier of the movie.
         :param kwargs: A dictionary of attributes to update.
+        :return: True if the movie was found and updated, False otherwise.
         """
         pass
 
@@ -65,5 +186,204 @@ class DataManagerInterface(ABC):
 
         :param user_id: The unique identifier of the user.
         :param movie_id: The unique identifier of the movie to delete.
+        :return: True if the movie was found and deleted, False otherwise.
+        """
+        pass
+
+    @abstractmethod
+    def apply_movie_changes(self, user_id, create=(), update=(), delete=()):
+        """
+        Create, update and delete several of a user's movies in a single transaction.
+
+        :param user_id: The unique identifier of the user.
+        :param create: Dictionaries with name, director, year and rating.
+        :param update: Dictionaries with the movie's id and the fields to change.
+        :param delete: Ids of the movies to delete.
+        :return: A dictionary with the ids of the created movies and the
+            numbers of updated and deleted movies.
+        :raises BatchOperationError: If a movie to update or delete is not found.
+        """
+        pass
+
+    @abstractmethod
+    def get_recommendations(self, user_id, limit=10):
+        """
+        Retrieve a user's precomputed similar users and recommended movies.
+
+        :param user_id: The unique identifier of the user.
+        :param limit: The maximum number of entries in each list.
+        :return: A dictionary with 'similar_users', 'movies' and 'pending'.
+        """
+        pass
+
+    @abstractmethod
+    def get_statistics(self, year):
+        """
+        Retrieve the dashboard statistics.
+
+        :param year: The year whose movies are counted as recent activity.
+        :return: A dictionary with total_users, total_movies and movies_in_year.
+        """
+        pass
+
+    @abstractmethod
+    def get_dashboard(self, year, limit=3):
+        """
+        Retrieve the dashboard statistics and recent movies from one snapshot.
+
+        :param year: The year whose movies are counted as recent activity.
+        :param limit: The maximum number of movies.
+        :return: A dictionary with 'recent_movies' and 'statistics'.
+        """
+        pass
+
+    @abstractmethod
+    def get_data_versions(self, scopes):
+        """
+        Retrieve the change counters of several data scopes.
+
+        :param scopes: The scope names: 'users', 'movies' or 'user:<id>'.
+        :return: A dictionary mapping each scope to a (version, updated_at) tuple.
+        """
+        pass
+
+    @abstractmethod
+    def search(self, query, kind='movies', limit=20, after=None):
+        """
+        Search movies by name and director, or users by name.
+
+        :param query: The text to search for.
+        :param kind: 'movies' or 'users'.
+        :param limit: The maximum number of results.
+        :param after: Cursor returned with the previous page of results.
+        :return: A tuple of (results, next_cursor).
+        """
+        pass
+
+    @abstractmethod
+    def iter_user_movies(self, user_id, batch_size=1000):
+        """
+        Stream a user's movies without loading them all into memory.
+
+        :param user_id: The unique identifier of the user.
+        :param batch_size: The number of rows fetched from the database at a time.
+        :return: A generator of movie records ordered by id.
+        """
+        pass
+
+    @abstractmethod
+    def iter_users(self, batch_size=1000):
+        """
+        Stream every user without loading them all into memory.
+
+        :param batch_size: The number of rows fetched from the database at a time.
+        :return: A generator of user records ordered by id.
+        """
+        pass
+
+    @abstractmethod
+    def iter_movies(self, batch_size=1000):
+        """
+        Stream every movie without loading them all into memory.
+
+        :param batch_size: The number of rows fetched from the database at a time.
+        :return: A generator of movie records ordered by id.
+        """
+        pass
+
+    @abstractmethod
+    def iter_collection(self, batch_size=1000):
+        """
+        Stream every user together with each of their movies.
+
+        :param batch_size: The number of rows fetched from the database at a time.
+        :return: A generator of (user, movie) record tuples ordered by user and
+            movie id; movie is None for a user without movies.
+        """
+        pass
+
+
+class AsyncReadDataManagerInterface(ABC):
+    """
+    An interface for the read side of a data manager, for asyncio code.
+    """
+
+    @abstractmethod
+    async def get_all_users(self):
+        """
+        Retrieve a list of all users.
+
+        :return: A list of user records.
+        """
+        pass
+
+    @abstractmethod
+    async def get_user_by_id(self, user_id):
+        """
+        Retrieve a user by their unique ID.
+
+        :param user_id: The unique identifier of the user.
+        :return: A user record or None if not found.
+        """
+        pass
+
+    @abstractmethod
+    async def get_user_movies(self, user_id):
+        """
+        Retrieve a list of movies for a specific user.
+
+        :param user_id: The unique identifier of the user.
+        :return: A list of movie records.
+        """
+        pass
+
+    @abstractmethod
+    async def get_movie_by_id(self, movie_id):
+        """
+        Retrieve a movie by its unique ID.
+
+        :param movie_id: The unique identifier of the movie.
+        :return: A movie record or None if not found.
+        """
+        pass
+
+    @abstractmethod
+    async def get_recent_movies(self, limit=3):
+        """
+        Retrieve the most recently added movies.
+
+        :param limit: The maximum number of movies.
+        :return: A list of movie records, newest first.
+        """
+        pass
+
+    @abstractmethod
+    async def get_statistics(self, year):
+        """
+        Retrieve the dashboard statistics.
+
+        :param year: The year whose movies are counted as recent activity.
+        :return: A dictionary with total_users, total_movies and movies_in_year.
+        """
+        pass
+
+    @abstractmethod
+    async def get_dashboard(self, year, limit=3):
+        """
+        Retrieve the dashboard statistics and recent movies from one snapshot.
+
+        :param year: The year whose movies are counted as recent activity.
+        :param limit: The maximum number of movies.
+        :return: A dictionary with 'recent_movies' and 'statistics'.
+        """
+        pass
+
+    @abstractmethod
+    async def get_data_versions(self, scopes):
+        """
+        Retrieve the change counters of several data scopes.
+
+        :param scopes: The scope names: 'users', 'movies' or 'user:<id>'.
+        :return: A dictionary mapping each scope to a (version, updated_at) tuple.
         """
         pass
@@ -0,0 +1,92 @@
+import base64
+import json
+import math
+
+
+class Page:
+    """
+    A single page of results fetched with a keyset (seek) cursor on ``id``.
+
+    The cursors are plain row ids: ``next_cursor`` is the id of the last item
+    on this page and ``prev_cursor`` is the id of the first one, so the
+    neighbouring pages can be fetched with ``id > next_cursor`` and
+    ``id < prev_cursor`` respectively, without an OFFSET scan.
+
+    The total is read from the precomputed statistics where they cover the
+    rows, and is only known when the caller asked for it.
+    """
+
+    def __init__(self, items, page, per_page, total, has_next, has_prev):
+        """
+        Initialize the page.
+
+        :param items: The items on this page, in ascending id order.
+        :param page: The 1-based page number.
+        :param per_page: The maximum number of items per page.
+        :param total: The total number of items across all pages, or None if not counted.
+        :param has_next: Whether there are items after this page.
+        :param has_prev: Whether there are items before this page.
+        """
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.has_next = has_next
+        self.has_prev = has_prev
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def pages(self):
+        """
+        The total number of pages (at least 1), or None if the total was not counted.
+        """
+        if self.total is None:
+            return None
+        return max(1, math.ceil(self.total / self.per_page))
+
+    @property
+    def next_cursor(self):
+        """
+        The cursor for the following page, or None if this is the last page.
+        """
+        return self.items[-1].id if self.has_next and self.items else None
+
+    @property
+    def prev_cursor(self):
+        """
+        The cursor for the preceding page, or None if this is the first page.
+        """
+        return self.items[0].id if self.has_prev and self.items else None
+
+
+def encode_cursor(values):
+    """
+    Encode cursor values into an opaque URL-safe token.
+
+    :param values: A JSON-serializable list, e.g. [rank, id].
+    :return: The token.
+    """
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a token produced by encode_cursor.
+
+    :param token: The opaque cursor token.
+    :return: The decoded list of values.
+    :raises ValueError: If the token is malformed.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,32 @@
+from collections import namedtuple
+
+UserRecord = namedtuple('UserRecord', ['id', 'name'])
+MovieRecord = namedtuple('MovieRecord', ['id', 'user_id', 'name', 'director', 'year', 'rating', 'enrichment_status'])
+UserSummary = namedtuple('UserSummary', ['id', 'name', 'movie_count'])
+SimilarUser = namedtuple('SimilarUser', ['id', 'name', 'score'])
+MovieSuggestion = namedtuple('MovieSuggestion', ['name', 'score', 'supporters'])
+
+
+def user_record(user):
+    """
+    Build an immutable snapshot of a user.
+
+    :param user: A User object (or any object with the same attributes).
+    :return: A UserRecord, or None if user is None.
+    """
+    if user is None:
+        return None
+    return UserRecord(user.id, user.name)
+
+
+def movie_record(movie):
+    """
+    Build an immutable snapshot of a movie.
+
+    :param movie: A Movie object (or any object with the same attributes).
+    :return: A MovieRecord, or None if movie is None.
+    """
+    if movie is None:
+        return None
+    return MovieRecord(movie.id, movie.user_id, movie.name, movie.director, movie.year, movie.rating,
+                       movie.enrichment_status)
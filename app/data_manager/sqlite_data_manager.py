@@ -1,7 +1,18 @@
-from flask import current_app
-from sqlalchemy.exc import SQLAlchemyError
-from .data_manager_interface import DataManagerInterface
+import functools
+import random
+import re
+import time
+from flask import current_app, has_app_context
+from collections import Counter
+from sqlalchemy import delete, event, func, insert, select, text, true, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError, OperationalError
+from sqlalchemy.orm import selectinload, undefer
+from .data_manager_interface import DataManagerInterface, BatchOperationError
+from .pagination import Page
+from .records import UserRecord, MovieRecord, UserSummary, SimilarUser, MovieSuggestion
 from app import db
+from app.omdb.client import normalize_title
 
 
 class User(db.Model):
@@ -15,18 +26,456 @@ class User(db.Model):
     movies = db.relationship('Movie', backref='user', lazy=True)
 
 
+# Case-insensitive prefix search on user names
+db.Index('ix_users_name', User.__table__.c.name.collate('NOCASE'))
+
+
+class Title(db.Model):
+    """
+    Model representing a film in the shared catalog.
+
+    A film is identified by its normalized name and its year, so users who
+    add it share one title whose details are stored and enriched once
+    whatever the number of users. What a user changes on their own copy
+    (name, director, rating) is kept on their movie, see Movie.
+    """
+    __tablename__ = 'titles'
+    __table_args__ = (
+        db.Index('ix_titles_identity', 'title_key', 'year', unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    title_key = db.Column(db.String(100), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    director = db.Column(db.String(100), nullable=False)
+    year = db.Column(db.Integer, nullable=False, index=True)
+    rating = db.Column(db.Float, nullable=False)
+    enrichment_status = db.Column(db.String(20), nullable=False, default='complete', server_default='complete')
+    imdb_id = db.Column(db.String(20))
+
+
+def movie_attribute(field):
+    """
+    Build a read-only movie attribute: the user's own value if they set one, else the title's.
+
+    :param field: The column name, on both movies and titles.
+    :return: A property.
+    """
+    def get(movie):
+        value = getattr(movie, f'own_{field}')
+        return getattr(movie.title, field) if value is None else value
+    return property(get, doc=f"The {field} of the movie.")
+
+
+def title_attribute(field):
+    """
+    Build a read-only movie attribute taken from the movie's catalog title.
+
+    :param field: The Title column name.
+    :return: A property.
+    """
+    return property(lambda movie: getattr(movie.title, field), doc=f"The {field} of the movie's title.")
+
+
 class Movie(db.Model):
     """
-    Model representing a movie in the database.
+    Model representing a movie in a user's collection: a link to a catalog title.
+
+    The name, director and rating columns hold the user's own values where
+    they differ from the title's, and are NULL otherwise.
     """
     __tablename__ = 'movies'
+    __table_args__ = (
+        db.Index('ix_movies_user_id_id', 'user_id', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    title_id = db.Column(db.Integer, db.ForeignKey('titles.id'), nullable=False, index=True)
+    own_name = db.Column('name', db.String(100))
+    own_director = db.Column('director', db.String(100))
+    own_rating = db.Column('rating', db.Float)
+    title = db.relationship(Title, lazy='joined', innerjoin=True)
+
+    name = movie_attribute('name')
+    director = movie_attribute('director')
+    year = title_attribute('year')
+    rating = movie_attribute('rating')
+    enrichment_status = title_attribute('enrichment_status')
+
+
+# Number of movies per user as a correlated subquery on ix_movies_user_id_id.
+# Deferred, so it is only computed when a query asks for it with undefer().
+User.movie_count = db.column_property(
+    select(func.count(Movie.id)).where(Movie.user_id == User.id).correlate_except(Movie).scalar_subquery(),
+    deferred=True
+)
+
+
+# Movie columns that can be changed through update_movie and apply_movie_changes
+UPDATABLE_MOVIE_FIELDS = ('name', 'director', 'year', 'rating')
+
+# Movie columns a user can set on their own copy of a title
+MOVIE_OVERRIDES = ('name', 'director', 'rating')
+
+
+def movie_field(field):
+    """
+    A movie column in a Core select: the user's own value if set, else the title's.
+
+    :param field: The MovieRecord field name.
+    :return: A labelled column.
+    """
+    movies, titles = Movie.__table__, Title.__table__
+    if field in MOVIE_OVERRIDES:
+        return func.coalesce(movies.c[field], titles.c[field]).label(field)
+    return titles.c[field]
+
+
+def movie_columns():
+    """
+    The columns of a movie and its title in MovieRecord field order.
+
+    Select them from movies_with_titles().
+
+    :return: A tuple of columns for a Core select.
+    """
+    movies = Movie.__table__
+    return (movies.c.id, movies.c.user_id) + tuple(movie_field(field) for field in MovieRecord._fields[2:])
+
+
+def movie_overrides(details, title):
+    """
+    The values a movie keeps for itself next to its title.
+
+    :param details: A dictionary with the movie's name, director and rating.
+    :param title: A row or mapping with the title's name, director and rating.
+    :return: A dictionary for the movie's name, director and rating columns,
+        None where the movie agrees with the title.
+    """
+    return {field: None if details[field] == title[field] else details[field] for field in MOVIE_OVERRIDES}
+
+
+def movies_with_titles():
+    """
+    The movies table joined to the titles of its movies.
+
+    :return: A join for Select.select_from.
+    """
+    movies, titles = Movie.__table__, Title.__table__
+    return movies.join(titles, titles.c.id == movies.c.title_id)
+
+
+def movie_count_column():
+    """
+    The number of movies of each user, as a correlated subquery for a Core select of users.
+
+    :return: A labelled scalar subquery.
+    """
+    users, movies = User.__table__, Movie.__table__
+    return (select(func.count(movies.c.id)).where(movies.c.user_id == users.c.id)
+            .correlate(users).scalar_subquery().label('movie_count'))
+
+
+def user_loader_options(with_movie_counts=False, with_movies=False):
+    """
+    Build the loader options for a query of users.
+
+    Both options keep the number of queries constant however many users are
+    loaded: the movie count is computed in the users query itself, and the
+    movies are fetched for all users at once with a single extra SELECT ... IN.
+
+    :param with_movie_counts: Load each user's ``movie_count``.
+    :param with_movies: Eagerly load each user's ``movies``.
+    :return: A list of loader options for ``Query.options``.
+    """
+    options = []
+    if with_movie_counts:
+        options.append(undefer(User.movie_count))
+    if with_movies:
+        options.append(selectinload(User.movies))
+    return options
+
+
+class EnrichmentJob(db.Model):
+    """
+    Model representing a queued OMDb lookup for a title added in async mode.
+
+    There is one job per pending title, however many users added it.
+
+    Jobs are claimed with a lease (``locked_until``), so a job whose worker
+    died is picked up again once the lease expires.
+    """
+    __tablename__ = 'enrichment_jobs'
+    __table_args__ = (
+        db.Index('ix_enrichment_jobs_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    title_id = db.Column(db.Integer, db.ForeignKey('titles.id'), nullable=False, unique=True, index=True)
+    title = db.Column(db.String(100), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.Float, nullable=False)
+    locked_until = db.Column(db.Float)
+    last_error = db.Column(db.Text)
+
+
+def is_locked_error(error):
+    """
+    Check whether a database error means SQLite was locked by another writer.
+
+    :param error: The SQLAlchemy exception.
+    :return: True for "database is locked" and "database is busy" errors.
+    """
+    message = str(getattr(error, 'orig', error)).lower()
+    return isinstance(error, OperationalError) and ('locked' in message or 'busy' in message)
+
+
+def retry_on_locked(method):
+    """
+    Retry a write method a few times when SQLite reports the database as locked.
+
+    ``busy_timeout`` already makes SQLite wait for the lock, but a deferred
+    transaction that has to upgrade from a read to a write lock fails at once
+    instead, so the whole unit of work is retried after a short jittered
+    pause. The policy is set with SQLITE_WRITE_RETRIES and
+    SQLITE_WRITE_RETRY_DELAY (seconds).
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        retries = current_app.config.get('SQLITE_WRITE_RETRIES', 3)
+        delay = current_app.config.get('SQLITE_WRITE_RETRY_DELAY', 0.05)
+        for attempt in range(retries + 1):
+            try:
+                return method(self, *args, **kwargs)
+            except OperationalError as e:
+                if attempt == retries or not is_locked_error(e):
+                    raise
+                current_app.logger.warning(f"Database locked in {method.__name__}, retrying ({attempt + 1}/{retries}).")
+                time.sleep(delay * (attempt + 1) * random.uniform(0.5, 1.5))
+    return wrapper
+
+
+class Statistic(db.Model):
+    """
+    Model representing a precomputed counter for the dashboard statistics.
+
+    Names are 'total_users', 'total_movies', 'movies_year:<year>' and
+    'user_movies:<user id>'.
+    """
+    __tablename__ = 'statistics'
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class DataVersion(db.Model):
+    """
+    Model representing a change counter for a slice of the data.
+
+    Scopes are 'users' (the user list), 'movies' (any movie) and
+    'user:<id>' (one user's movie list). Every write bumps the scopes it
+    touches, so readers can tell whether anything changed with one lookup.
+    """
+    __tablename__ = 'data_versions'
+
+    scope = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.Float, nullable=False)
+
+
+class UserSimilarity(db.Model):
+    """
+    Model representing one of a user's most similar users, precomputed by the recommender.
+    """
+    __tablename__ = 'user_similarities'
+
+    user_id = db.Column(db.Integer, primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)
+    similar_user_id = db.Column(db.Integer, nullable=False, index=True)
+    score = db.Column(db.Float, nullable=False)
+
+
+class MovieRecommendation(db.Model):
+    """
+    Model representing a movie recommended to a user, precomputed by the recommender.
+
+    Movies are identified by their catalog title, which every user's copy
+    of the movie links to.
+    """
+    __tablename__ = 'movie_recommendations'
+
+    user_id = db.Column(db.Integer, primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)
+    title_id = db.Column(db.Integer, nullable=False)
     name = db.Column(db.String(100), nullable=False)
-    director = db.Column(db.String(100), nullable=False)
-    year = db.Column(db.Integer, nullable=False)
-    rating = db.Column(db.Float, nullable=False)
+    score = db.Column(db.Float, nullable=False)
+    supporters = db.Column(db.Integer, nullable=False)
+
+
+class RecommendationQueue(db.Model):
+    """
+    Model representing a user whose recommendations are out of date.
+    """
+    __tablename__ = 'recommendation_queue'
+
+    user_id = db.Column(db.Integer, primary_key=True)
+    queued_at = db.Column(db.Float, nullable=False)
+
+
+# Links a user to the catalog title of a film, keeping the details that differ
+# from the title's, for executemany
+LINK_TITLE = (
+    "INSERT INTO movies (user_id, title_id, name, director, rating) "
+    "SELECT :user_id, id, NULLIF(:name, name), NULLIF(:director, director), NULLIF(:rating, rating) "
+    "FROM titles WHERE title_key = :title_key AND year = :year"
+)
+
+# Search statements, with the rank and id columns of their keyset cursor. Movie
+# names and directors are indexed once per title, and each title matched
+# yields the movies linking to it, shown with their own details.
+SEARCH_QUERIES = {
+    # Movies showing their title's name and director are matched through the
+    # title, the others through their own row in movie_overrides_fts
+    'movies': (
+        "SELECT * FROM ("
+        "SELECT m.id, m.user_id, t.name, t.director, t.year, coalesce(m.rating, t.rating) AS rating, "
+        "titles_fts.rank AS score "
+        "FROM titles_fts JOIN titles t ON t.id = titles_fts.rowid JOIN movies m ON m.title_id = t.id "
+        "WHERE titles_fts MATCH :match AND m.name IS NULL AND m.director IS NULL "
+        "UNION ALL "
+        "SELECT m.id, m.user_id, coalesce(m.name, t.name), coalesce(m.director, t.director), t.year, "
+        "coalesce(m.rating, t.rating), movie_overrides_fts.rank "
+        "FROM movie_overrides_fts JOIN movies m ON m.id = movie_overrides_fts.rowid "
+        "JOIN titles t ON t.id = m.title_id "
+        "WHERE movie_overrides_fts MATCH :match"
+        ") WHERE 1 {seek}"
+        "ORDER BY score, id LIMIT :limit",
+        'score', 'id'
+    ),
+    'users': (
+        "SELECT u.id, u.name, users_fts.rank AS score "
+        "FROM users_fts JOIN users u ON u.id = users_fts.rowid "
+        "WHERE users_fts MATCH :match {seek}"
+        "ORDER BY users_fts.rank, users_fts.rowid LIMIT :limit",
+        'users_fts.rank', 'users_fts.rowid'
+    )
+}
+
+
+def fts_prefix_query(query):
+    """
+    Turn free text into an FTS5 query matching every word as a prefix.
+
+    :param query: The text typed by the user.
+    :return: The FTS5 MATCH expression, or None if the text has no words.
+    """
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'"{word}"*' for word in words) or None
+
+
+def year_statistic(year):
+    """
+    Build the statistic name counting the movies of a given year.
+
+    :param year: The release year, as stored on the movie.
+    :return: The statistic name, e.g. 'movies_year:1999'.
+    """
+    try:
+        year = int(year)
+    except (TypeError, ValueError):
+        pass
+    return f"movies_year:{year}"
+
+
+def user_statistic(user_id):
+    """
+    Build the statistic name counting the movies of a user.
+
+    :param user_id: The unique identifier of the user.
+    :return: The statistic name, e.g. 'user_movies:42'.
+    """
+    return f"user_movies:{user_id}"
+
+
+def dashboard_statement(year, limit):
+    """
+    Select the dashboard statistics and recent movies in one statement.
+
+    A single SELECT reads from one snapshot of the database, so the counters
+    always agree with the movies listed. Each row holds the three counters
+    followed by a recent movie in MovieRecord field order; the counters come
+    with a row of NULL movie columns when there are no movies.
+
+    :param year: The year whose movies are counted as recent activity.
+    :param limit: The maximum number of movies.
+    :return: A Core select.
+    """
+    movies, statistics = Movie.__table__, Statistic.__table__
+
+    def counter(name, label):
+        value = select(statistics.c.value).where(statistics.c.name == name).scalar_subquery()
+        return func.coalesce(value, 0).label(label)
+
+    counters = select(counter('total_users', 'total_users'), counter('total_movies', 'total_movies'),
+                      counter(year_statistic(year), 'movies_in_year')).subquery('counters')
+    recent = (select(*movie_columns()).select_from(movies_with_titles())
+              .order_by(movies.c.id.desc()).limit(limit).subquery('recent'))
+    return (select(*counters.c, *recent.c).select_from(counters.outerjoin(recent, true()))
+            .order_by(recent.c.id.desc()))
+
+
+def dashboard_from_rows(rows):
+    """
+    Split the rows of dashboard_statement into the dashboard's two parts.
+
+    :param rows: The result rows.
+    :return: A dictionary with 'recent_movies' (a list of MovieRecord, newest
+        first) and 'statistics' (total_users, total_movies and movies_in_year).
+    """
+    statistics = dict(zip(('total_users', 'total_movies', 'movies_in_year'), rows[0][:3]))
+    movies = [MovieRecord(*row[3:]) for row in rows if row[3] is not None]
+    return {'recent_movies': movies, 'statistics': statistics}
+
+
+def pending_changes(session):
+    """
+    The statistic deltas and data scopes written by a session's open transaction.
+
+    They are published to the application's event broker once the
+    transaction commits, and forgotten if it rolls back.
+
+    :param session: The SQLAlchemy session.
+    :return: A dictionary with 'scopes' (a set) and 'statistics' (a Counter).
+    """
+    return session.info.setdefault('pending_changes', {'scopes': set(), 'statistics': Counter()})
+
+
+@event.listens_for(db.session, 'after_commit')
+def publish_changes(session):
+    """
+    Publish the changes of a committed transaction to the event broker.
+
+    :param session: The SQLAlchemy session.
+    """
+    changes = session.info.pop('pending_changes', None)
+    if not changes or not has_app_context():
+        return
+    broker = getattr(current_app, 'event_broker', None)
+    if broker is not None:
+        broker.publish({'scopes': sorted(changes['scopes']),
+                        'statistics': {name: delta for name, delta in changes['statistics'].items() if delta}})
+
+
+@event.listens_for(db.session, 'after_rollback')
+def forget_changes(session):
+    """
+    Drop the changes of a rolled back transaction.
+
+    :param session: The SQLAlchemy session.
+    """
+    session.info.pop('pending_changes', None)
 
 
 class SQLiteDataManager(DataManagerInterface):
@@ -41,20 +490,91 @@ class SQLiteDataManager(DataManagerInterface):
         """
         pass  # No initialization needed here
 
-    def get_all_users(self):
+    def get_all_users(self, with_movie_counts=False, with_movies=False):
         """
         Retrieve a list of all users.
 
+        :param with_movie_counts: Also load each user's ``movie_count``.
+        :param with_movies: Also load each user's ``movies``, in one extra query.
         :return: A list of User objects.
         """
         try:
-            users = User.query.all()
+            users = User.query.options(*user_loader_options(with_movie_counts, with_movies)).all()
             return users
         except SQLAlchemyError as e:
             db.session.rollback()
             current_app.logger.error(f"Database error in get_all_users: {e}")
             return []
 
+    def get_users_page(self, page=1, per_page=30, after=None, before=None, name_prefix=None,
+                       with_movie_counts=False, with_movies=False, with_total=True):
+        """
+        Retrieve one page of users ordered by id.
+
+        :param page: The 1-based page number, used when no cursor is given.
+        :param per_page: The maximum number of users on the page.
+        :param after: Cursor (user id) to fetch the page following it.
+        :param before: Cursor (user id) to fetch the page preceding it.
+        :param name_prefix: Only include users whose name starts with this
+            prefix, ignoring case. Served by the ix_users_name index.
+        :param with_movie_counts: Also load each user's ``movie_count``.
+        :param with_movies: Also load each user's ``movies``, in one extra query.
+        :param with_total: Include the number of matching users, read from the
+            statistics unless filtered by name; otherwise the page's total is None.
+        :return: A Page of User objects.
+        """
+        try:
+            query = User.query.options(*user_loader_options(with_movie_counts, with_movies))
+            total = None
+            if name_prefix:
+                name = User.name.collate('NOCASE')
+                query = query.filter(name >= name_prefix, name < name_prefix + '\U0010ffff')
+                if with_total:
+                    total = query.with_entities(func.count(User.id)).scalar()
+            elif with_total:
+                total = self._statistic('total_users')
+            return self._seek_page(User, query, page, per_page, after, before, total)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in get_users_page: {e}")
+            return Page([], page, per_page, 0, False, False)
+
+    def get_user_summaries_page(self, page=1, per_page=30, after=None, before=None, name_prefix=None,
+                                with_total=True):
+        """
+        Retrieve one page of users with their movie counts, for read-only display.
+
+        Only id, name and the movie count are selected, with Core, and the rows
+        become UserSummary tuples: no ORM objects, identity map entries or
+        attribute instrumentation are built.
+
+        :param page: The 1-based page number, used when no cursor is given.
+        :param per_page: The maximum number of users on the page.
+        :param after: Cursor (user id) to fetch the page following it.
+        :param before: Cursor (user id) to fetch the page preceding it.
+        :param name_prefix: Only include users whose name starts with this prefix, ignoring case.
+        :param with_total: Include the number of matching users, read from the
+            statistics unless filtered by name; otherwise the page's total is None.
+        :return: A Page of UserSummary.
+        """
+        users = User.__table__
+        conditions = []
+        if name_prefix:
+            name = users.c.name.collate('NOCASE')
+            conditions += [name >= name_prefix, name < name_prefix + '\U0010ffff']
+        try:
+            total = None
+            if with_total and name_prefix:
+                total = db.session.execute(select(func.count(users.c.id)).where(*conditions)).scalar()
+            elif with_total:
+                total = self._statistic('total_users')
+            return self._seek_records(UserSummary, (users.c.id, users.c.name, movie_count_column()), users.c.id,
+                                      conditions, page, per_page, after, before, total)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in get_user_summaries_page: {e}")
+            return Page([], page, per_page, 0, False, False)
+
     def get_user_by_id(self, user_id):
         """
         Retrieve a user by their unique ID.
@@ -85,21 +605,245 @@ class SQLiteDataManager(DataManagerInterface):
             current_app.logger.error(f"Database error in get_user_movies: {e}")
             return []
 
+    def iter_user_movies(self, user_id, batch_size=1000):
+        """
+        Stream a user's movies without loading them all into memory.
+
+        Rows are read from the cursor ``batch_size`` at a time and turned into
+        records, so no ORM objects accumulate in the session.
+
+        :param user_id: The unique identifier of the user.
+        :param batch_size: The number of rows fetched from the database at a time.
+        :return: A generator of MovieRecord ordered by id.
+        """
+        movies = Movie.__table__
+        statement = (select(*movie_columns()).select_from(movies_with_titles())
+                     .where(movies.c.user_id == user_id).order_by(movies.c.id))
+        for row in self._stream(statement, batch_size, 'iter_user_movies'):
+            yield MovieRecord(*row)
+
+    def iter_users(self, batch_size=1000):
+        """
+        Stream every user without loading them all into memory.
+
+        :param batch_size: The number of rows fetched from the database at a time.
+        :return: A generator of UserRecord ordered by id.
+        """
+        statement = select(User.id, User.name).order_by(User.id)
+        for row in self._stream(statement, batch_size, 'iter_users'):
+            yield UserRecord(*row)
+
+    def iter_movies(self, batch_size=1000):
+        """
+        Stream every movie without loading them all into memory.
+
+        :param batch_size: The number of rows fetched from the database at a time.
+        :return: A generator of MovieRecord ordered by id.
+        """
+        statement = select(*movie_columns()).select_from(movies_with_titles()).order_by(Movie.__table__.c.id)
+        for row in self._stream(statement, batch_size, 'iter_movies'):
+            yield MovieRecord(*row)
+
+    def iter_collection(self, batch_size=1000):
+        """
+        Stream every user together with each of their movies.
+
+        :param batch_size: The number of rows fetched from the database at a time.
+        :return: A generator of (UserRecord, MovieRecord) tuples ordered by user
+            and movie id; the movie is None for a user without movies.
+        """
+        users, movies, titles = User.__table__, Movie.__table__, Title.__table__
+        statement = (
+            select(users.c.id, users.c.name, *movie_columns())
+            .select_from(users.outerjoin(movies, movies.c.user_id == users.c.id)
+                         .outerjoin(titles, titles.c.id == movies.c.title_id))
+            .order_by(users.c.id, movies.c.id)
+        )
+        for row in self._stream(statement, batch_size, 'iter_collection'):
+            movie = MovieRecord(*row[2:]) if row[2] is not None else None
+            yield UserRecord(*row[:2]), movie
+
+    @staticmethod
+    def _stream(statement, batch_size, operation):
+        """
+        Execute a select and yield its rows in batches from the cursor.
+
+        :param statement: The Core select.
+        :param batch_size: The number of rows fetched at a time (yield_per).
+        :param operation: The calling method's name, for the error log.
+        :return: A generator of result rows.
+        """
+        try:
+            result = db.session.execute(statement.execution_options(yield_per=batch_size))
+            for partition in result.partitions():
+                yield from partition
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in {operation}: {e}")
+            raise
+
+    def get_user_movies_page(self, user_id, page=1, per_page=20, after=None, before=None, with_total=True):
+        """
+        Retrieve one page of a user's movies ordered by id.
+
+        :param user_id: The unique identifier of the user.
+        :param page: The 1-based page number, used when no cursor is given.
+        :param per_page: The maximum number of movies on the page.
+        :param after: Cursor (movie id) to fetch the page following it.
+        :param before: Cursor (movie id) to fetch the page preceding it.
+        :param with_total: Include the user's number of movies, read from the
+            statistics; otherwise the page's total is None.
+        :return: A Page of Movie objects.
+        """
+        try:
+            query = Movie.query.filter_by(user_id=user_id)
+            total = self._statistic(user_statistic(user_id)) if with_total else None
+            return self._seek_page(Movie, query, page, per_page, after, before, total)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in get_user_movies_page: {e}")
+            return Page([], page, per_page, 0, False, False)
+
+    def get_user_movie_records_page(self, user_id, page=1, per_page=20, after=None, before=None,
+                                    with_total=True):
+        """
+        Retrieve one page of a user's movies, for read-only display.
+
+        The movie columns are selected with Core and returned as MovieRecord
+        tuples instead of Movie objects.
+
+        :param user_id: The unique identifier of the user.
+        :param page: The 1-based page number, used when no cursor is given.
+        :param per_page: The maximum number of movies on the page.
+        :param after: Cursor (movie id) to fetch the page following it.
+        :param before: Cursor (movie id) to fetch the page preceding it.
+        :param with_total: Include the user's number of movies, read from the
+            statistics; otherwise the page's total is None.
+        :return: A Page of MovieRecord.
+        """
+        movies = Movie.__table__
+        try:
+            total = self._statistic(user_statistic(user_id)) if with_total else None
+            return self._seek_records(MovieRecord, movie_columns(), movies.c.id, [movies.c.user_id == user_id],
+                                      page, per_page, after, before, total, source=movies_with_titles())
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in get_user_movie_records_page: {e}")
+            return Page([], page, per_page, 0, False, False)
+
+    def get_recent_movies(self, limit=3):
+        """
+        Retrieve the most recently added movies.
+
+        :param limit: The maximum number of movies.
+        :return: A list of MovieRecord, newest first.
+        """
+        try:
+            rows = db.session.execute(select(*movie_columns()).select_from(movies_with_titles())
+                                      .order_by(Movie.__table__.c.id.desc()).limit(limit))
+            return [MovieRecord(*row) for row in rows]
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in get_recent_movies: {e}")
+            raise
+
+    @staticmethod
+    def _seek_records(record, columns, id_column, conditions, page, per_page, after, before, total=None,
+                      source=None):
+        """
+        Fetch a page of rows with a Core select and a keyset cursor on ``id_column``.
+
+        The same seek as _seek_page, without going through the ORM.
+
+        :param record: The namedtuple class built from each row.
+        :param columns: The columns to select, in record field order.
+        :param id_column: The primary key column used as the cursor.
+        :param conditions: Filters of the page.
+        :param page: The 1-based page number.
+        :param per_page: The maximum number of rows on the page.
+        :param after: Fetch rows with an id greater than this cursor.
+        :param before: Fetch rows with an id smaller than this cursor.
+        :param total: The number of rows across all pages, or None if not known.
+        :param source: The FROM clause of the page, when the columns span a join.
+        :return: A Page of records.
+        """
+        statement = select(*columns).where(*conditions)
+        if source is not None:
+            statement = statement.select_from(source)
+
+        if after is not None:
+            statement = statement.where(id_column > after).order_by(id_column.asc()).limit(per_page + 1)
+            rows = db.session.execute(statement).all()
+            has_next, has_prev = len(rows) > per_page, True
+            rows = rows[:per_page]
+        elif before is not None:
+            statement = statement.where(id_column < before).order_by(id_column.desc()).limit(per_page + 1)
+            rows = db.session.execute(statement).all()
+            has_next, has_prev = True, len(rows) > per_page
+            rows = list(reversed(rows[:per_page]))
+        else:
+            statement = statement.order_by(id_column.asc()).offset((page - 1) * per_page).limit(per_page + 1)
+            rows = db.session.execute(statement).all()
+            has_next, has_prev = len(rows) > per_page, page > 1
+            rows = rows[:per_page]
+
+        return Page([record(*row) for row in rows], page, per_page, total, has_next, has_prev)
+
+    @staticmethod
+    def _seek_page(model, query, page, per_page, after, before, total=None):
+        """
+        Fetch a page of ``query`` using a keyset cursor on ``model.id``.
+
+        With a cursor the page is found by seeking on the primary key, so its
+        cost does not depend on how deep into the table it is. Without one,
+        the page number is resolved with an OFFSET over the id index only;
+        the routes only allow small page numbers without a cursor.
+
+        :param model: The model class whose ``id`` column is the cursor.
+        :param query: The filtered base query.
+        :param page: The 1-based page number.
+        :param per_page: The maximum number of rows on the page.
+        :param after: Fetch rows with an id greater than this cursor.
+        :param before: Fetch rows with an id smaller than this cursor.
+        :param total: The number of rows across all pages, or None if not known.
+        :return: A Page of model instances.
+        """
+        if after is not None:
+            rows = query.filter(model.id > after).order_by(model.id.asc()).limit(per_page + 1).all()
+            has_next, has_prev = len(rows) > per_page, True
+            rows = rows[:per_page]
+        elif before is not None:
+            rows = query.filter(model.id < before).order_by(model.id.desc()).limit(per_page + 1).all()
+            has_next, has_prev = True, len(rows) > per_page
+            rows = list(reversed(rows[:per_page]))
+        else:
+            rows = query.order_by(model.id.asc()).offset((page - 1) * per_page).limit(per_page + 1).all()
+            has_next, has_prev = len(rows) > per_page, page > 1
+            rows = rows[:per_page]
+
+        return Page(rows, page, per_page, total, has_next, has_prev)
+
+    @retry_on_locked
     def add_user(self, user_name):
         """
         Add a new user to the database.
 
         :param user_name: The name of the user to add.
+        :return: The unique identifier of the new user.
         """
         try:
             new_user = User(name=user_name)
             db.session.add(new_user)
+            self._adjust_statistics({'total_users': 1})
+            self._bump_versions(['users'])
             db.session.commit()
+            return new_user.id
         except SQLAlchemyError as e:
             db.session.rollback()
             current_app.logger.error(f"Database error in add_user: {e}")
             raise
 
+    @retry_on_locked
     def add_movie(self, user_id, movie_name, director, year, rating):
         """
         Add a new movie for a specific user.
@@ -109,64 +853,517 @@ class SQLiteDataManager(DataManagerInterface):
         :param director: The director of the movie.
         :param year: The year the movie was released.
         :param rating: The rating of the movie.
+        :return: The unique identifier of the new movie.
         """
         try:
-            new_movie = Movie(
-                user_id=user_id,
-                name=movie_name,
-                director=director,
-                year=year,
-                rating=rating
-            )
-            db.session.add(new_movie)
+            changes = Counter()
+            movie_id = self._insert_movie_row(user_id, {'name': movie_name, 'director': director, 'year': year,
+                                                        'rating': rating}, changes)
+            self._adjust_statistics(changes)
+            self._bump_versions(['movies', f'user:{user_id}'])
+            self._queue_recommendations([user_id])
             db.session.commit()
+            return movie_id
         except SQLAlchemyError as e:
             db.session.rollback()
             current_app.logger.error(f"Database error in add_movie: {e}")
             raise
 
+    @retry_on_locked
+    def add_movies(self, user_id, movies):
+        """
+        Add several movies for a specific user in a single transaction.
+
+        The rows are written with two executemany-style Core statements,
+        without building an ORM object per movie: one adding the titles not
+        yet in the catalog, one linking the user to each title.
 
+        :param user_id: The unique identifier of the user.
+        :param movies: A list of dictionaries with name, director, year and rating.
+        :return: The number of movies added.
+        """
+        if not movies:
+            return 0
+        titles = Title.__table__
+        try:
+            rows = [
+                {
+                    'user_id': user_id,
+                    'title_key': normalize_title(movie['name']),
+                    'name': movie['name'],
+                    'director': movie['director'],
+                    'year': movie['year'],
+                    'rating': movie['rating'],
+                    'enrichment_status': 'complete'
+                }
+                for movie in movies
+            ]
+            db.session.execute(sqlite_insert(titles).on_conflict_do_nothing(
+                index_elements=[titles.c.title_key, titles.c.year]), rows)
+            db.session.execute(text(LINK_TITLE), rows)
+            changes = Counter(year_statistic(row['year']) for row in rows)
+            changes['total_movies'] = changes[user_statistic(user_id)] = len(rows)
+            self._adjust_statistics(changes)
+            self._bump_versions(['movies', f'user:{user_id}'])
+            self._queue_recommendations([user_id])
+            db.session.commit()
+            return len(rows)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in add_movies: {e}")
+            raise
+
+    @retry_on_locked
     def update_movie(self, user_id, movie_id, **kwargs):
         """
         Update details of a specific movie for a user.
 
+        The movie's title is shared with other users, so it is not changed:
+        a new director or rating, or another spelling of the name, is kept on
+        the movie itself. A new year, or a name that is another film, points
+        the movie at that film's title, which is created if needed, and its
+        old title is removed once unused.
+
         :param user_id: The unique identifier of the user.
         :param movie_id: The unique identifier of the movie.
-        :param kwargs: A dictionary of attributes to update.
+        :param kwargs: A dictionary of attributes to update; names other than
+            name, director, year and rating are ignored.
+        :return: True if the movie was found and updated, False otherwise.
         """
+        values = {key: value for key, value in kwargs.items() if key in UPDATABLE_MOVIE_FIELDS}
         try:
-            movie = Movie.query.filter_by(user_id=user_id, id=movie_id).first()
-            if movie:
-                for key, value in kwargs.items():
-                    if hasattr(movie, key):
-                        setattr(movie, key, value)
-                db.session.commit()
-            else:
+            changes, released = Counter(), set()
+            if not self._update_movie_row(user_id, movie_id, values, changes, released):
+                db.session.rollback()
                 current_app.logger.warning(f"Movie {movie_id} not found for user {user_id}.")
+                return False
+            self._drop_unused_titles(released)
+            self._adjust_statistics(changes)
+            self._bump_versions(['movies', f'user:{user_id}'])
+            self._queue_recommendations([user_id])
+            db.session.commit()
+            return True
         except SQLAlchemyError as e:
             db.session.rollback()
             current_app.logger.error(f"Database error in update_movie: {e}")
             raise
 
+    @retry_on_locked
     def delete_movie(self, user_id, movie_id):
         """
         Delete a movie from a user's collection.
 
+        The movie is removed with a single DELETE conditioned on both ids,
+        without loading it first; its title is removed once unused.
+
         :param user_id: The unique identifier of the user.
         :param movie_id: The unique identifier of the movie to delete.
+        :return: True if the movie was found and deleted, False otherwise.
         """
         try:
-            movie = Movie.query.filter_by(user_id=user_id, id=movie_id).first()
-            if movie:
-                db.session.delete(movie)
-                db.session.commit()
-            else:
+            changes, released = Counter(), set()
+            if not self._delete_movie_row(user_id, movie_id, changes, released):
+                db.session.rollback()
                 current_app.logger.warning(f"Movie {movie_id} not found for user {user_id}.")
+                return False
+            self._drop_unused_titles(released)
+            self._adjust_statistics(changes)
+            self._bump_versions(['movies', f'user:{user_id}'])
+            self._queue_recommendations([user_id])
+            db.session.commit()
+            return True
         except SQLAlchemyError as e:
             db.session.rollback()
             current_app.logger.error(f"Database error in delete_movie: {e}")
             raise
 
+    @retry_on_locked
+    def apply_movie_changes(self, user_id, create=(), update=(), delete=()):
+        """
+        Create, update and delete several of a user's movies in a single transaction.
+
+        Either every operation is applied or none is: if a movie to update or
+        delete does not belong to the user, the transaction is rolled back.
+
+        :param user_id: The unique identifier of the user.
+        :param create: Dictionaries with name, director, year and rating.
+        :param update: Dictionaries with the movie's id and the fields to change.
+        :param delete: Ids of the movies to delete.
+        :return: A dictionary with the ids of the created movies and the
+            numbers of updated and deleted movies.
+        :raises BatchOperationError: If a movie to update or delete is not found.
+        """
+        try:
+            changes, released = Counter(), set()
+            created = [self._insert_movie_row(user_id, movie, changes) for movie in create]
+            for index, movie in enumerate(update):
+                values = {key: value for key, value in movie.items() if key in UPDATABLE_MOVIE_FIELDS}
+                if not self._update_movie_row(user_id, movie['id'], values, changes, released):
+                    raise BatchOperationError('update', index, movie['id'])
+            for index, movie_id in enumerate(delete):
+                if not self._delete_movie_row(user_id, movie_id, changes, released):
+                    raise BatchOperationError('delete', index, movie_id)
+            self._drop_unused_titles(released)
+            self._adjust_statistics(changes)
+            self._bump_versions(['movies', f'user:{user_id}'])
+            self._queue_recommendations([user_id])
+            db.session.commit()
+            return {'created': created, 'updated': len(update), 'deleted': len(delete)}
+        except BatchOperationError as e:
+            db.session.rollback()
+            current_app.logger.warning(f"Batch for user {user_id} rolled back: {e}")
+            raise
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in apply_movie_changes: {e}")
+            raise
+
+    def _insert_movie_row(self, user_id, movie, changes):
+        """
+        Insert a movie within the current transaction.
+
+        :param user_id: The unique identifier of the user.
+        :param movie: A dictionary with name, director, year and rating.
+        :param changes: A Counter of statistic deltas, updated in place.
+        :return: The unique identifier of the new movie.
+        """
+        table = Movie.__table__
+        title = self._title(movie)
+        movie_id = db.session.execute(
+            insert(table).values(user_id=user_id, title_id=title.id, **movie_overrides(movie, title._mapping))
+            .returning(table.c.id)
+        ).scalar_one()
+        changes['total_movies'] += 1
+        changes[user_statistic(user_id)] += 1
+        changes[year_statistic(movie['year'])] += 1
+        return movie_id
+
+    def _update_movie_row(self, user_id, movie_id, values, changes, released):
+        """
+        Update a movie within the current transaction, if it belongs to the user.
+
+        A change the movie keeps for itself (a director, a rating, another
+        spelling of the name, the same year) is one UPDATE matching id and
+        user_id, comparing with the title in SQL. Only when no row matched,
+        because the movie is missing or now links to another title, is the
+        movie read.
+
+        :param user_id: The unique identifier of the user.
+        :param movie_id: The unique identifier of the movie.
+        :param values: The columns to change.
+        :param changes: A Counter of statistic deltas, updated in place.
+        :param released: A set of the titles movies stopped linking to, updated in place.
+        :return: True if the movie was found, False otherwise.
+        """
+        table, titles = Movie.__table__, Title.__table__
+        match = (table.c.id == movie_id) & (table.c.user_id == user_id)
+        if not values:
+            return db.session.execute(select(table.c.id).where(match)).first() is not None
+
+        def title_column(column):
+            return select(column).where(titles.c.id == table.c.title_id).scalar_subquery()
+
+        overrides = {field: func.nullif(value, title_column(titles.c[field]))
+                     for field, value in values.items() if field in MOVIE_OVERRIDES}
+        if overrides:
+            same_title = match
+            if 'name' in values:
+                same_title &= title_column(titles.c.title_key) == normalize_title(values['name'])
+            if 'year' in values:
+                same_title &= title_column(titles.c.year) == values['year']
+            if db.session.execute(update(table).where(same_title).values(**overrides)).rowcount:
+                return True
+
+        old = db.session.execute(
+            select(table.c.title_id, titles.c.title_key, titles.c.enrichment_status,
+                   *(movie_field(field) for field in UPDATABLE_MOVIE_FIELDS))
+            .select_from(movies_with_titles()).where(match)
+        ).first()
+        if old is None:
+            return False
+        details = dict(old._mapping, **values)
+        if (normalize_title(details['name']), details['year']) == (old.title_key, old.year):
+            title = db.session.execute(select(titles).where(titles.c.id == old.title_id)).first()
+        else:
+            title = self._title(details)
+            released.add(old.title_id)
+            if details['enrichment_status'] == 'pending':
+                self._queue_enrichment(title.id, details['name'])
+        db.session.execute(update(table).where(table.c.id == movie_id)
+                           .values(title_id=title.id, **movie_overrides(details, title._mapping)))
+        if year_statistic(old.year) != year_statistic(details['year']):
+            changes[year_statistic(old.year)] -= 1
+            changes[year_statistic(details['year'])] += 1
+        return True
+
+    def _delete_movie_row(self, user_id, movie_id, changes, released):
+        """
+        Delete a movie within the current transaction, if it belongs to the user.
+
+        :param user_id: The unique identifier of the user.
+        :param movie_id: The unique identifier of the movie.
+        :param changes: A Counter of statistic deltas, updated in place.
+        :param released: A set of the titles movies stopped linking to, updated in place.
+        :return: True if the movie was found, False otherwise.
+        """
+        table, titles = Movie.__table__, Title.__table__
+        match = (table.c.id == movie_id) & (table.c.user_id == user_id)
+        year = select(titles.c.year).where(titles.c.id == table.c.title_id).scalar_subquery()
+        deleted = db.session.execute(delete(table).where(match).returning(table.c.title_id, year)).first()
+        if deleted is None:
+            return False
+        released.add(deleted[0])
+        changes['total_movies'] -= 1
+        changes[user_statistic(user_id)] -= 1
+        changes[year_statistic(deleted[1])] -= 1
+        return True
+
+    @staticmethod
+    def _title(details):
+        """
+        Find or create the catalog title of a film, within the current transaction.
+
+        A new title takes its details from the movie being added.
+
+        :param details: A dictionary with name, director, year and rating, and
+            optionally enrichment_status ('complete' if missing).
+        :return: The title's row.
+        """
+        titles = Title.__table__
+        statement = sqlite_insert(titles).values(
+            title_key=normalize_title(details['name']), name=details['name'], director=details['director'],
+            year=details['year'], rating=details['rating'],
+            enrichment_status=details.get('enrichment_status', 'complete')
+        )
+        # A no-op update on conflict, so RETURNING also gives an existing title
+        statement = statement.on_conflict_do_update(
+            index_elements=[titles.c.title_key, titles.c.year],
+            set_={'title_key': statement.excluded.title_key}
+        )
+        return db.session.execute(statement.returning(*titles.c)).one()
+
+    @staticmethod
+    def _drop_unused_titles(title_ids):
+        """
+        Delete titles no movie links to any more, and their enrichment jobs, within the current transaction.
+
+        :param title_ids: The titles some movies stopped linking to.
+        """
+        if not title_ids:
+            return
+        titles, movies, jobs = Title.__table__, Movie.__table__, EnrichmentJob.__table__
+        db.session.execute(delete(jobs).where(
+            jobs.c.title_id.in_(title_ids), ~select(movies.c.id).where(movies.c.title_id == jobs.c.title_id).exists()
+        ))
+        db.session.execute(delete(titles).where(
+            titles.c.id.in_(title_ids), ~select(movies.c.id).where(movies.c.title_id == titles.c.id).exists()
+        ))
+
+    @staticmethod
+    def _queue_enrichment(title_id, name):
+        """
+        Queue the OMDb lookup of a pending title unless it is queued already, within the current transaction.
+
+        :param title_id: The unique identifier of the title.
+        :param name: The title to look up.
+        """
+        jobs = EnrichmentJob.__table__
+        db.session.execute(
+            sqlite_insert(jobs).values(title_id=title_id, title=name, status='queued', attempts=0,
+                                       next_attempt_at=time.time())
+            .on_conflict_do_nothing(index_elements=[jobs.c.title_id])
+        )
+
+    def _retitle(self, title_id, values, imdb_id=None):
+        """
+        Change the details of a title for every movie linking to it, within the current transaction.
+
+        If the new year makes it a film the catalog already has, the movies
+        are moved to that title, keeping the new details where they differ
+        from it, and the old title is removed; otherwise the title is updated
+        in place.
+
+        :param title_id: The unique identifier of the title.
+        :param values: The columns to change.
+        :param imdb_id: The IMDb ID of the title, if known.
+        :return: A list of (user_id, movie_id) tuples of the movies changed.
+        """
+        titles, movies = Title.__table__, Movie.__table__
+        old = db.session.execute(select(titles).where(titles.c.id == title_id)).first()
+        if old is None:
+            return []
+        affected = [tuple(row) for row in db.session.execute(
+            select(movies.c.user_id, movies.c.id).where(movies.c.title_id == title_id)
+        )]
+        details = dict(old._mapping, **values)
+        target = None
+        if details['year'] != old.year:
+            target = db.session.execute(
+                select(titles).where(titles.c.title_key == old.title_key, titles.c.year == details['year'])
+            ).first()
+        if target is None:
+            db.session.execute(update(titles).where(titles.c.id == title_id)
+                               .values(imdb_id=imdb_id or old.imdb_id, **values))
+        else:
+            db.session.execute(update(movies).where(movies.c.title_id == title_id).values(
+                title_id=target.id,
+                **{field: func.nullif(func.coalesce(movies.c[field], details[field]), target._mapping[field])
+                   for field in MOVIE_OVERRIDES}
+            ))
+            self._drop_unused_titles([title_id])
+            if imdb_id:
+                db.session.execute(update(titles).where(titles.c.id == target.id, titles.c.imdb_id.is_(None))
+                                   .values(imdb_id=imdb_id))
+        if affected and year_statistic(old.year) != year_statistic(details['year']):
+            self._adjust_statistics({year_statistic(old.year): -len(affected),
+                                     year_statistic(details['year']): len(affected)})
+        return affected
+
+    @retry_on_locked
+    def add_pending_movie(self, user_id, movie_name):
+        """
+        Add a movie right away and queue its OMDb enrichment.
+
+        If the catalog has a film of that name already enriched from OMDb,
+        the movie links to its title and no lookup is needed. Otherwise it
+        links to a title with placeholder details (year 0) and a 'pending'
+        enrichment status, shared with other users adding the same name
+        meanwhile, and the title's enrichment job is queued in the same
+        transaction.
+
+        :param user_id: The unique identifier of the user.
+        :param movie_name: The name of the movie to add.
+        :return: The unique identifier of the new movie.
+        """
+        titles, movies = Title.__table__, Movie.__table__
+        try:
+            title = db.session.execute(
+                select(titles)
+                .where(titles.c.title_key == normalize_title(movie_name), titles.c.enrichment_status == 'complete',
+                       titles.c.imdb_id.is_not(None))
+                .order_by(titles.c.id).limit(1)
+            ).first()
+            if title is None:
+                title = self._title({'name': movie_name, 'director': '', 'year': 0, 'rating': 0.0,
+                                     'enrichment_status': 'pending'})
+                self._queue_enrichment(title.id, movie_name)
+            name = None if movie_name == title.name else movie_name
+            movie_id = db.session.execute(
+                insert(movies).values(user_id=user_id, title_id=title.id, name=name).returning(movies.c.id)
+            ).scalar_one()
+            self._adjust_statistics({'total_movies': 1, user_statistic(user_id): 1, year_statistic(title.year): 1})
+            self._bump_versions(['movies', f'user:{user_id}'])
+            self._queue_recommendations([user_id])
+            db.session.commit()
+            return movie_id
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in add_pending_movie: {e}")
+            raise
+
+    @retry_on_locked
+    def claim_enrichment_jobs(self, limit=1, lease=60):
+        """
+        Atomically claim due enrichment jobs for a worker.
+
+        Queued jobs whose retry time has come, and running jobs whose lease
+        has expired, are marked running under a new lease in one UPDATE, so
+        concurrent workers (in any process) never claim the same job.
+
+        :param limit: The maximum number of jobs to claim.
+        :param lease: Seconds the worker has to finish the jobs.
+        :return: A list of dictionaries with id, title_id, title and attempts.
+        """
+        now = time.time()
+        try:
+            rows = db.session.execute(text(
+                "UPDATE enrichment_jobs SET status = 'running', locked_until = :locked_until, "
+                "attempts = attempts + 1 "
+                "WHERE id IN (SELECT id FROM enrichment_jobs "
+                "WHERE (status = 'queued' AND next_attempt_at <= :now) "
+                "OR (status = 'running' AND locked_until < :now) "
+                "ORDER BY next_attempt_at LIMIT :limit) "
+                "RETURNING id, title_id, title, attempts"
+            ), {'now': now, 'locked_until': now + lease, 'limit': limit}).mappings().all()
+            db.session.commit()
+            return [dict(row) for row in rows]
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in claim_enrichment_jobs: {e}")
+            raise
+
+    @retry_on_locked
+    def complete_enrichment(self, job_id, director, year, rating, imdb_id=None):
+        """
+        Store the OMDb details of a title and remove its enrichment job.
+
+        Every movie linking to the title gets the details at once.
+
+        :param job_id: The unique identifier of the enrichment job.
+        :param director: The director of the movie.
+        :param year: The year the movie was released.
+        :param rating: The rating of the movie.
+        :param imdb_id: The IMDb ID of the movie, if known.
+        :return: A list of (user_id, movie_id) tuples of the movies updated;
+            empty if the title is gone.
+        """
+        try:
+            job = db.session.get(EnrichmentJob, job_id)
+            if job is None:
+                return []
+            title_id = job.title_id
+            db.session.delete(job)
+            db.session.flush()
+            affected = self._retitle(title_id, {'director': director, 'year': year, 'rating': rating,
+                                                'enrichment_status': 'complete'}, imdb_id=imdb_id)
+            if affected:
+                user_ids = sorted({user_id for user_id, _ in affected})
+                self._bump_versions(['movies'] + [f'user:{user_id}' for user_id in user_ids])
+                self._queue_recommendations(user_ids)
+            db.session.commit()
+            return affected
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in complete_enrichment: {e}")
+            raise
+
+    @retry_on_locked
+    def fail_enrichment(self, job_id, error, retry_at=None):
+        """
+        Record a failed enrichment attempt.
+
+        :param job_id: The unique identifier of the enrichment job.
+        :param error: A description of the failure.
+        :param retry_at: Epoch time of the next attempt, or None to give up
+            and mark the title's enrichment as failed.
+        :return: A list of (user_id, movie_id) tuples of the movies marked
+            failed; empty while the job is retried.
+        """
+        try:
+            job = db.session.get(EnrichmentJob, job_id)
+            if job is None:
+                return []
+            job.last_error = str(error)
+            if retry_at is not None:
+                job.status = 'queued'
+                job.next_attempt_at = retry_at
+                job.locked_until = None
+                db.session.commit()
+                return []
+
+            job.status = 'failed'
+            db.session.flush()
+            affected = self._retitle(job.title_id, {'enrichment_status': 'failed'})
+            if affected:
+                user_ids = sorted({user_id for user_id, _ in affected})
+                self._bump_versions(['movies'] + [f'user:{user_id}' for user_id in user_ids])
+            db.session.commit()
+            return affected
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in fail_enrichment: {e}")
+            raise
+
     def get_movie_by_id(self, movie_id):
         """
         Retrieve a movie by its unique ID.
@@ -181,3 +1378,310 @@ class SQLiteDataManager(DataManagerInterface):
             db.session.rollback()
             current_app.logger.error(f"Database error in get_movie_by_id: {e}")
             return None
+
+    def get_recommendations(self, user_id, limit=10):
+        """
+        Retrieve a user's precomputed similar users and recommended movies.
+
+        Both lists are read by primary key prefix; nothing is computed here.
+
+        :param user_id: The unique identifier of the user.
+        :param limit: The maximum number of entries in each list.
+        :return: A dictionary with 'similar_users' (a list of SimilarUser),
+            'movies' (a list of MovieSuggestion) and 'pending' (whether a
+            refresh of this user is queued).
+        """
+        similarities, users = UserSimilarity.__table__, User.__table__
+        suggestions = MovieRecommendation.__table__
+        try:
+            similar = db.session.execute(
+                select(similarities.c.similar_user_id, users.c.name, similarities.c.score)
+                .join(users, users.c.id == similarities.c.similar_user_id)
+                .where(similarities.c.user_id == user_id).order_by(similarities.c.rank).limit(limit)
+            ).all()
+            movies = db.session.execute(
+                select(suggestions.c.name, suggestions.c.score, suggestions.c.supporters)
+                .where(suggestions.c.user_id == user_id).order_by(suggestions.c.rank).limit(limit)
+            ).all()
+            pending = db.session.get(RecommendationQueue, user_id) is not None
+            return {
+                'similar_users': [SimilarUser(*row) for row in similar],
+                'movies': [MovieSuggestion(*row) for row in movies],
+                'pending': pending
+            }
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in get_recommendations: {e}")
+            raise
+
+    def iter_ratings(self, batch_size=1000):
+        """
+        Stream the user, title and rating of every movie, for the recommender.
+
+        :param batch_size: The number of rows fetched from the database at a time.
+        :return: A generator of (user_id, title_id, name, rating) rows.
+        """
+        movies = Movie.__table__
+        statement = (select(movies.c.user_id, movies.c.title_id, movie_field('name'), movie_field('rating'))
+                     .select_from(movies_with_titles()))
+        return self._stream(statement, batch_size, 'iter_ratings')
+
+    def get_recommendation_queue(self):
+        """
+        Read the users whose recommendations are out of date.
+
+        :return: A tuple of (user ids, newest queued_at), to pass to store_recommendations.
+        """
+        try:
+            rows = db.session.execute(select(RecommendationQueue.user_id, RecommendationQueue.queued_at)).all()
+            db.session.commit()
+            return [row.user_id for row in rows], max((row.queued_at for row in rows), default=0.0)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in get_recommendation_queue: {e}")
+            raise
+
+    def get_dependent_users(self, user_ids):
+        """
+        Find users whose stored similar users include any of the given users.
+
+        :param user_ids: The users whose movies changed.
+        :return: A set of user ids.
+        """
+        similarities = UserSimilarity.__table__
+        try:
+            rows = db.session.execute(
+                select(similarities.c.user_id).where(similarities.c.similar_user_id.in_(user_ids)).distinct()
+            ).scalars().all()
+            db.session.commit()
+            return set(rows)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in get_dependent_users: {e}")
+            raise
+
+    @retry_on_locked
+    def store_recommendations(self, results, queued_before=None):
+        """
+        Replace the stored recommendations of some users in one transaction.
+
+        :param results: A mapping of user id to a (similar users, movies) tuple,
+            where similar users are (user_id, score) pairs and movies are
+            (title_id, name, score, supporters) tuples, best first.
+        :param queued_before: Remove these users from the queue unless they were
+            queued again after this time (the value from get_recommendation_queue).
+        """
+        similarities, suggestions = UserSimilarity.__table__, MovieRecommendation.__table__
+        queue = RecommendationQueue.__table__
+        user_ids = list(results)
+        try:
+            for chunk in (user_ids[i:i + 500] for i in range(0, len(user_ids), 500)):
+                db.session.execute(delete(similarities).where(similarities.c.user_id.in_(chunk)))
+                db.session.execute(delete(suggestions).where(suggestions.c.user_id.in_(chunk)))
+                if queued_before is not None:
+                    db.session.execute(delete(queue).where(queue.c.user_id.in_(chunk),
+                                                           queue.c.queued_at <= queued_before))
+            similar_rows = [{'user_id': user_id, 'rank': rank, 'similar_user_id': other, 'score': score}
+                            for user_id, (similar, _) in results.items()
+                            for rank, (other, score) in enumerate(similar, 1)]
+            movie_rows = [{'user_id': user_id, 'rank': rank, 'title_id': title_id, 'name': name, 'score': score,
+                           'supporters': supporters}
+                          for user_id, (_, movies) in results.items()
+                          for rank, (title_id, name, score, supporters) in enumerate(movies, 1)]
+            if similar_rows:
+                db.session.execute(insert(similarities), similar_rows)
+            if movie_rows:
+                db.session.execute(insert(suggestions), movie_rows)
+            self._bump_versions(['recommendations'])
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in store_recommendations: {e}")
+            raise
+
+    def get_statistics(self, year):
+        """
+        Retrieve the dashboard statistics from the precomputed counters.
+
+        :param year: The year whose movies are counted as recent activity.
+        :return: A dictionary with total_users, total_movies and movies_in_year.
+        """
+        names = {'total_users': 'total_users', 'total_movies': 'total_movies',
+                 year_statistic(year): 'movies_in_year'}
+        try:
+            rows = db.session.execute(
+                select(Statistic.name, Statistic.value).where(Statistic.name.in_(names))
+            ).all()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in get_statistics: {e}")
+            raise
+        statistics = dict.fromkeys(names.values(), 0)
+        statistics.update((names[name], value) for name, value in rows)
+        return statistics
+
+    def get_dashboard(self, year, limit=3):
+        """
+        Retrieve the dashboard statistics and recent movies from one snapshot.
+
+        :param year: The year whose movies are counted as recent activity.
+        :param limit: The maximum number of movies.
+        :return: A dictionary with 'recent_movies' and 'statistics', as
+            returned by get_recent_movies and get_statistics.
+        """
+        try:
+            rows = db.session.execute(dashboard_statement(year, limit)).all()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in get_dashboard: {e}")
+            raise
+        return dashboard_from_rows(rows)
+
+    def get_data_versions(self, scopes):
+        """
+        Retrieve the change counters of several data scopes.
+
+        :param scopes: The scope names, e.g. ['users', 'user:1'].
+        :return: A dictionary mapping each scope to a (version, updated_at)
+            tuple; scopes never written to are reported as (0, 0.0).
+        """
+        try:
+            rows = db.session.execute(
+                select(DataVersion.scope, DataVersion.version, DataVersion.updated_at)
+                .where(DataVersion.scope.in_(scopes))
+            ).all()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in get_data_versions: {e}")
+            raise
+        versions = dict.fromkeys(scopes, (0, 0.0))
+        versions.update((scope, (version, updated_at)) for scope, version, updated_at in rows)
+        return versions
+
+    def search(self, query, kind='movies', limit=20, after=None):
+        """
+        Full-text search over movie names and directors, or over user names.
+
+        Every word of the query is matched as a prefix, results are ordered by
+        BM25 relevance (title matches weigh more than director matches), and
+        pages are fetched with a keyset cursor on (rank, id).
+
+        :param query: The text to search for.
+        :param kind: 'movies' or 'users'.
+        :param limit: The maximum number of results.
+        :param after: Cursor (rank, id) of the last result of the previous page.
+        :return: A tuple of (results, next_cursor) where results is a list of
+            dictionaries and next_cursor is None on the last page.
+        """
+        match = fts_prefix_query(query)
+        if match is None:
+            return [], None
+
+        statement, rank, id_column = SEARCH_QUERIES[kind]
+        params = {'match': match, 'limit': limit + 1}
+        seek = ''
+        if after is not None:
+            seek = f"AND ({rank} > :rank OR ({rank} = :rank AND {id_column} > :id)) "
+            params['rank'], params['id'] = after
+        try:
+            rows = db.session.execute(text(statement.format(seek=seek)), params).mappings().all()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in search: {e}")
+            raise
+
+        results = [dict(row) for row in rows[:limit]]
+        next_cursor = (results[-1]['score'], results[-1]['id']) if len(rows) > limit else None
+        return results, next_cursor
+
+    @retry_on_locked
+    def rebuild_statistics(self):
+        """
+        Recompute every statistic from the users and movies tables.
+
+        Used to repair drift, e.g. after rows were changed outside the data manager.
+        """
+        try:
+            db.session.execute(Statistic.__table__.delete())
+            db.session.execute(text(
+                "INSERT INTO statistics (name, value) SELECT 'total_users', COUNT(*) FROM users"
+            ))
+            db.session.execute(text(
+                "INSERT INTO statistics (name, value) SELECT 'total_movies', COUNT(*) FROM movies"
+            ))
+            db.session.execute(text(
+                "INSERT INTO statistics (name, value) "
+                "SELECT 'movies_year:' || t.year, COUNT(*) FROM movies m JOIN titles t ON t.id = m.title_id "
+                "GROUP BY t.year"
+            ))
+            db.session.execute(text(
+                "INSERT INTO statistics (name, value) SELECT 'user_movies:' || user_id, COUNT(*) FROM movies "
+                "GROUP BY user_id"
+            ))
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            current_app.logger.error(f"Database error in rebuild_statistics: {e}")
+            raise
+
+    @staticmethod
+    def _statistic(name):
+        """
+        Read one precomputed counter.
+
+        :param name: The statistic name.
+        :return: Its value, 0 if it was never counted.
+        """
+        return db.session.execute(select(Statistic.value).where(Statistic.name == name)).scalar() or 0
+
+    @staticmethod
+    def _adjust_statistics(changes):
+        """
+        Add deltas to statistics within the current transaction.
+
+        The deltas are also recorded for the event broker, see pending_changes.
+
+        :param changes: A mapping of statistic names to the amount to add.
+        """
+        rows = [{'name': name, 'value': delta} for name, delta in changes.items() if delta]
+        if not rows:
+            return
+        pending_changes(db.session)['statistics'].update(changes)
+        statement = sqlite_insert(Statistic.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Statistic.name],
+            set_={'value': Statistic.__table__.c.value + statement.excluded.value}
+        )
+        db.session.execute(statement, rows)
+
+    @staticmethod
+    def _queue_recommendations(user_ids):
+        """
+        Mark users whose recommendations must be recomputed, within the current transaction.
+
+        :param user_ids: The users whose list of movies changed.
+        """
+        now = time.time()
+        statement = sqlite_insert(RecommendationQueue.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=[RecommendationQueue.user_id], set_={'queued_at': statement.excluded.queued_at}
+        )
+        db.session.execute(statement, [{'user_id': user_id, 'queued_at': now} for user_id in user_ids])
+
+    @staticmethod
+    def _bump_versions(scopes):
+        """
+        Increment the change counters of data scopes within the current transaction.
+
+        The scopes are also recorded for the event broker, see pending_changes.
+
+        :param scopes: The scope names touched by the write.
+        """
+        pending_changes(db.session)['scopes'].update(scopes)
+        now = time.time()
+        statement = sqlite_insert(DataVersion.__table__)
+        statement = statement.on_conflict_do_update(
+            index_elements=[DataVersion.scope],
+            set_={'version': DataVersion.__table__.c.version + 1, 'updated_at': statement.excluded.updated_at}
+        )
+        db.session.execute(statement, [{'scope': scope, 'version': 1, 'updated_at': now} for scope in scopes])
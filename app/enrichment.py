@@ -0,0 +1,174 @@
+import logging
+import random
+import threading
+import time
+from app.omdb.client import OMDbError, MovieNotFoundError, movie_details
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket limiting how often a resource may be used.
+    """
+
+    def __init__(self, rate, burst=1, timer=time.monotonic):
+        """
+        Initialize the rate limiter.
+
+        :param rate: Tokens added per second.
+        :param burst: Maximum number of tokens that can accumulate.
+        :param timer: Clock used for refills, mainly replaceable in tests.
+        """
+        self.rate = rate
+        self.burst = burst
+        self._timer = timer
+        self._tokens = float(burst)
+        self._updated_at = timer()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take one token, sleeping until one is available.
+        """
+        while True:
+            with self._lock:
+                now = self._timer()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class EnrichmentWorker:
+    """
+    Background worker pool filling in OMDb details of movies added in async mode.
+
+    Jobs live in the enrichment_jobs table, so nothing is lost on restart:
+    jobs a dead worker had claimed are picked up again once their lease
+    expires. Lookups are spread over a few threads, throttled by a token
+    bucket sized from the OMDb key's daily quota, and retried with
+    exponential backoff until ``max_attempts`` is reached. A title OMDb does
+    not know is not retried.
+    """
+
+    def __init__(self, app, workers=2, daily_quota=1000, burst=10, max_attempts=5,
+                 retry_backoff=30.0, poll_interval=5.0, lease=None):
+        """
+        Initialize the worker pool.
+
+        :param app: The Flask application instance.
+        :param workers: Number of worker threads.
+        :param daily_quota: OMDb requests allowed per day by the API key.
+        :param burst: Requests that may be made back to back before throttling.
+        :param max_attempts: Attempts before a job is given up.
+        :param retry_backoff: Base delay before a retry, doubled for each attempt, in seconds.
+        :param poll_interval: Seconds an idle worker waits before polling the queue again.
+        :param lease: Seconds a worker has to finish a claimed job. Defaults to
+            enough time to wait for the rate limiter while every thread is busy.
+        """
+        self.app = app
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+        self.rate_limiter = RateLimiter(rate=daily_quota / 86400.0, burst=burst)
+        self.lease = lease or max(60.0, 2 * workers / self.rate_limiter.rate)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads = []
+
+    @classmethod
+    def from_config(cls, app):
+        """
+        Build a worker pool from the Flask application configuration.
+
+        :param app: The Flask application instance.
+        :return: A configured EnrichmentWorker.
+        """
+        config = app.config
+        return cls(
+            app,
+            workers=config.get('ENRICHMENT_WORKERS', 2),
+            daily_quota=config.get('OMDB_DAILY_QUOTA', 1000),
+            burst=config.get('OMDB_RATE_BURST', 10),
+            max_attempts=config.get('ENRICHMENT_MAX_ATTEMPTS', 5),
+            retry_backoff=config.get('ENRICHMENT_RETRY_BACKOFF', 30.0),
+            poll_interval=config.get('ENRICHMENT_POLL_INTERVAL', 5.0)
+        )
+
+    def start(self):
+        """
+        Start the worker threads.
+        """
+        self._stopping.clear()
+        for number in range(self.workers):
+            thread = threading.Thread(target=self.run, name=f'enrichment-worker-{number}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """
+        Ask the worker threads to stop and wait for them.
+
+        :param timeout: Seconds to wait for each thread.
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self):
+        """
+        Wake up idle workers because a new job was queued.
+        """
+        self._wakeup.set()
+
+    def run(self):
+        """
+        Process jobs until stopped. Runs in each worker thread.
+        """
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            try:
+                self.app.schema.ensure()
+                processed = self.run_once()
+            except Exception as e:
+                logger.error(f"Enrichment worker error: {e}")
+                processed = False
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+
+    def run_once(self):
+        """
+        Claim and process a single due job.
+
+        :return: True if a job was processed, False if the queue had none due.
+        """
+        with self.app.app_context():
+            data_manager = self.app.data_manager
+            jobs = data_manager.claim_enrichment_jobs(limit=1, lease=self.lease)
+            if not jobs:
+                return False
+            job = jobs[0]
+
+            try:
+                payload = self.app.omdb_client.lookup(job['title'], rate_limiter=self.rate_limiter)
+            except MovieNotFoundError as e:
+                logger.info(f"No OMDb match for '{job['title']}': {e}")
+                data_manager.fail_enrichment(job['id'], e)
+            except OMDbError as e:
+                if job['attempts'] >= self.max_attempts:
+                    logger.warning(f"Giving up enrichment of '{job['title']}' after {job['attempts']} attempts: {e}")
+                    data_manager.fail_enrichment(job['id'], e)
+                else:
+                    delay = self.retry_backoff * 2 ** (job['attempts'] - 1) * random.uniform(0.5, 1.5)
+                    data_manager.fail_enrichment(job['id'], e, retry_at=time.time() + delay)
+            else:
+                director, year, rating = movie_details(payload)
+                data_manager.complete_enrichment(job['id'], director, year, rating, imdb_id=payload.get('imdbID'))
+            return True
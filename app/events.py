@@ -0,0 +1,130 @@
+import asyncio
+import threading
+
+# Delivered by Subscription.get in place of the events a slow subscriber missed
+OVERFLOW = None
+
+
+class Subscription:
+    """
+    A subscriber's queue of events, consumed on its asyncio event loop.
+    """
+
+    def __init__(self, broker, loop, maxsize):
+        """
+        Initialize the subscription.
+
+        :param broker: The EventBroker delivering to this subscription.
+        :param loop: The event loop the subscriber runs on.
+        :param maxsize: The number of undelivered events kept before overflowing.
+        """
+        self.broker = broker
+        self.loop = loop
+        self._queue = asyncio.Queue(maxsize)
+
+    def deliver(self, event):
+        """
+        Queue an event. Runs on the subscriber's event loop.
+
+        When the queue is full, the backlog is dropped and replaced with a
+        single OVERFLOW marker, so the subscriber knows to reload its state.
+
+        :param event: The published event.
+        """
+        if self._queue.full():
+            self.drain()
+            event = OVERFLOW
+        self._queue.put_nowait(event)
+
+    async def get(self):
+        """
+        Wait for the next event.
+
+        :return: The event, or OVERFLOW if events were dropped.
+        """
+        return await self._queue.get()
+
+    def drain(self):
+        """
+        Take every event already queued, without waiting.
+
+        :return: A list of events, possibly containing OVERFLOW.
+        """
+        events = []
+        while not self._queue.empty():
+            events.append(self._queue.get_nowait())
+        return events
+
+    def close(self):
+        """
+        Stop receiving events.
+        """
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """
+    In-process publish/subscribe of data changes.
+
+    Publishers are the data manager's write methods, which publish from
+    request and worker threads once their transaction has committed;
+    subscribers are asyncio consumers such as the dashboard event stream.
+    publish() never blocks on a subscriber: each event is handed to the
+    subscriber's event loop with call_soon_threadsafe and queued there.
+    """
+
+    def __init__(self, maxsize=100):
+        """
+        Initialize the broker.
+
+        :param maxsize: The number of undelivered events kept per subscriber.
+        """
+        self.maxsize = maxsize
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, app):
+        """
+        Build a broker from the Flask application configuration.
+
+        :param app: The Flask application instance.
+        :return: A configured EventBroker.
+        """
+        return cls(maxsize=app.config.get('EVENT_QUEUE_SIZE', 100))
+
+    def subscribe(self, loop=None):
+        """
+        Start receiving the published events on an event loop.
+
+        :param loop: The subscriber's event loop; defaults to the running loop.
+        :return: A Subscription.
+        """
+        subscription = Subscription(self, loop or asyncio.get_running_loop(), self.maxsize)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Stop delivering events to a subscription.
+
+        :param subscription: The Subscription returned by subscribe.
+        """
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        """
+        Deliver an event to every subscription. Safe to call from any thread.
+
+        :param event: A JSON-serializable dictionary describing the change.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The subscriber's event loop is closed
+                self.unsubscribe(subscription)
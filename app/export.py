@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+import zlib
+
+EXPORT_FORMATS = ('json', 'csv', 'ndjson')
+MIMETYPES = {'json': 'application/json', 'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+USER_FIELDS = ('id', 'name')
+MOVIE_FIELDS = ('id', 'user_id', 'name', 'director', 'year', 'rating', 'enrichment_status')
+COLLECTION_FIELDS = ('user_id', 'user_name', 'movie_id', 'name', 'director', 'year', 'rating',
+                     'enrichment_status')
+
+CHUNK_SIZE = 64 * 1024
+
+
+def json_array(items):
+    """
+    Serialize items as a JSON array, one element at a time.
+
+    :param items: An iterable of JSON-serializable values.
+    :return: A generator of string pieces forming the array.
+    """
+    yield '['
+    for number, item in enumerate(items):
+        yield (',' if number else '') + json.dumps(item)
+    yield ']'
+
+
+def ndjson_lines(items):
+    """
+    Serialize items as JSON Lines.
+
+    :param items: An iterable of JSON-serializable values.
+    :return: A generator of lines.
+    """
+    for item in items:
+        yield json.dumps(item) + '\n'
+
+
+def csv_lines(header, rows):
+    """
+    Serialize rows as CSV.
+
+    :param header: The column names.
+    :param rows: An iterable of row sequences.
+    :return: A generator of CSV lines, starting with the header.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in _prepend(header, rows):
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def user_movies_export(records, fmt):
+    """
+    Serialize a user's movies.
+
+    :param records: An iterable of MovieRecord.
+    :param fmt: One of EXPORT_FORMATS.
+    :return: A generator of string pieces.
+    """
+    if fmt == 'csv':
+        return csv_lines(MOVIE_FIELDS, ([getattr(movie, field) for field in MOVIE_FIELDS] for movie in records))
+    items = ({field: getattr(movie, field) for field in MOVIE_FIELDS} for movie in records)
+    return json_array(items) if fmt == 'json' else ndjson_lines(items)
+
+
+def database_export(data_manager, fmt, batch_size=1000):
+    """
+    Serialize every user and movie.
+
+    JSON is an object with a "users" and a "movies" array and JSON Lines has
+    one line per user then one per movie, each tagged with its "type"; both
+    stream the two tables one after the other. CSV has one row per movie with
+    its user's id and name, plus a row with empty movie columns for each user
+    without movies.
+
+    :param data_manager: The data manager to read from.
+    :param fmt: One of EXPORT_FORMATS.
+    :param batch_size: The number of rows fetched from the database at a time.
+    :return: A generator of string pieces.
+    """
+    def users():
+        return ({field: getattr(user, field) for field in USER_FIELDS}
+                for user in data_manager.iter_users(batch_size=batch_size))
+
+    def movies():
+        return ({field: getattr(movie, field) for field in MOVIE_FIELDS}
+                for movie in data_manager.iter_movies(batch_size=batch_size))
+
+    if fmt == 'json':
+        yield '{"users":'
+        yield from json_array(users())
+        yield ',"movies":'
+        yield from json_array(movies())
+        yield '}'
+    elif fmt == 'ndjson':
+        yield from ndjson_lines(dict(item, type='user') for item in users())
+        yield from ndjson_lines(dict(item, type='movie') for item in movies())
+    else:
+        no_movie = [None] * (len(COLLECTION_FIELDS) - 2)
+        yield from csv_lines(COLLECTION_FIELDS, (
+            [user.id, user.name] + ([movie.id, movie.name, movie.director, movie.year, movie.rating,
+                                     movie.enrichment_status] if movie else no_movie)
+            for user, movie in data_manager.iter_collection(batch_size=batch_size)
+        ))
+
+
+def encode_chunks(pieces, chunk_size=CHUNK_SIZE):
+    """
+    Join small string pieces into byte chunks of a reasonable size.
+
+    :param pieces: An iterable of strings.
+    :param chunk_size: The size a chunk has to reach before it is sent.
+    :return: A generator of UTF-8 encoded chunks.
+    """
+    buffer = []
+    size = 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= chunk_size:
+            yield ''.join(buffer).encode()
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+def gzip_chunks(chunks, level=6):
+    """
+    Compress a stream of byte chunks into a gzip stream.
+
+    :param chunks: An iterable of bytes.
+    :param level: The compression level, 1 (fastest) to 9 (smallest).
+    :return: A generator of compressed chunks.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _prepend(first, rows):
+    yield first
+    yield from rows
@@ -0,0 +1,88 @@
+from flask import current_app, g
+from markupsafe import Markup
+from app.cache import TTLCache
+from app.metrics import Counter
+
+
+class FragmentCache:
+    """
+    Rendered HTML fragments keyed on the data versions they were built from.
+
+    A fragment is stored under its name, the arguments that shape it (page,
+    cursor, search) and the current versions of the data scopes it depends
+    on. Every write through the data manager bumps the versions of the
+    scopes it touches, so the next request looks up a new key and renders
+    afresh; stale entries are never served and simply age out of the LRU.
+    On a hit neither the page query nor the template runs.
+    """
+
+    def __init__(self, maxsize=512, ttl=300):
+        """
+        Initialize the fragment cache.
+
+        :param maxsize: Maximum number of fragments kept.
+        :param ttl: Time-to-live of a fragment, in seconds.
+        """
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._stats = Counter()
+
+    @classmethod
+    def from_config(cls, app):
+        """
+        Build the fragment cache from the Flask application configuration.
+
+        :param app: The Flask application instance.
+        :return: A configured FragmentCache.
+        """
+        return cls(maxsize=app.config.get('FRAGMENT_CACHE_SIZE', 512),
+                   ttl=app.config.get('FRAGMENT_CACHE_TTL', 300))
+
+    def render(self, name, scopes, key, render):
+        """
+        Return a cached fragment, rendering and storing it on a miss.
+
+        :param name: The fragment name, e.g. 'movie_grid'.
+        :param scopes: The data scopes the fragment depends on.
+        :param key: A hashable value covering every other input of the fragment.
+        :param render: A callable returning the fragment's HTML.
+        :return: The fragment as Markup.
+        """
+        versions = data_versions(scopes)
+        cache_key = (name, key, tuple(sorted((scope, version) for scope, (version, _) in versions.items())))
+        fragment = self._cache.get(cache_key)
+        if fragment is not None:
+            self._stats.inc('hits')
+            return fragment
+
+        self._stats.inc('misses')
+        fragment = Markup(render())
+        self._cache.set(cache_key, fragment)
+        return fragment
+
+    def stats(self):
+        """
+        Report the cache activity.
+
+        :return: A dictionary with hits, misses, the hit ratio and the number of cached fragments.
+        """
+        stats = self._stats.snapshot()
+        hits, misses = stats.get('hits', 0), stats.get('misses', 0)
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+            'size': len(self._cache)
+        }
+
+
+def data_versions(scopes):
+    """
+    Get the versions of some data scopes, reusing those already read by this request.
+
+    :param scopes: The scope names.
+    :return: A dictionary mapping each scope to a (version, updated_at) tuple.
+    """
+    known = g.get('data_versions') or {}
+    if all(scope in known for scope in scopes):
+        return {scope: known[scope] for scope in scopes}
+    return current_app.data_manager.get_data_versions(scopes)
@@ -0,0 +1,110 @@
+import functools
+import hashlib
+import os
+import time
+from flask import current_app, g, request, make_response
+from sqlalchemy.exc import SQLAlchemyError
+
+_fingerprint = None
+
+
+def code_fingerprint():
+    """
+    Fingerprint the templates and modules that shape a response.
+
+    Mixed into every ETag so a deploy that changes the output invalidates
+    validators held by clients. Computed once per process; every worker of a
+    deploy sees the same files and therefore the same value.
+
+    :return: A short hexadecimal digest.
+    """
+    global _fingerprint
+    if _fingerprint is None:
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha1()
+        for root, _, files in os.walk(package_dir):
+            for name in sorted(files):
+                if name.endswith(('.py', '.html')):
+                    stat = os.stat(os.path.join(root, name))
+                    digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        _fingerprint = digest.hexdigest()[:12]
+    return _fingerprint
+
+
+def cache_control(max_age=0):
+    """
+    Build the Cache-Control header value.
+
+    :param max_age: The HTTP_CACHE_MAX_AGE setting, in seconds.
+    :return: 'no-cache' (always revalidate) for 0, or a private max-age.
+    """
+    return f"private, max-age={max_age}" if max_age else 'private, no-cache'
+
+
+def validators(endpoint, query_string, versions):
+    """
+    Derive the ETag and Last-Modified of a response from data versions.
+
+    :param endpoint: The name of the endpoint serving the response.
+    :param query_string: The raw query string of the request.
+    :param versions: The data versions as returned by get_data_versions.
+    :return: A tuple of (etag, last_modified), where last_modified is an
+        epoch second or None when it cannot be trusted yet.
+    """
+    key = '|'.join([code_fingerprint(), endpoint, query_string]
+                   + [f"{scope}={version}" for scope, (version, _) in sorted(versions.items())])
+    etag = hashlib.sha1(key.encode()).hexdigest()
+    updated_at = max((updated_at for _, updated_at in versions.values()), default=0.0)
+
+    # Last-Modified has a one second resolution, so it is only sent once
+    # the newest write is in an earlier second than this response.
+    last_modified = int(updated_at) if updated_at and time.time() - updated_at >= 1 else None
+    return etag, last_modified
+
+
+def conditional(scopes):
+    """
+    Make a view answer conditional GETs from the data versions alone.
+
+    The ETag is derived from the view, its arguments, the query string and
+    the versions of the data scopes it depends on, so a matching
+    If-None-Match (or a recent enough If-Modified-Since) is answered with 304
+    before the view runs any query or renders any template.
+
+    :param scopes: A callable receiving the view arguments and returning the
+        scope names the response depends on, e.g. ``lambda user_id: [f'user:{user_id}']``.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get('HTTP_CACHE_ENABLED', True):
+                return view(*args, **kwargs)
+
+            try:
+                versions = current_app.data_manager.get_data_versions(scopes(**kwargs))
+            except SQLAlchemyError:
+                return view(*args, **kwargs)
+            g.data_versions = versions  # reused by the fragment cache
+            etag, last_modified = validators(request.endpoint, request.query_string.decode(), versions)
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            elif request.if_modified_since and last_modified is not None:
+                not_modified = last_modified <= request.if_modified_since.timestamp()
+            else:
+                not_modified = False
+
+            if not_modified:
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = cache_control(current_app.config.get('HTTP_CACHE_MAX_AGE', 0))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,286 @@
+import collections
+import cProfile
+import os
+import random
+import re
+import threading
+import time
+from flask import current_app, g, has_request_context, request, before_render_template, template_rendered
+from sqlalchemy import event
+from app.metrics import Counter, Histogram, HistogramFamily, prometheus_counter, prometheus_histogram
+
+# Query budget applied in debug and testing mode when QUERY_BUDGET is not set
+DEFAULT_QUERY_BUDGET = 20
+
+
+class QueryBudgetExceeded(Exception):
+    """
+    Raised when a request runs more SQL queries than the query budget allows.
+    """
+    pass
+
+
+class RequestTimings:
+    """
+    Time spent in SQL, template rendering and OMDb during one request.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.omdb_count = 0
+        self.omdb_time = 0.0
+        self.statements = collections.Counter()
+
+    def server_timing(self):
+        """
+        Format the timings as a Server-Timing header value.
+
+        :return: The header value, with durations in milliseconds.
+        """
+        total = time.perf_counter() - self.started
+        metrics = [
+            f'sql;dur={self.sql_time * 1000:.2f};desc="{self.sql_count} queries"',
+            f'render;dur={self.render_time * 1000:.2f}',
+        ]
+        if self.omdb_count:
+            metrics.append(f'omdb;dur={self.omdb_time * 1000:.2f};desc="{self.omdb_count} requests"')
+        metrics.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(metrics)
+
+
+def current_timings():
+    """
+    Get the timings of the request being handled by this thread.
+
+    :return: The RequestTimings, or None outside a request (e.g. in background workers).
+    """
+    if not has_request_context():
+        return None
+    return g.get('request_timings')
+
+
+class Instrumentation:
+    """
+    Per-request SQL, template and OMDb timings, process-wide metrics and an opt-in profiler.
+
+    Each request gets a Server-Timing header breaking its duration down into
+    SQL, Jinja rendering and OMDb calls. The same measurements feed
+    Prometheus histograms served by ``/metrics``. When profiling is enabled,
+    a request carrying ``X-Profile: 1`` (or ``?_profile=1``), or picked by
+    the sampling rate, is run under cProfile and the profile is written to
+    the profile directory; one request is profiled at a time.
+
+    A request running more SQL queries than the query budget is reported
+    with its most repeated statement, which is usually a lazy relationship
+    loaded once per row (an N+1 query). The budget applies in debug and
+    testing mode unless set explicitly.
+    """
+
+    def __init__(self, profiling_enabled=False, profile_dir='profiles', profile_sample_rate=0.0,
+                 query_budget=None, query_budget_raise=False):
+        """
+        Initialize the instrumentation.
+
+        :param profiling_enabled: Whether requests may be profiled at all.
+        :param profile_dir: Directory the .prof files are written to.
+        :param profile_sample_rate: Fraction of requests profiled without being asked, 0 to 1.
+        :param query_budget: Maximum number of SQL queries per request, or None
+            for DEFAULT_QUERY_BUDGET in debug and testing mode only.
+        :param query_budget_raise: Raise QueryBudgetExceeded instead of only
+            logging a warning, e.g. to fail tests.
+        """
+        self.profiling_enabled = profiling_enabled
+        self.profile_dir = profile_dir
+        self.profile_sample_rate = profile_sample_rate
+        self.query_budget = query_budget
+        self.query_budget_raise = query_budget_raise
+        self.budget_violations = Counter()
+        self.requests = Counter()
+        self.request_latency = HistogramFamily()
+        self.sql_latency = Histogram(buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0))
+        self.render_latency = HistogramFamily()
+        self._profiler_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, app):
+        """
+        Build the instrumentation from the Flask application configuration.
+
+        :param app: The Flask application instance.
+        :return: A configured Instrumentation.
+        """
+        config = app.config
+        return cls(
+            profiling_enabled=config.get('PROFILING_ENABLED', False),
+            profile_dir=config.get('PROFILE_DIR', os.path.abspath(os.path.join(app.root_path, '..', 'profiles'))),
+            profile_sample_rate=config.get('PROFILE_SAMPLE_RATE', 0.0),
+            query_budget=config.get('QUERY_BUDGET'),
+            query_budget_raise=config.get('QUERY_BUDGET_RAISE', False)
+        )
+
+    def install(self, app, engine, omdb_client=None):
+        """
+        Hook the instrumentation into the application, its engine and the OMDb client.
+
+        :param app: The Flask application instance.
+        :param engine: The SQLAlchemy engine whose queries are timed.
+        :param omdb_client: Optional OMDbClient whose requests are timed.
+        """
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(engine, 'handle_error', self._handle_error)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        if omdb_client is not None:
+            self.watch_omdb(omdb_client)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def watch_omdb(self, omdb_client):
+        """
+        Time the requests of an OMDb client, e.g. one built after install().
+
+        :param omdb_client: The OMDbClient.
+        """
+        omdb_client.listeners.append(self._omdb_request)
+
+    def _before_request(self):
+        g.request_timings = RequestTimings()
+        if self.profiling_enabled and self._wants_profile() and self._profiler_lock.acquire(blocking=False):
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    def _after_request(self, response):
+        timings = g.pop('request_timings', None)
+        profile_file = self._stop_profiler()
+        if profile_file:
+            response.headers['X-Profile-File'] = os.path.basename(profile_file)
+        if timings is None:
+            return response
+
+        endpoint = request.endpoint or 'unknown'
+        self.requests.inc((request.method, endpoint, str(response.status_code)))
+        self.request_latency.labels(endpoint).observe(time.perf_counter() - timings.started)
+        response.headers['Server-Timing'] = timings.server_timing()
+
+        budget = self._query_budget()
+        if budget is not None and timings.sql_count > budget:
+            self._report_budget_violation(endpoint, timings, budget)
+        return response
+
+    def _query_budget(self):
+        if self.query_budget is not None:
+            return self.query_budget
+        return DEFAULT_QUERY_BUDGET if current_app.debug or current_app.testing else None
+
+    def _report_budget_violation(self, endpoint, timings, budget):
+        """
+        Log (or raise) a request that ran more queries than the budget allows.
+
+        :param endpoint: The endpoint of the request.
+        :param timings: The request's RequestTimings.
+        :param budget: The query budget.
+        :raises QueryBudgetExceeded: If query_budget_raise is set.
+        """
+        self.budget_violations.inc(endpoint)
+        statement, repeats = timings.statements.most_common(1)[0]
+        message = (f"{request.method} {request.path} ran {timings.sql_count} SQL queries, over the budget of "
+                   f"{budget}. Most repeated ({repeats} times): {' '.join(statement.split())[:300]}")
+        if self.query_budget_raise:
+            raise QueryBudgetExceeded(message)
+        current_app.logger.warning(message)
+
+    def _teardown_request(self, error=None):
+        # after_request is skipped when a response could not be built at all
+        self._stop_profiler()
+
+    def _wants_profile(self):
+        if request.headers.get('X-Profile') == '1' or request.args.get('_profile') == '1':
+            return True
+        return self.profile_sample_rate > 0 and random.random() < self.profile_sample_rate
+
+    def _stop_profiler(self):
+        """
+        Stop this request's profiler, if any, and write its profile to disk.
+
+        :return: The path of the profile, or None if the request was not profiled.
+        """
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return None
+        try:
+            profiler.disable()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            endpoint = re.sub(r'[^\w.-]', '_', request.endpoint or 'unknown')
+            path = os.path.join(self.profile_dir, f"{time.time_ns() // 1000000}-{endpoint}.prof")
+            profiler.dump_stats(path)
+            return path
+        finally:
+            self._profiler_lock.release()
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started'].pop()
+        self.sql_latency.observe(elapsed)
+        timings = current_timings()
+        if timings is not None:
+            timings.sql_count += 1
+            timings.sql_time += elapsed
+            timings.statements[statement] += 1
+
+    @staticmethod
+    def _handle_error(context):
+        started = context.connection.info.get('query_started') if context.connection is not None else None
+        if started:
+            started.pop()
+
+    @staticmethod
+    def _before_render(sender, template, context, **extra):
+        g.setdefault('render_started', []).append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        elapsed = time.perf_counter() - g.render_started.pop()
+        self.render_latency.labels(template.name or 'string').observe(elapsed)
+        timings = current_timings()
+        if timings is not None:
+            timings.render_time += elapsed
+
+    @staticmethod
+    def _omdb_request(elapsed, outcome):
+        timings = current_timings()
+        if timings is not None:
+            timings.omdb_count += 1
+            timings.omdb_time += elapsed
+
+    def render_metrics(self, omdb_client=None):
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        :param omdb_client: Optional OMDbClient whose request metrics are included.
+        :return: The metrics page.
+        """
+        lines = []
+        lines += prometheus_counter('movieweb_http_requests_total', 'HTTP requests handled.',
+                                    ('method', 'endpoint', 'status'), self.requests.snapshot())
+        lines += prometheus_histogram('movieweb_http_request_duration_seconds', 'Time to handle a request.',
+                                      ('endpoint',), self.request_latency.snapshot())
+        lines += prometheus_counter('movieweb_query_budget_exceeded_total',
+                                    'Requests that ran more SQL queries than the query budget.',
+                                    ('endpoint',), self.budget_violations.snapshot())
+        lines += prometheus_histogram('movieweb_sql_query_duration_seconds', 'Time to execute an SQL statement.',
+                                      (), {(): self.sql_latency.snapshot()})
+        lines += prometheus_histogram('movieweb_template_render_duration_seconds', 'Time to render a template.',
+                                      ('template',), self.render_latency.snapshot())
+        if omdb_client is not None:
+            lines += prometheus_counter('movieweb_omdb_requests_total', 'OMDb API requests by outcome.',
+                                        ('outcome',), omdb_client.calls.snapshot())
+            lines += prometheus_histogram('movieweb_omdb_request_duration_seconds', 'Time of an OMDb API request.',
+                                          (), {(): omdb_client.latency.snapshot()})
+        return '\n'.join(lines) + '\n'
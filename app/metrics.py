@@ -0,0 +1,183 @@
+import bisect
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def format_bound(bound):
+    """
+    Format a bucket upper bound the way Prometheus expects it.
+
+    :param bound: The upper bound, possibly infinite.
+    :return: The bound as a string, '+Inf' for infinity.
+    """
+    return '+Inf' if bound == float('inf') else format(bound, 'g')
+
+
+class Histogram:
+    """
+    A thread-safe latency histogram with cumulative buckets.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initialize the histogram.
+
+        :param buckets: Sorted upper bounds of the buckets, in seconds.
+        """
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        """
+        Record one observation.
+
+        :param value: The observed duration, in seconds.
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+            self._max = max(self._max, value)
+
+    def snapshot(self):
+        """
+        Return a consistent copy of the histogram.
+
+        :return: A dictionary with count, sum, max and cumulative bucket counts
+            keyed by the formatted upper bound ('+Inf' for the last one).
+        """
+        with self._lock:
+            counts = list(self._counts)
+            result = {'count': self._count, 'sum': self._sum, 'max': self._max}
+        cumulative = {}
+        running = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            running += count
+            cumulative[format_bound(bound)] = running
+        result['buckets'] = cumulative
+        return result
+
+
+class Counter:
+    """
+    A thread-safe set of counters keyed by label.
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label, amount=1):
+        """
+        Increment the counter for a label.
+
+        :param label: The label to increment.
+        :param amount: The amount to add.
+        """
+        with self._lock:
+            self._values[label] = self._values.get(label, 0) + amount
+
+    def snapshot(self):
+        """
+        Return a copy of all counters.
+
+        :return: A dictionary mapping labels to counts.
+        """
+        with self._lock:
+            return dict(self._values)
+
+
+class HistogramFamily:
+    """
+    A set of histograms sharing the same buckets, one per combination of label values.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        Initialize the family.
+
+        :param buckets: Sorted upper bounds of the buckets, in seconds.
+        """
+        self.buckets = tuple(buckets)
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """
+        Get the histogram for a combination of label values, creating it if needed.
+
+        :param values: The label values, in the order of the family's label names.
+        :return: The Histogram.
+        """
+        with self._lock:
+            histogram = self._histograms.get(values)
+            if histogram is None:
+                histogram = self._histograms[values] = Histogram(self.buckets)
+            return histogram
+
+    def snapshot(self):
+        """
+        Return a copy of every histogram in the family.
+
+        :return: A dictionary mapping label value tuples to histogram snapshots.
+        """
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {values: histogram.snapshot() for values, histogram in histograms.items()}
+
+
+def format_labels(names, values):
+    """
+    Format label pairs for the Prometheus text format.
+
+    :param names: The label names.
+    :param values: The label values.
+    :return: A string like '{method="GET",status="200"}', or '' without labels.
+    """
+    if not names:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+
+def prometheus_counter(name, description, label_names, values):
+    """
+    Render a counter in the Prometheus text exposition format.
+
+    :param name: The metric name.
+    :param description: The HELP text.
+    :param label_names: The label names.
+    :param values: A dictionary mapping label value tuples (or a single
+        value for one label) to counts.
+    :return: A list of lines.
+    """
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+    for labels, value in sorted(values.items(), key=lambda item: str(item[0])):
+        labels = labels if isinstance(labels, tuple) else (labels,)
+        lines.append(f"{name}{format_labels(label_names, labels)} {value}")
+    return lines
+
+
+def prometheus_histogram(name, description, label_names, snapshots):
+    """
+    Render histograms in the Prometheus text exposition format.
+
+    :param name: The metric name.
+    :param description: The HELP text.
+    :param label_names: The label names.
+    :param snapshots: A dictionary mapping label value tuples to Histogram snapshots.
+    :return: A list of lines.
+    """
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+    for labels, snapshot in sorted(snapshots.items(), key=lambda item: str(item[0])):
+        for bound, count in snapshot['buckets'].items():
+            lines.append(f"{name}_bucket{format_labels(label_names + ('le',), labels + (bound,))} {count}")
+        lines.append(f"{name}_sum{format_labels(label_names, labels)} {snapshot['sum']}")
+        lines.append(f"{name}_count{format_labels(label_names, labels)} {snapshot['count']}")
+    return lines
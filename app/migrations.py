@@ -0,0 +1,496 @@
+import logging
+from app.omdb.client import normalize_title
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    """
+    Register a schema migration.
+
+    The migration function receives a SQLAlchemy connection that is already
+    inside the migration's transaction. Every database, new or old, goes
+    through the migrations in order from the original schema, so a migration
+    can rely on the tables being in the shape the previous one left them.
+
+    :param version: The schema version the migration brings the database to.
+    :param description: A short human-readable description.
+    """
+    def register(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda item: item[0])
+        return func
+    return register
+
+
+def head_version():
+    """
+    Return the schema version of the newest migration.
+
+    :return: The highest registered version, or 0 if there are none.
+    """
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def current_version(conn):
+    """
+    Read the schema version of a database.
+
+    :param conn: A SQLAlchemy connection.
+    :return: The version stored in SQLite's ``user_version`` header field.
+    """
+    return conn.exec_driver_sql('PRAGMA user_version').scalar()
+
+
+def pending_migrations(conn):
+    """
+    List the migrations not yet applied to a database.
+
+    :param conn: A SQLAlchemy connection.
+    :return: A list of (version, description, func) tuples in order.
+    """
+    version = current_version(conn)
+    return [item for item in MIGRATIONS if item[0] > version]
+
+
+def table_columns(conn, table):
+    """
+    List the columns of a table.
+
+    Migration 7 uses it to tell which tables it still has to convert.
+
+    :param conn: A SQLAlchemy connection.
+    :param table: The table name.
+    :return: A list of column names, empty if the table does not exist.
+    """
+    return [row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info({table})')]
+
+
+def create_baseline(conn):
+    """
+    Create the tables of the original schema (version 0) in an empty database.
+
+    Every later table, column and index is added by the numbered migrations.
+
+    :param conn: A SQLAlchemy connection inside a transaction.
+    """
+    conn.exec_driver_sql(
+        'CREATE TABLE users (id INTEGER NOT NULL, name VARCHAR(50) NOT NULL, PRIMARY KEY (id))'
+    )
+    conn.exec_driver_sql(
+        'CREATE TABLE movies ('
+        'id INTEGER NOT NULL, user_id INTEGER NOT NULL, name VARCHAR(100) NOT NULL, '
+        'director VARCHAR(100) NOT NULL, year INTEGER NOT NULL, rating FLOAT NOT NULL, '
+        'PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES users (id))'
+    )
+
+
+def is_current(engine):
+    """
+    Check whether a database is at the latest schema version.
+
+    :param engine: The SQLAlchemy engine of the application database.
+    :return: True if no migration is pending.
+    """
+    with engine.connect() as conn:
+        return current_version(conn) >= head_version()
+
+
+def upgrade(engine):
+    """
+    Apply every pending migration, each in its own transaction.
+
+    Each migration runs under ``BEGIN IMMEDIATE``, which takes SQLite's write
+    lock up front, and re-checks the version once the lock is held. Several
+    processes starting at the same time therefore apply each migration once.
+    An empty database first gets the original tables (create_baseline).
+
+    :param engine: The SQLAlchemy engine of the application database.
+    :return: A list of the versions that were applied.
+    """
+    applied = []
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level='AUTOCOMMIT')
+        conn.exec_driver_sql('BEGIN IMMEDIATE')
+        try:
+            if current_version(conn) == 0 and not table_columns(conn, 'users'):
+                create_baseline(conn)
+            conn.exec_driver_sql('COMMIT')
+        except Exception:
+            conn.exec_driver_sql('ROLLBACK')
+            raise
+        for version, description, func in MIGRATIONS:
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+            try:
+                if current_version(conn) >= version:
+                    conn.exec_driver_sql('ROLLBACK')
+                    continue
+                func(conn)
+                conn.exec_driver_sql(f'PRAGMA user_version = {int(version)}')
+                conn.exec_driver_sql('COMMIT')
+            except Exception:
+                conn.exec_driver_sql('ROLLBACK')
+                raise
+            logger.info(f"Applied schema migration {version}: {description}")
+            applied.append(version)
+    return applied
+
+
+@migration(1, 'Add indexes on movies(user_id, id), movies(year) and users(name)')
+def add_lookup_indexes(conn):
+    conn.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_movies_user_id_id ON movies (user_id, id)')
+    conn.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_movies_year ON movies (year)')
+    conn.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_users_name ON users (name COLLATE NOCASE)')
+    conn.exec_driver_sql('ANALYZE')
+
+
+@migration(2, 'Add the statistics table and fill it from users and movies')
+def add_statistics_table(conn):
+    conn.exec_driver_sql(
+        'CREATE TABLE IF NOT EXISTS statistics ('
+        'name VARCHAR(50) NOT NULL, value INTEGER NOT NULL, PRIMARY KEY (name))'
+    )
+    conn.exec_driver_sql('DELETE FROM statistics')
+    conn.exec_driver_sql("INSERT INTO statistics (name, value) SELECT 'total_users', COUNT(*) FROM users")
+    conn.exec_driver_sql("INSERT INTO statistics (name, value) SELECT 'total_movies', COUNT(*) FROM movies")
+    conn.exec_driver_sql(
+        "INSERT INTO statistics (name, value) "
+        "SELECT 'movies_year:' || year, COUNT(*) FROM movies GROUP BY year"
+    )
+
+
+@migration(3, 'Add the data_versions table used for HTTP validators')
+def add_data_versions_table(conn):
+    conn.exec_driver_sql(
+        'CREATE TABLE IF NOT EXISTS data_versions ('
+        'scope VARCHAR(50) NOT NULL, version INTEGER NOT NULL, updated_at FLOAT NOT NULL, PRIMARY KEY (scope))'
+    )
+
+
+@migration(4, 'Add FTS5 indexes over movie names/directors and user names')
+def add_search_indexes(conn):
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5("
+        "name, director, content='movies', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5("
+        "name, content='users', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    # Rank title matches above director matches
+    conn.exec_driver_sql("INSERT INTO movies_fts (movies_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS movies_fts_insert AFTER INSERT ON movies BEGIN "
+        "INSERT INTO movies_fts (rowid, name, director) VALUES (new.id, new.name, new.director); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS movies_fts_delete AFTER DELETE ON movies BEGIN "
+        "INSERT INTO movies_fts (movies_fts, rowid, name, director) "
+        "VALUES ('delete', old.id, old.name, old.director); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS movies_fts_update AFTER UPDATE OF name, director ON movies BEGIN "
+        "INSERT INTO movies_fts (movies_fts, rowid, name, director) "
+        "VALUES ('delete', old.id, old.name, old.director); "
+        "INSERT INTO movies_fts (rowid, name, director) VALUES (new.id, new.name, new.director); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS users_fts_insert AFTER INSERT ON users BEGIN "
+        "INSERT INTO users_fts (rowid, name) VALUES (new.id, new.name); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS users_fts_delete AFTER DELETE ON users BEGIN "
+        "INSERT INTO users_fts (users_fts, rowid, name) VALUES ('delete', old.id, old.name); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS users_fts_update AFTER UPDATE OF name ON users BEGIN "
+        "INSERT INTO users_fts (users_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+        "INSERT INTO users_fts (rowid, name) VALUES (new.id, new.name); END"
+    )
+
+    conn.exec_driver_sql("INSERT INTO movies_fts (movies_fts) VALUES ('rebuild')")
+    conn.exec_driver_sql("INSERT INTO users_fts (users_fts) VALUES ('rebuild')")
+
+
+@migration(5, 'Add movies.enrichment_status and the enrichment_jobs queue')
+def add_enrichment_queue(conn):
+    columns = [row[1] for row in conn.exec_driver_sql('PRAGMA table_info(movies)')]
+    if 'enrichment_status' not in columns:
+        conn.exec_driver_sql(
+            "ALTER TABLE movies ADD COLUMN enrichment_status VARCHAR(20) NOT NULL DEFAULT 'complete'"
+        )
+    conn.exec_driver_sql(
+        'CREATE TABLE IF NOT EXISTS enrichment_jobs ('
+        'id INTEGER NOT NULL, movie_id INTEGER NOT NULL, title VARCHAR(100) NOT NULL, '
+        'status VARCHAR(20) NOT NULL, attempts INTEGER NOT NULL, next_attempt_at FLOAT NOT NULL, '
+        'locked_until FLOAT, last_error TEXT, PRIMARY KEY (id), FOREIGN KEY(movie_id) REFERENCES movies (id))'
+    )
+    conn.exec_driver_sql(
+        'CREATE INDEX IF NOT EXISTS ix_enrichment_jobs_status_next_attempt_at '
+        'ON enrichment_jobs (status, next_attempt_at)'
+    )
+    conn.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_enrichment_jobs_movie_id ON enrichment_jobs (movie_id)')
+
+
+@migration(6, 'Add the precomputed recommendation tables and queue every user')
+def add_recommendation_tables(conn):
+    conn.exec_driver_sql(
+        'CREATE TABLE IF NOT EXISTS user_similarities ('
+        'user_id INTEGER NOT NULL, rank INTEGER NOT NULL, similar_user_id INTEGER NOT NULL, '
+        'score FLOAT NOT NULL, PRIMARY KEY (user_id, rank))'
+    )
+    conn.exec_driver_sql(
+        'CREATE INDEX IF NOT EXISTS ix_user_similarities_similar_user_id ON user_similarities (similar_user_id)'
+    )
+    conn.exec_driver_sql(
+        'CREATE TABLE IF NOT EXISTS movie_recommendations ('
+        'user_id INTEGER NOT NULL, rank INTEGER NOT NULL, title_key VARCHAR(100) NOT NULL, '
+        'name VARCHAR(100) NOT NULL, score FLOAT NOT NULL, supporters INTEGER NOT NULL, '
+        'PRIMARY KEY (user_id, rank))'
+    )
+    conn.exec_driver_sql(
+        'CREATE TABLE IF NOT EXISTS recommendation_queue ('
+        'user_id INTEGER NOT NULL, queued_at FLOAT NOT NULL, PRIMARY KEY (user_id))'
+    )
+    conn.exec_driver_sql(
+        'INSERT OR IGNORE INTO recommendation_queue (user_id, queued_at) '
+        "SELECT id, CAST(strftime('%s', 'now') AS FLOAT) FROM users"
+    )
+
+
+@migration(7, 'Move movie details into a shared titles catalog')
+def add_titles_catalog(conn):
+    converted = 'title_id' in table_columns(conn, 'movies')
+    if not converted:
+        # Until movies link to it, a titles table can only be an empty leftover of
+        # an upgrade that created the newest model tables up front, then failed
+        conn.exec_driver_sql('DROP TABLE IF EXISTS titles')
+    conn.exec_driver_sql(
+        'CREATE TABLE IF NOT EXISTS titles ('
+        'id INTEGER NOT NULL, title_key VARCHAR(100) NOT NULL, name VARCHAR(100) NOT NULL, '
+        'director VARCHAR(100) NOT NULL, year INTEGER NOT NULL, rating FLOAT NOT NULL, '
+        "enrichment_status VARCHAR(20) DEFAULT 'complete' NOT NULL, imdb_id VARCHAR(20), PRIMARY KEY (id))"
+    )
+    conn.exec_driver_sql(
+        'CREATE UNIQUE INDEX IF NOT EXISTS ix_titles_identity '
+        'ON titles (name, director, year, rating, enrichment_status)'
+    )
+    conn.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_titles_title_key ON titles (title_key)')
+    # Replaces ix_movies_year, dropped with the old movies table
+    conn.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_titles_year ON titles (year)')
+
+    if not converted:
+        # One title per distinct set of details, then movies rebuilt as links to them
+        conn.connection.dbapi_connection.create_function('normalize_title', 1, normalize_title, deterministic=True)
+        conn.exec_driver_sql(
+            'INSERT OR IGNORE INTO titles (title_key, name, director, year, rating, enrichment_status) '
+            'SELECT normalize_title(name), name, director, year, rating, enrichment_status FROM movies '
+            'GROUP BY name, director, year, rating, enrichment_status'
+        )
+        conn.exec_driver_sql(
+            'CREATE TABLE movies_catalog ('
+            'id INTEGER NOT NULL, user_id INTEGER NOT NULL, title_id INTEGER NOT NULL, PRIMARY KEY (id), '
+            'FOREIGN KEY(user_id) REFERENCES users (id), FOREIGN KEY(title_id) REFERENCES titles (id))'
+        )
+        conn.exec_driver_sql(
+            'INSERT INTO movies_catalog (id, user_id, title_id) '
+            'SELECT m.id, m.user_id, t.id FROM movies m JOIN titles t '
+            'ON t.name = m.name AND t.director = m.director AND t.year = m.year AND t.rating = m.rating '
+            'AND t.enrichment_status = m.enrichment_status'
+        )
+
+        # One enrichment job per title: the oldest of its movies' jobs. The same
+        # failed upgrade may have left an empty enrichment_jobs in the new shape.
+        if 'movie_id' in table_columns(conn, 'enrichment_jobs'):
+            convert_enrichment_jobs(conn)
+        conn.exec_driver_sql(
+            'CREATE INDEX IF NOT EXISTS ix_enrichment_jobs_status_next_attempt_at '
+            'ON enrichment_jobs (status, next_attempt_at)'
+        )
+        conn.exec_driver_sql(
+            'CREATE UNIQUE INDEX IF NOT EXISTS ix_enrichment_jobs_title_id ON enrichment_jobs (title_id)'
+        )
+
+        conn.exec_driver_sql('DROP TABLE IF EXISTS movies_fts')
+        conn.exec_driver_sql('DROP TABLE movies')
+        conn.exec_driver_sql('ALTER TABLE movies_catalog RENAME TO movies')
+        conn.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_movies_user_id_id ON movies (user_id, id)')
+        conn.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_movies_title_id ON movies (title_id)')
+
+    # Names and directors are searched once per title
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS titles_fts USING fts5("
+        "name, director, content='titles', content_rowid='id', "
+        "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    conn.exec_driver_sql("INSERT INTO titles_fts (titles_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')")
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS titles_fts_insert AFTER INSERT ON titles BEGIN "
+        "INSERT INTO titles_fts (rowid, name, director) VALUES (new.id, new.name, new.director); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS titles_fts_delete AFTER DELETE ON titles BEGIN "
+        "INSERT INTO titles_fts (titles_fts, rowid, name, director) "
+        "VALUES ('delete', old.id, old.name, old.director); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS titles_fts_update AFTER UPDATE OF name, director ON titles BEGIN "
+        "INSERT INTO titles_fts (titles_fts, rowid, name, director) "
+        "VALUES ('delete', old.id, old.name, old.director); "
+        "INSERT INTO titles_fts (rowid, name, director) VALUES (new.id, new.name, new.director); END"
+    )
+    conn.exec_driver_sql("INSERT INTO titles_fts (titles_fts) VALUES ('rebuild')")
+    conn.exec_driver_sql('ANALYZE')
+
+
+@migration(8, "Key titles on normalized name and year; keep users' own details on their movies")
+def key_titles_on_film(conn):
+    # The titles of one film are merged into the oldest of them. A movie keeps
+    # the name, director and rating of its former title where they differ.
+    conn.exec_driver_sql(
+        'CREATE TEMP TABLE title_merges AS SELECT t.id AS title_id, '
+        '(SELECT MIN(c.id) FROM titles c WHERE c.title_key = t.title_key AND c.year = t.year) AS film_id '
+        'FROM titles t'
+    )
+    for column in ('name VARCHAR(100)', 'director VARCHAR(100)', 'rating FLOAT'):
+        conn.exec_driver_sql(f'ALTER TABLE movies ADD COLUMN {column}')
+    conn.exec_driver_sql(
+        'UPDATE movies SET '
+        'name = (SELECT NULLIF(t.name, f.name) FROM titles t JOIN title_merges x ON x.title_id = t.id '
+        'JOIN titles f ON f.id = x.film_id WHERE t.id = movies.title_id), '
+        'director = (SELECT NULLIF(t.director, f.director) FROM titles t JOIN title_merges x ON x.title_id = t.id '
+        'JOIN titles f ON f.id = x.film_id WHERE t.id = movies.title_id), '
+        'rating = (SELECT NULLIF(t.rating, f.rating) FROM titles t JOIN title_merges x ON x.title_id = t.id '
+        'JOIN titles f ON f.id = x.film_id WHERE t.id = movies.title_id)'
+    )
+    conn.exec_driver_sql(
+        'UPDATE movies SET title_id = (SELECT film_id FROM title_merges WHERE title_id = movies.title_id)'
+    )
+
+    # One enrichment job per film, and the IMDb ID of any of its titles
+    conn.exec_driver_sql(
+        'UPDATE OR IGNORE enrichment_jobs SET title_id = '
+        '(SELECT film_id FROM title_merges WHERE title_id = enrichment_jobs.title_id)'
+    )
+    conn.exec_driver_sql('DELETE FROM enrichment_jobs WHERE title_id NOT IN (SELECT film_id FROM title_merges)')
+    conn.exec_driver_sql(
+        'UPDATE titles SET imdb_id = (SELECT MAX(t.imdb_id) FROM title_merges x JOIN titles t ON t.id = x.title_id '
+        'WHERE x.film_id = titles.id) WHERE imdb_id IS NULL'
+    )
+    conn.exec_driver_sql('DELETE FROM titles WHERE id NOT IN (SELECT film_id FROM title_merges)')
+    conn.exec_driver_sql('DROP TABLE title_merges')
+
+    conn.exec_driver_sql('DROP INDEX IF EXISTS ix_titles_identity')
+    conn.exec_driver_sql('DROP INDEX IF EXISTS ix_titles_title_key')
+    conn.exec_driver_sql('CREATE UNIQUE INDEX ix_titles_identity ON titles (title_key, year)')
+    conn.exec_driver_sql('ANALYZE')
+
+
+@migration(9, "Add an FTS5 index over the names and directors users gave their own movies")
+def add_movie_overrides_fts(conn):
+    # A movie with its own name or director is searched by what its user sees,
+    # so the row holds the override merged with its title's other field
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS movie_overrides_fts USING fts5("
+        "name, director, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    conn.exec_driver_sql(
+        "INSERT INTO movie_overrides_fts (movie_overrides_fts, rank) VALUES ('rank', 'bm25(10.0, 1.0)')"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS movie_overrides_fts_insert AFTER INSERT ON movies "
+        "WHEN new.name IS NOT NULL OR new.director IS NOT NULL BEGIN "
+        "INSERT INTO movie_overrides_fts (rowid, name, director) "
+        "SELECT new.id, coalesce(new.name, t.name), coalesce(new.director, t.director) "
+        "FROM titles t WHERE t.id = new.title_id; END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS movie_overrides_fts_delete AFTER DELETE ON movies "
+        "WHEN old.name IS NOT NULL OR old.director IS NOT NULL BEGIN "
+        "DELETE FROM movie_overrides_fts WHERE rowid = old.id; END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS movie_overrides_fts_update AFTER UPDATE OF name, director, title_id ON movies "
+        "BEGIN "
+        "DELETE FROM movie_overrides_fts WHERE rowid = old.id; "
+        "INSERT INTO movie_overrides_fts (rowid, name, director) "
+        "SELECT new.id, coalesce(new.name, t.name), coalesce(new.director, t.director) "
+        "FROM titles t WHERE t.id = new.title_id AND (new.name IS NOT NULL OR new.director IS NOT NULL); END"
+    )
+    conn.exec_driver_sql(
+        "CREATE TRIGGER IF NOT EXISTS movie_overrides_fts_title_update AFTER UPDATE OF name, director ON titles "
+        "BEGIN "
+        "DELETE FROM movie_overrides_fts WHERE rowid IN (SELECT id FROM movies WHERE title_id = new.id "
+        "AND (name IS NOT NULL OR director IS NOT NULL)); "
+        "INSERT INTO movie_overrides_fts (rowid, name, director) "
+        "SELECT m.id, coalesce(m.name, new.name), coalesce(m.director, new.director) FROM movies m "
+        "WHERE m.title_id = new.id AND (m.name IS NOT NULL OR m.director IS NOT NULL); END"
+    )
+    conn.exec_driver_sql(
+        "INSERT INTO movie_overrides_fts (rowid, name, director) "
+        "SELECT m.id, coalesce(m.name, t.name), coalesce(m.director, t.director) "
+        "FROM movies m JOIN titles t ON t.id = m.title_id WHERE m.name IS NOT NULL OR m.director IS NOT NULL"
+    )
+
+
+
+@migration(10, "Count each user's movies in the statistics table")
+def add_user_movie_statistics(conn):
+    conn.exec_driver_sql(
+        "INSERT OR REPLACE INTO statistics (name, value) "
+        "SELECT 'user_movies:' || user_id, COUNT(*) FROM movies GROUP BY user_id"
+    )
+
+
+@migration(11, 'Add the omdb_cache table of the persistent OMDb lookup cache')
+def add_omdb_cache_table(conn):
+    conn.exec_driver_sql(
+        'CREATE TABLE IF NOT EXISTS omdb_cache ('
+        'key VARCHAR(255) NOT NULL, payload TEXT NOT NULL, expires_at FLOAT NOT NULL, PRIMARY KEY (key))'
+    )
+
+
+@migration(12, 'Key recommended movies on their title and queue every user')
+def key_recommendations_on_titles(conn):
+    conn.exec_driver_sql('DROP TABLE IF EXISTS movie_recommendations')
+    conn.exec_driver_sql(
+        'CREATE TABLE movie_recommendations ('
+        'user_id INTEGER NOT NULL, rank INTEGER NOT NULL, title_id INTEGER NOT NULL, '
+        'name VARCHAR(100) NOT NULL, score FLOAT NOT NULL, supporters INTEGER NOT NULL, '
+        'PRIMARY KEY (user_id, rank))'
+    )
+    conn.exec_driver_sql(
+        'INSERT OR IGNORE INTO recommendation_queue (user_id, queued_at) '
+        "SELECT id, CAST(strftime('%s', 'now') AS FLOAT) FROM users"
+    )
+
+def convert_enrichment_jobs(conn):
+    """
+    Rebuild enrichment_jobs with one job per title, for migration 7.
+
+    Each title keeps the oldest job among its movies'. The indexes are created
+    by the migration.
+
+    :param conn: A SQLAlchemy connection inside the migration's transaction.
+    """
+    conn.exec_driver_sql(
+        'CREATE TABLE enrichment_jobs_catalog ('
+        'id INTEGER NOT NULL, title_id INTEGER NOT NULL, title VARCHAR(100) NOT NULL, '
+        'status VARCHAR(20) NOT NULL, attempts INTEGER NOT NULL, next_attempt_at FLOAT NOT NULL, '
+        'locked_until FLOAT, last_error TEXT, PRIMARY KEY (id), FOREIGN KEY(title_id) REFERENCES titles (id))'
+    )
+    conn.exec_driver_sql(
+        'INSERT INTO enrichment_jobs_catalog '
+        '(id, title_id, title, status, attempts, next_attempt_at, locked_until, last_error) '
+        'SELECT j.id, m.title_id, j.title, j.status, j.attempts, j.next_attempt_at, j.locked_until, j.last_error '
+        'FROM enrichment_jobs j JOIN movies_catalog m ON m.id = j.movie_id '
+        'WHERE j.id IN (SELECT MIN(j.id) FROM enrichment_jobs j '
+        'JOIN movies_catalog m ON m.id = j.movie_id GROUP BY m.title_id)'
+    )
+    conn.exec_driver_sql('DROP TABLE enrichment_jobs')
+    conn.exec_driver_sql('ALTER TABLE enrichment_jobs_catalog RENAME TO enrichment_jobs')
@@ -0,0 +1,90 @@
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker guarding calls to an unreliable remote service.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    calls fail fast. Once ``reset_timeout`` seconds have passed it lets a
+    single trial call through (half-open); its outcome closes the breaker
+    again or re-opens it for another ``reset_timeout``.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, timer=time.monotonic):
+        """
+        Initialize the circuit breaker.
+
+        :param failure_threshold: Consecutive failures that open the breaker.
+        :param reset_timeout: Seconds to stay open before allowing a trial call.
+        :param timer: Clock used for the timeout, mainly replaceable in tests.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        """
+        The current state: 'closed', 'open' or 'half_open'.
+        """
+        with self._lock:
+            return self._current_state()
+
+    @property
+    def failures(self):
+        """
+        The number of consecutive failures recorded.
+        """
+        with self._lock:
+            return self._failures
+
+    def allow(self):
+        """
+        Check whether a call may be attempted now.
+
+        :return: True if the call may proceed, False if it should fail fast.
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        """
+        Record a successful call, closing the breaker.
+        """
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """
+        Record a failed call, opening the breaker if the threshold is reached.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self._timer()
+            self._trial_in_flight = False
+
+    def _current_state(self):
+        if self._state == OPEN and self._timer() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+        return self._state
@@ -0,0 +1,87 @@
+import json
+import time
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+
+
+class OMDbCacheEntry(db.Model):
+    """
+    Model representing a cached OMDb lookup, keyed by normalized title.
+    """
+    __tablename__ = 'omdb_cache'
+
+    key = db.Column(db.String(255), primary_key=True)
+    payload = db.Column(db.Text, nullable=False)
+    expires_at = db.Column(db.Float, nullable=False)
+
+
+class OMDbCacheStore:
+    """
+    Persistent tier of the OMDb cache, stored in the application's database.
+
+    It works on its own short connections rather than the ORM session, so a
+    cache write never commits or rolls back the caller's pending changes.
+    """
+
+    def __init__(self, engine, timer=time.time):
+        """
+        Initialize the store. Its table is created by migration 11.
+
+        :param engine: The SQLAlchemy engine of the application database.
+        :param timer: Wall clock used for expiry.
+        """
+        self.engine = engine
+        self._timer = timer
+
+    def get(self, key):
+        """
+        Retrieve a cached payload that has not expired.
+
+        :param key: The normalized title.
+        :return: A tuple of (payload, remaining_ttl) or None if missing or expired.
+        """
+        table = OMDbCacheEntry.__table__
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                select(table.c.payload, table.c.expires_at).where(table.c.key == key)
+            ).first()
+        if row is None:
+            return None
+        remaining = row.expires_at - self._timer()
+        if remaining <= 0:
+            return None
+        return json.loads(row.payload), remaining
+
+    def set(self, key, payload, ttl):
+        """
+        Insert or replace a cached payload.
+
+        :param key: The normalized title.
+        :param payload: The decoded OMDb response.
+        :param ttl: Time-to-live in seconds.
+        """
+        table = OMDbCacheEntry.__table__
+        values = {'key': key, 'payload': json.dumps(payload), 'expires_at': self._timer() + ttl}
+        statement = insert(table).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={'payload': statement.excluded.payload, 'expires_at': statement.excluded.expires_at}
+        )
+        with self.engine.begin() as conn:
+            conn.execute(statement)
+
+    def purge_expired(self):
+        """
+        Delete every expired entry.
+
+        :return: The number of deleted entries.
+        """
+        table = OMDbCacheEntry.__table__
+        try:
+            with self.engine.begin() as conn:
+                result = conn.execute(delete(table).where(table.c.expires_at <= self._timer()))
+            return result.rowcount
+        except SQLAlchemyError:
+            return 0
@@ -0,0 +1,356 @@
+import logging
+import random
+import threading
+import time
+from sqlalchemy.exc import SQLAlchemyError
+from app.cache import TTLCache
+from app.metrics import Counter, Histogram
+from .breaker import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = 'http://www.omdbapi.com/'
+
+# The only error answer that describes the title rather than the request
+NOT_FOUND_ERROR = 'Movie not found!'
+
+
+class OMDbError(Exception):
+    """
+    Raised when the OMDb API cannot be reached or returns an invalid response.
+    """
+
+
+class MovieNotFoundError(OMDbError):
+    """
+    Raised when OMDb answers that no movie matches the requested title.
+    """
+
+
+class OMDbUnavailableError(OMDbError):
+    """
+    Raised without contacting OMDb while its circuit breaker is open.
+    """
+
+
+def normalize_title(title):
+    """
+    Normalize a movie title into a cache key.
+
+    :param title: The title as typed by the user.
+    :return: The title with collapsed whitespace, case-folded.
+    """
+    return ' '.join(title.split()).casefold()
+
+
+def movie_details(payload):
+    """
+    Extract the fields stored for a movie from an OMDb response.
+
+    :param payload: The decoded OMDb response.
+    :return: A tuple of (director, year, rating); an 'N/A' or invalid rating becomes 0.0.
+    """
+    rating = payload.get('imdbRating')
+    try:
+        rating = float(rating)
+    except (TypeError, ValueError):
+        rating = 0.0
+    return payload.get('Director'), payload.get('Year'), rating
+
+
+class _RetryableError(OMDbError):
+    """
+    A failed attempt that is worth retrying.
+    """
+
+
+class _Flight:
+    """
+    A lookup in progress that other threads can wait on.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class OMDbClient:
+    """
+    Client for the OMDb API with a two-tier cache in front of it.
+
+    Lookups are answered from an in-process LRU first, then from the
+    persistent store in the application's database, and only then from
+    OMDb itself. Concurrent lookups of the same title share one request,
+    and "Movie not found!" answers are cached with a shorter TTL. Other
+    error answers (invalid key, request limit reached, ...) say nothing
+    about the title: they are raised as OMDbError and never cached.
+
+    Requests go through a shared, pooled session with connect and read
+    timeouts, are retried a bounded number of times with jittered backoff,
+    and are short-circuited by a circuit breaker while OMDb is failing.
+    """
+
+    def __init__(self, api_key, base_url=DEFAULT_BASE_URL, connect_timeout=3.05, read_timeout=5.0,
+                 store=None, cache_size=1024, ttl=86400, negative_ttl=3600, pool_size=10,
+                 max_retries=2, backoff=0.2, breaker=None):
+        """
+        Initialize the OMDb client.
+
+        :param api_key: The OMDb API key.
+        :param base_url: The OMDb endpoint, replaceable by a local stub server.
+        :param connect_timeout: Seconds to wait for a connection to OMDb.
+        :param read_timeout: Seconds to wait for OMDb to answer.
+        :param store: Optional persistent cache tier (an OMDbCacheStore).
+        :param cache_size: Maximum number of titles kept in memory.
+        :param ttl: Time-to-live of a found movie, in seconds.
+        :param negative_ttl: Time-to-live of a "not found" answer, in seconds.
+        :param pool_size: Maximum number of pooled keep-alive connections.
+        :param max_retries: Retries after a failed attempt (0 disables them).
+        :param backoff: Base delay of the exponential backoff, in seconds.
+        :param breaker: Circuit breaker to use; a default one is created if None.
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.latency = Histogram()
+        self.calls = Counter()
+        self.listeners = []  # callables receiving (seconds, outcome) after every request
+        self.store = store
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._memory = TTLCache(maxsize=cache_size, ttl=ttl)
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        The pooled HTTP session, created on first use.
+
+        ``requests`` is only imported here, so processes that never call OMDb
+        do not pay for importing it at startup.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    @classmethod
+    def from_config(cls, app, store=None):
+        """
+        Build a client from the Flask application configuration.
+
+        :param app: The Flask application instance.
+        :param store: Optional persistent cache tier.
+        :return: A configured OMDbClient.
+        """
+        config = app.config
+        return cls(
+            api_key=config.get('OMDB_API_KEY'),
+            base_url=config.get('OMDB_BASE_URL', DEFAULT_BASE_URL),
+            connect_timeout=config.get('OMDB_CONNECT_TIMEOUT', 3.05),
+            read_timeout=config.get('OMDB_READ_TIMEOUT', 5.0),
+            store=store,
+            cache_size=config.get('OMDB_CACHE_SIZE', 1024),
+            ttl=config.get('OMDB_CACHE_TTL', 86400),
+            negative_ttl=config.get('OMDB_NEGATIVE_CACHE_TTL', 3600),
+            pool_size=config.get('OMDB_POOL_SIZE', 10),
+            max_retries=config.get('OMDB_MAX_RETRIES', 2),
+            backoff=config.get('OMDB_RETRY_BACKOFF', 0.2),
+            breaker=CircuitBreaker(
+                failure_threshold=config.get('OMDB_BREAKER_THRESHOLD', 5),
+                reset_timeout=config.get('OMDB_BREAKER_RESET_TIMEOUT', 30.0)
+            )
+        )
+
+    def lookup(self, title, rate_limiter=None):
+        """
+        Look up a movie by title.
+
+        :param title: The movie title.
+        :param rate_limiter: Optional RateLimiter acquired before a request
+            actually goes out to OMDb; cache hits do not consume it.
+        :return: The decoded OMDb response for the movie.
+        :raises MovieNotFoundError: If OMDb has no movie with that title.
+        :raises OMDbError: If OMDb could not be queried.
+        """
+        key = normalize_title(title)
+        payload = self._memory.get(key)
+        if payload is None:
+            payload = self._coalesced(key, title, rate_limiter)
+        return self._unwrap(payload)
+
+    def _coalesced(self, key, title, rate_limiter=None):
+        """
+        Load a title, sharing the work with concurrent lookups of the same key.
+
+        :param key: The normalized title.
+        :param title: The title as typed by the user.
+        :param rate_limiter: Optional RateLimiter acquired before calling OMDb.
+        :return: The decoded OMDb response.
+        """
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._load(key, title, rate_limiter)
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _load(self, key, title, rate_limiter=None):
+        """
+        Load a title from the persistent store or, failing that, from OMDb.
+
+        :param key: The normalized title.
+        :param title: The title as typed by the user.
+        :param rate_limiter: Optional RateLimiter acquired before calling OMDb.
+        :return: The decoded OMDb response.
+        """
+        if self.store is not None:
+            try:
+                cached = self.store.get(key)
+            except SQLAlchemyError as e:
+                logger.warning(f"OMDb cache read failed for '{key}': {e}")
+                cached = None
+            if cached is not None and self._is_cacheable(cached[0]):
+                payload, remaining = cached
+                self._memory.set(key, payload, ttl=remaining)
+                return payload
+
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        payload = self._fetch(title)
+        ttl = self.ttl if self._is_found(payload) else self.negative_ttl
+        self._memory.set(key, payload, ttl=ttl)
+        if self.store is not None:
+            try:
+                self.store.set(key, payload, ttl)
+            except SQLAlchemyError as e:
+                logger.warning(f"OMDb cache write failed for '{key}': {e}")
+        return payload
+
+    def _fetch(self, title):
+        """
+        Query the OMDb API through the circuit breaker, retrying transient failures.
+
+        :param title: The movie title.
+        :return: The decoded OMDb response.
+        :raises OMDbUnavailableError: If the circuit breaker is open.
+        :raises OMDbError: If every attempt failed.
+        """
+        if not self.breaker.allow():
+            self.calls.inc('short_circuited')
+            raise OMDbUnavailableError("OMDb is temporarily unavailable")
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                payload = self._request(title)
+            except _RetryableError as e:
+                if attempt < self.max_retries:
+                    self.calls.inc('retried')
+                    time.sleep(random.uniform(0, self.backoff * 2 ** attempt))
+                    continue
+                self.breaker.record_failure()
+                raise OMDbError(str(e)) from e
+            except OMDbError:
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+            return payload
+
+    def _request(self, title):
+        """
+        Perform a single request against the OMDb API and record its latency.
+
+        :param title: The movie title.
+        :return: The decoded OMDb response.
+        :raises _RetryableError: On timeouts, connection errors and 429/5xx answers.
+        :raises OMDbError: On any other failed request, an invalid response or
+            an error answer other than "Movie not found!".
+        """
+        session = self.session
+        import requests  # already loaded by the session property
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            response = session.get(self.base_url, params={'t': title, 'apikey': self.api_key},
+                                        timeout=self.timeout)
+            if response.status_code == 429 or response.status_code >= 500:
+                raise _RetryableError(f"OMDb returned HTTP {response.status_code}")
+            if response.status_code != 200:
+                raise OMDbError(f"OMDb returned HTTP {response.status_code}")
+            try:
+                payload = response.json()
+            except ValueError as e:
+                raise OMDbError("OMDb returned an invalid response") from e
+            if not self._is_cacheable(payload):
+                raise OMDbError(f"OMDb returned an error: {payload.get('Error')}")
+            outcome = 'ok'
+            return payload
+        except (requests.ConnectionError, requests.Timeout) as e:
+            outcome = 'timeout' if isinstance(e, requests.Timeout) else 'connection_error'
+            raise _RetryableError(f"OMDb request failed: {e}") from e
+        except requests.RequestException as e:
+            raise OMDbError(f"OMDb request failed: {e}") from e
+        finally:
+            elapsed = time.perf_counter() - started
+            self.latency.observe(elapsed)
+            self.calls.inc(outcome)
+            for listener in self.listeners:
+                listener(elapsed, outcome)
+
+    def metrics(self):
+        """
+        Report request latency, call outcomes and circuit breaker state.
+
+        :return: A JSON-serializable dictionary.
+        """
+        return {
+            'latency_seconds': self.latency.snapshot(),
+            'calls': self.calls.snapshot(),
+            'breaker': {
+                'state': self.breaker.state,
+                'consecutive_failures': self.breaker.failures
+            }
+        }
+
+    @staticmethod
+    def _is_found(payload):
+        return payload.get('Response') != 'False'
+
+    def _is_cacheable(self, payload):
+        return self._is_found(payload) or payload.get('Error') == NOT_FOUND_ERROR
+
+    def _unwrap(self, payload):
+        if not self._is_found(payload):
+            raise MovieNotFoundError(payload.get('Error', NOT_FOUND_ERROR))
+        return payload
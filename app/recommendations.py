@@ -0,0 +1,270 @@
+import heapq
+import logging
+import math
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+class RatingMatrix:
+    """
+    Sparse user x movie matrix of ratings, with its inverted index.
+
+    Movies are identified by their catalog title, so two users' copies of
+    the same film share a column while a remake with the same name does
+    not. Only non-empty cells are stored: ``rows`` maps a user to
+    {title_id: value} and ``columns`` maps a title_id to {user: value}, so a
+    similarity only visits users who share a movie.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty matrix.
+        """
+        self.rows = {}
+        self.columns = {}
+        self.norms = {}
+        self._names = {}
+
+    @classmethod
+    def from_ratings(cls, ratings):
+        """
+        Build the matrix from (user_id, title_id, name, rating) rows.
+
+        :param ratings: An iterable of rows, e.g. SQLiteDataManager.iter_ratings().
+        :return: A RatingMatrix.
+        """
+        matrix = cls()
+        for user_id, title_id, name, rating in ratings:
+            matrix.add(user_id, title_id, name, rating)
+        matrix.norms = {user_id: math.sqrt(sum(value * value for value in row.values()))
+                        for user_id, row in matrix.rows.items()}
+        return matrix
+
+    def add(self, user_id, title_id, name, rating):
+        """
+        Store a user's rating of a movie.
+
+        A movie without a rating yet (pending or unknown to OMDb) counts as
+        an average 5.0: the user chose it, which says something on its own.
+
+        :param user_id: The unique identifier of the user.
+        :param title_id: The unique identifier of the movie's title.
+        :param name: The movie name as the user sees it.
+        :param rating: The movie rating out of 10.
+        """
+        value = rating if rating and rating > 0 else 5.0
+        self.rows.setdefault(user_id, {})[title_id] = value
+        self.columns.setdefault(title_id, {})[user_id] = value
+        self._names.setdefault(title_id, Counter())[name] += 1
+
+    def name(self, title_id):
+        """
+        Get the display name of a movie: the spelling most users see.
+
+        :param title_id: The unique identifier of the title.
+        :return: The movie name.
+        """
+        return self._names[title_id].most_common(1)[0][0]
+
+    def similar_users(self, user_id, top_k):
+        """
+        Find the users whose ratings are closest to a user's, by cosine similarity.
+
+        :param user_id: The unique identifier of the user.
+        :param top_k: The number of users to return.
+        :return: A list of (user_id, score) pairs, most similar first.
+        """
+        row = self.rows.get(user_id)
+        if not row:
+            return []
+        dots = Counter()
+        for key, value in row.items():
+            for other, other_value in self.columns[key].items():
+                if other != user_id:
+                    dots[other] += value * other_value
+        norm = self.norms[user_id]
+        scores = ((dot / (norm * self.norms[other]), other) for other, dot in dots.items())
+        return [(other, round(score, 6))
+                for score, other in heapq.nlargest(top_k, scores, key=lambda item: (item[0], -item[1]))]
+
+    def recommend_movies(self, user_id, similar, limit):
+        """
+        Rank the movies a user's similar users have and the user does not.
+
+        A movie scores the sum of similarity x rating / 10 over the similar
+        users who have it, so it ranks high when close users rate it well.
+
+        :param user_id: The unique identifier of the user.
+        :param similar: The user's (user_id, score) pairs from similar_users.
+        :param limit: The number of movies to return.
+        :return: A list of (title_id, name, score, supporters) tuples, best first.
+        """
+        own = self.rows.get(user_id, {})
+        scores, supporters = Counter(), Counter()
+        for other, similarity in similar:
+            for key, value in self.rows[other].items():
+                if key not in own:
+                    scores[key] += similarity * value / 10
+                    supporters[key] += 1
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], supporters[item[0]]))
+        return [(key, self.name(key), round(score, 6), supporters[key]) for key, score in best]
+
+
+class Recommender:
+    """
+    Precomputes every user's similar users and recommended movies.
+
+    Writes to a user's movies queue the user in recommendation_queue; a
+    refresh recomputes only the users whose results can have changed and
+    stores them, so the API reads finished lists by primary key.
+    """
+
+    def __init__(self, top_k=20, limit=20):
+        """
+        Initialize the recommender.
+
+        :param top_k: The number of similar users kept per user.
+        :param limit: The number of movies recommended per user.
+        """
+        self.top_k = top_k
+        self.limit = limit
+
+    def compute(self, matrix, user_ids):
+        """
+        Compute the recommendations of some users.
+
+        :param matrix: The RatingMatrix.
+        :param user_ids: The users to compute.
+        :return: A mapping of user id to a (similar users, movies) tuple.
+        """
+        results = {}
+        for user_id in user_ids:
+            similar = matrix.similar_users(user_id, self.top_k)
+            results[user_id] = (similar, matrix.recommend_movies(user_id, similar, self.limit))
+        return results
+
+    def refresh(self, data_manager, full=False):
+        """
+        Bring the stored recommendations up to date.
+
+        The queued users are recomputed, together with the users who list one
+        of them as similar (their scores changed) and the queued users' new
+        similar users (similarity is symmetric, so a queued user may now
+        belong in their lists). Users further away may keep a slightly stale
+        list until they are queued themselves; ``full`` recomputes everyone.
+
+        :param data_manager: The SQLiteDataManager (or a wrapper passing through to it).
+        :param full: Recompute every user instead of the queued ones.
+        :return: The number of users whose recommendations were stored.
+        """
+        queued, queued_before = data_manager.get_recommendation_queue()
+        if not queued and not full:
+            return 0
+
+        matrix = RatingMatrix.from_ratings(data_manager.iter_ratings())
+        if full:
+            results = self.compute(matrix, set(matrix.rows) | set(queued))
+        else:
+            dirty = set(queued)
+            results = self.compute(matrix, dirty)
+            affected = data_manager.get_dependent_users(dirty) if dirty else set()
+            affected.update(other for similar, _ in results.values() for other, _ in similar)
+            results.update(self.compute(matrix, affected - dirty))
+
+        data_manager.store_recommendations(results, queued_before=queued_before)
+        logger.info(f"Stored recommendations of {len(results)} users ({len(queued)} queued)")
+        return len(results)
+
+
+class RecommendationRefresher:
+    """
+    Background thread applying queued recommendation refreshes.
+
+    Requests never wait for the recommender: writes only queue the users
+    they touch, and this thread picks the queue up every ``interval``
+    seconds, so a burst of writes is folded into a single refresh.
+    """
+
+    def __init__(self, app, recommender, interval=30.0):
+        """
+        Initialize the refresher.
+
+        :param app: The Flask application instance.
+        :param recommender: The Recommender to run.
+        :param interval: Seconds between two refreshes.
+        """
+        self.app = app
+        self.recommender = recommender
+        self.interval = interval
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, app):
+        """
+        Build a refresher from the Flask application configuration.
+
+        :param app: The Flask application instance.
+        :return: A configured RecommendationRefresher.
+        """
+        config = app.config
+        recommender = Recommender(top_k=config.get('RECOMMENDATIONS_TOP_K', 20),
+                                  limit=config.get('RECOMMENDATIONS_LIMIT', 20))
+        return cls(app, recommender, interval=config.get('RECOMMENDATIONS_REFRESH_INTERVAL', 30.0))
+
+    def start(self):
+        """
+        Start the refresher thread.
+        """
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self.run, name='recommendation-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        """
+        Ask the refresher thread to stop and wait for it.
+
+        :param timeout: Seconds to wait for the thread.
+        """
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def notify(self):
+        """
+        Run a refresh now instead of at the end of the interval.
+        """
+        self._wakeup.set()
+
+    def run(self):
+        """
+        Refresh until stopped. Runs in the refresher thread.
+
+        The first refresh happens after one interval, so starting the app
+        does not touch the database.
+        """
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                return
+            try:
+                self.app.schema.ensure()
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Recommendation refresh error: {e}")
+
+    def run_once(self, full=False):
+        """
+        Apply the queued refreshes once.
+
+        :param full: Recompute every user instead of the queued ones.
+        :return: The number of users whose recommendations were stored.
+        """
+        with self.app.app_context():
+            return self.recommender.refresh(self.app.data_manager, full=full)
@@ -1,10 +1,100 @@
 from flask import current_app as app
 from flask import render_template, request, redirect, url_for, abort
-from flask import jsonify
+from flask import jsonify, Response, stream_with_context
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime, timedelta
-from app.data_manager.sqlite_data_manager import User, Movie
-import requests
+import hmac
+import io
+import json
+from markupsafe import Markup
+from app.http_cache import conditional
+from app.data_manager.pagination import encode_cursor, decode_cursor
+from app.bulk_import import FORMATS, detect_format, parse_rows, import_movies
+from app.export import EXPORT_FORMATS, MIMETYPES, user_movies_export, database_export, encode_chunks, gzip_chunks
+from app.api import USER_FIELDS as API_USER_FIELDS, MOVIE_FIELDS as API_MOVIE_FIELDS
+from app.api import ValidationError, parse_fields, project, validate_movie, validate_batch, dashboard_payload, \
+    statistics_payload
+from app.data_manager.data_manager_interface import BatchOperationError
+from app.omdb.client import OMDbError, MovieNotFoundError, OMDbUnavailableError, movie_details
+
+
+MAX_PER_PAGE = 100
+MAX_OFFSET_PAGE = 10
+MAX_IMPORT_BATCH_SIZE = 5000
+SEARCH_KINDS = ('movies', 'users')
+
+
+def get_pagination_args(default_per_page):
+    """
+    Read the pagination parameters from the query string.
+
+    The page links carry an after/before cursor and pass the page number only
+    as a label. A bare page number is resolved with an OFFSET, so it is capped
+    at MAX_OFFSET_PAGE.
+
+    :param default_per_page: Page size to use when none (or an invalid one) is given.
+    :return: A tuple of (page, per_page, after, before).
+    """
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', default_per_page, type=int)
+    after = request.args.get('after', type=int)
+    before = request.args.get('before', type=int)
+
+    page = max(page, 1)
+    if after is None and before is None:
+        page = min(page, MAX_OFFSET_PAGE)
+    if per_page < 1 or per_page > MAX_PER_PAGE:
+        per_page = default_per_page
+    return page, per_page, after, before
+
+
+def export_response(pieces, fmt, filename, description):
+    """
+    Build a streamed download response, gzip-compressed when asked with gzip=1.
+
+    A compressed export is a .gz file (application/gzip) rather than a
+    Content-Encoding, so clients save it as it was sent instead of
+    decompressing it under a .gz name.
+
+    :param pieces: A generator of serialized string pieces.
+    :param fmt: One of EXPORT_FORMATS.
+    :param filename: The file name suggested to the client.
+    :param description: What is exported, for the error log.
+    :return: A streamed Response.
+    """
+    def generate():
+        try:
+            yield from pieces
+        except SQLAlchemyError as e:
+            # The status line is already sent; a truncated document is all that can be done
+            app.logger.error(f"Database error while exporting {description}: {e}")
+
+    compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+    chunks = encode_chunks(generate())
+    if compress:
+        chunks = gzip_chunks(chunks)
+        filename += '.gz'
+
+    mimetype = 'application/gzip' if compress else MIMETYPES[fmt]
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def render_fragment(name, scopes, key, render):
+    """
+    Render a page fragment through the fragment cache, when it is enabled.
+
+    :param name: The fragment name.
+    :param scopes: The data scopes the fragment depends on.
+    :param key: A hashable value covering every other input of the fragment.
+    :param render: A callable returning the fragment's HTML.
+    :return: The fragment as Markup.
+    """
+    fragment_cache = getattr(app, 'fragment_cache', None)
+    if fragment_cache is None:
+        return Markup(render())
+    return fragment_cache.render(name, scopes, key, render)
 
 
 @app.errorhandler(404)
@@ -40,6 +130,17 @@ def internal_server_error(error):
     return render_template('500.html'), 500
 
 
+@app.errorhandler(503)
+def service_unavailable(error):
+    """
+    Error handler for 503 Service Unavailable.
+
+    :param error: The error object.
+    :return: Renders the 503.html template with a 503 status code.
+    """
+    return render_template('503.html', message=getattr(error, 'description', None)), 503
+
+
 @app.route('/')
 def home():
     """
@@ -71,6 +172,7 @@ def add_user():
 
 
 @app.route('/users')
+@conditional(lambda: ['users', 'movies'])
 def list_users():
     """
     Route to display a list of all users.
@@ -78,14 +180,25 @@ def list_users():
     :return: Rendered HTML page with the list of users.
     """
     try:
-        users = app.data_manager.get_all_users()
-        return render_template('users.html', users=users)
+        page, per_page, after, before = get_pagination_args(default_per_page=30)
+        query = request.args.get('q', '').strip() or None
+
+        def render_list():
+            users = app.data_manager.get_user_summaries_page(page=page, per_page=per_page, after=after,
+                                                             before=before, name_prefix=query, with_total=query is None)
+            return render_template('_user_list.html', users=users, current_page=users.page,
+                                   per_page=per_page, query=query)
+
+        user_list = render_fragment('user_list', ['users', 'movies'], (page, per_page, after, before, query),
+                                    render_list)
+        return render_template('users.html', user_list=user_list, query=query)
     except Exception as e:
         app.logger.error(f"Error fetching users: {e}")
         abort(500)
 
 
 @app.route('/users/<int:user_id>')
+@conditional(lambda user_id: [f'user:{user_id}'])
 def user_movies(user_id):
     """
     Route to display a user's list of favorite movies.
@@ -98,8 +211,17 @@ def user_movies(user_id):
         if user is None:
             app.logger.warning(f"User with ID {user_id} not found.")
             abort(404)
-        movies = app.data_manager.get_user_movies(user_id)
-        return render_template('user_movies.html', user=user, movies=movies)
+        page, per_page, after, before = get_pagination_args(default_per_page=20)
+
+        def render_grid():
+            movies = app.data_manager.get_user_movie_records_page(user_id, page=page, per_page=per_page,
+                                                                  after=after, before=before)
+            return render_template('_movie_grid.html', user=user, movies=movies, current_page=movies.page,
+                                   per_page=per_page)
+
+        movie_grid = render_fragment('movie_grid', [f'user:{user_id}'], (user_id, page, per_page, after, before),
+                                     render_grid)
+        return render_template('user_movies.html', user=user, movie_grid=movie_grid)
     except Exception as e:
         app.logger.error(f"Error fetching movies for user {user_id}: {e}")
         abort(500)
@@ -137,29 +259,26 @@ def add_movie(user_id=None):
                 error_message = "Movie title is required."
                 return render_template('add_movie.html', users=users, user=user, error=error_message)
 
-            omdb_api_key = app.config.get('OMDB_API_KEY')
-            omdb_response = requests.get(f'http://www.omdbapi.com/?t={movie_title}&apikey={omdb_api_key}')
-            if omdb_response.status_code != 200:
-                error_message = "Failed to fetch movie details from OMDb API."
-                return render_template('add_movie.html', users=users, user=user, error=error_message)
+            if app.config.get('OMDB_ENRICHMENT_MODE', 'sync') == 'async':
+                # Store the movie now; a background worker fetches its details
+                app.data_manager.add_pending_movie(user_id=selected_user_id, movie_name=movie_title)
+                app.enrichment_worker.notify()
+                return redirect(url_for('user_movies', user_id=selected_user_id))
 
-            omdb_data = omdb_response.json()
-            if omdb_data.get('Response') == 'False':
-                error_message = omdb_data.get('Error')
+            try:
+                omdb_data = app.omdb_client.lookup(movie_title)
+            except MovieNotFoundError as e:
+                return render_template('add_movie.html', users=users, user=user, error=str(e))
+            except OMDbUnavailableError:
+                app.logger.warning(f"OMDb circuit breaker is open, rejecting lookup of '{movie_title}'.")
+                message = "Movie details cannot be fetched from OMDb right now. Please try again in a minute."
+                return render_template('503.html', message=message), 503
+            except OMDbError as e:
+                app.logger.warning(f"OMDb lookup failed for '{movie_title}': {e}")
+                error_message = "Failed to fetch movie details from OMDb API."
                 return render_template('add_movie.html', users=users, user=user, error=error_message)
 
-            director = omdb_data.get('Director')
-            year = omdb_data.get('Year')
-            rating = omdb_data.get('imdbRating')
-
-            # Handle 'N/A' rating by setting a default value
-            if rating == 'N/A':
-                rating = 0.0
-            else:
-                try:
-                    rating = float(rating)
-                except ValueError:
-                    rating = 0.0
+            director, year, rating = movie_details(omdb_data)
 
             app.data_manager.add_movie(
                 user_id=selected_user_id,
@@ -263,6 +382,7 @@ def trigger_error():
 
 
 @app.route('/api/recent_movies')
+@conditional(lambda: ['movies'])
 def recent_movies():
     """
     Route to get recent movies from the database.
@@ -270,8 +390,7 @@ def recent_movies():
     :return: JSON response with recent movies or error message.
     """
     try:
-        # Fetch recent movies from the database
-        movies = Movie.query.order_by(Movie.id.desc()).limit(3).all()
+        movies = app.data_manager.get_recent_movies(3)
         return jsonify([{
             'name': movie.name,
             'director': movie.director,
@@ -286,6 +405,7 @@ def recent_movies():
 
 
 @app.route('/api/user_statistics')
+@conditional(lambda: ['users', 'movies'])
 def user_statistics():
     """
     Route to get user statistics from the database.
@@ -293,26 +413,425 @@ def user_statistics():
     :return: JSON response with user statistics or error message.
     """
     try:
-        # Fetch user statistics from the database
-        total_users = User.query.count()
-        app.logger.info(f"Total users: {total_users}")
-
-        total_movies = Movie.query.count()
-        app.logger.info(f"Total movies: {total_movies}")
-
-        # Calculate recent activity based on year (for simplicity)
+        # Read the precomputed counters maintained by the data manager
         current_year = datetime.utcnow().year
-        recent_activity = Movie.query.filter(Movie.year == current_year).count()
-        app.logger.info(f"Recent activity: {recent_activity}")
+        statistics = app.data_manager.get_statistics(current_year)
 
-        return jsonify({
-            'total_users': total_users,
-            'total_movies': total_movies,
-            'recent_activity': recent_activity
-        })
+        return jsonify(statistics_payload(statistics))
     except SQLAlchemyError as e:
         app.logger.error(f"Database error occurred while fetching user statistics: {e}")
         return jsonify({'error': 'Database error occurred while fetching user statistics'}), 500
     except Exception as e:
         app.logger.error(f"Unexpected error occurred while fetching user statistics: {e}")
         return jsonify({'error': 'An unexpected error occurred while fetching user statistics'}), 500
+
+
+@app.route('/api/dashboard')
+@conditional(lambda: ['users', 'movies'])
+def dashboard():
+    """
+    Route to get the recent movies and user statistics in one response.
+
+    Both are read by a single statement, so they come from the same snapshot.
+    Under the ASGI application, /api/dashboard/events then streams the changes.
+
+    :return: JSON response with 'recent_movies' and 'statistics', or error message.
+    """
+    try:
+        return jsonify(dashboard_payload(app.data_manager.get_dashboard(datetime.utcnow().year, 3)))
+    except SQLAlchemyError as e:
+        app.logger.error(f"Database error occurred while fetching the dashboard: {e}")
+        return jsonify({'error': 'Database error occurred while fetching the dashboard'}), 500
+    except Exception as e:
+        app.logger.error(f"Unexpected error occurred while fetching the dashboard: {e}")
+        return jsonify({'error': 'An unexpected error occurred while fetching the dashboard'}), 500
+
+
+@app.route('/api/search')
+@conditional(lambda: ['users', 'movies'])
+def search():
+    """
+    Route to search movies by name and director, or users by name.
+
+    Query parameters: q (the words to search for, each matched as a prefix),
+    type ('movies' or 'users'), limit and cursor (from a previous response).
+
+    :return: JSON response with the ranked results and the cursor of the next page.
+    """
+    query = request.args.get('q', '').strip()
+    kind = request.args.get('type', 'movies')
+    limit = request.args.get('limit', 20, type=int)
+    if kind not in SEARCH_KINDS:
+        return jsonify({'error': f"Unknown search type, use one of: {', '.join(SEARCH_KINDS)}"}), 400
+    if limit < 1 or limit > MAX_PER_PAGE:
+        limit = 20
+
+    after = None
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            rank, row_id = decode_cursor(cursor)
+            after = (float(rank), int(row_id))
+        except (ValueError, TypeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    try:
+        results, next_cursor = app.data_manager.search(query, kind=kind, limit=limit, after=after)
+        return jsonify({
+            'results': results,
+            'next_cursor': encode_cursor(list(next_cursor)) if next_cursor else None
+        })
+    except SQLAlchemyError as e:
+        app.logger.error(f"Database error occurred while searching {kind}: {e}")
+        return jsonify({'error': 'Database error occurred while searching'}), 500
+
+
+@app.route('/api/omdb/metrics')
+def omdb_metrics():
+    """
+    Route to report OMDb request latency, outcomes and circuit breaker state.
+
+    :return: JSON response with the OMDb client metrics.
+    """
+    return jsonify(app.omdb_client.metrics())
+
+
+@app.route('/api/users/<int:user_id>/movies/import', methods=['POST'])
+def import_user_movies(user_id):
+    """
+    Route to bulk import movies for a user from a CSV or JSON Lines upload.
+
+    The file can be sent as the raw request body or as the 'file' field of a
+    multipart form. Query parameters: format (csv or jsonl, otherwise guessed
+    from the content type or file name), batch_size, and enrich=1 to fill in
+    missing fields from OMDb.
+
+    :param user_id: The unique identifier of the user.
+    :return: A streamed JSON Lines response with one progress event per batch,
+        one error event per rejected row and a final summary event.
+    """
+    user = app.data_manager.get_user_by_id(user_id)
+    if user is None:
+        return jsonify({'error': f'User with ID {user_id} not found'}), 404
+
+    upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+    if upload is not None:
+        stream, filename, content_type = upload.stream, upload.filename, upload.mimetype
+    else:
+        stream, filename, content_type = request.stream, None, request.mimetype
+
+    fmt = request.args.get('format') or detect_format(filename, content_type)
+    if fmt not in FORMATS:
+        return jsonify({'error': f"Unsupported or unknown format, use one of: {', '.join(FORMATS)}"}), 400
+
+    batch_size = request.args.get('batch_size', 500, type=int)
+    batch_size = min(max(batch_size, 1), MAX_IMPORT_BATCH_SIZE)
+    enrich = request.args.get('enrich', '').lower() in ('1', 'true', 'yes')
+    omdb_client = app.omdb_client if enrich else None
+    max_workers = app.config.get('IMPORT_OMDB_WORKERS', 4)
+
+    lines = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    events = import_movies(app.data_manager, user_id, parse_rows(lines, fmt), batch_size=batch_size,
+                           omdb_client=omdb_client, max_workers=max_workers)
+
+    def generate():
+        try:
+            for event in events:
+                yield json.dumps(event) + '\n'
+        except SQLAlchemyError as e:
+            app.logger.error(f"Database error while importing movies for user {user_id}: {e}")
+            yield json.dumps({'type': 'failed', 'error': 'Database error occurred while importing movies'}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/api/data_cache/stats')
+def data_cache_stats():
+    """
+    Route to report the hit/miss statistics of the data manager cache.
+
+    :return: JSON response with the cache statistics, or 404 if caching is disabled.
+    """
+    cache_stats = getattr(app.data_manager, 'cache_stats', None)
+    if cache_stats is None:
+        return jsonify({'error': 'Data cache is disabled'}), 404
+    return jsonify(cache_stats())
+
+
+@app.route('/api/fragment_cache/stats')
+def fragment_cache_stats():
+    """
+    Route to report the hit/miss statistics of the rendered fragment cache.
+
+    :return: JSON response with the cache statistics, or 404 if the fragment cache is disabled.
+    """
+    fragment_cache = getattr(app, 'fragment_cache', None)
+    if fragment_cache is None:
+        return jsonify({'error': 'Fragment cache is disabled'}), 404
+    return jsonify(fragment_cache.stats())
+
+
+@app.route('/metrics')
+def metrics():
+    """
+    Route to expose request, SQL, template and OMDb metrics to Prometheus.
+
+    :return: The metrics in the Prometheus text format, or 404 if instrumentation is disabled.
+    """
+    instrumentation = getattr(app, 'instrumentation', None)
+    if instrumentation is None:
+        return jsonify({'error': 'Instrumentation is disabled'}), 404
+    return Response(instrumentation.render_metrics(app.omdb_client), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/api/users/<int:user_id>/movies.<fmt>')
+@conditional(lambda user_id, fmt: [f'user:{user_id}'])
+def export_user_movies(user_id, fmt):
+    """
+    Route to download a user's movies as JSON, CSV or JSON Lines.
+
+    Rows are streamed from the database cursor, so memory use does not grow
+    with the size of the collection. Add gzip=1 to compress the download.
+
+    :param user_id: The unique identifier of the user.
+    :param fmt: 'json', 'csv' or 'ndjson'.
+    :return: A streamed response with the movies.
+    """
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unsupported format, use one of: {', '.join(EXPORT_FORMATS)}"}), 404
+    user = app.data_manager.get_user_by_id(user_id)
+    if user is None:
+        return jsonify({'error': f'User with ID {user_id} not found'}), 404
+
+    records = app.data_manager.iter_user_movies(user_id, batch_size=app.config.get('EXPORT_BATCH_SIZE', 1000))
+    return export_response(user_movies_export(records, fmt), fmt, f'user-{user_id}-movies.{fmt}',
+                           f'movies of user {user_id}')
+
+
+@app.route('/api/admin/export.<fmt>')
+def export_database(fmt):
+    """
+    Route to download every user and movie as JSON, CSV or JSON Lines.
+
+    Requires the ADMIN_TOKEN setting, sent in the X-Admin-Token header. Rows
+    are streamed from the database cursor; add gzip=1 to compress the download.
+
+    :param fmt: 'json', 'csv' or 'ndjson'.
+    :return: A streamed response with the whole database.
+    """
+    token = app.config.get('ADMIN_TOKEN')
+    if not token:
+        return jsonify({'error': 'Database export is disabled'}), 404
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode(), token.encode()):
+        return jsonify({'error': 'Invalid admin token'}), 403
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unsupported format, use one of: {', '.join(EXPORT_FORMATS)}"}), 404
+
+    pieces = database_export(app.data_manager, fmt, batch_size=app.config.get('EXPORT_BATCH_SIZE', 1000))
+    return export_response(pieces, fmt, f'movieweb-export.{fmt}', 'the database')
+
+
+def api_fields(allowed):
+    """
+    Read the ``fields`` projection from the query string.
+
+    :param allowed: The fields the resource has.
+    :return: A tuple of field names.
+    :raises ValidationError: If an unknown field is requested.
+    """
+    return parse_fields(request.args.get('fields'), allowed)
+
+
+def api_page(page, fields):
+    """
+    Build the JSON body of a page of API results.
+
+    :param page: A Page of users or movies.
+    :param fields: The fields to include in each item.
+    :return: A dictionary with the items, the total (None unless it was counted)
+        and the cursor of the next page.
+    """
+    return {
+        'items': [project(item, fields) for item in page],
+        'total': page.total,
+        'next_cursor': page.next_cursor
+    }
+
+
+@app.route('/api/users', methods=['GET', 'POST'])
+def api_users():
+    """
+    Route to list users as JSON, or to create one.
+
+    GET accepts fields (any of id, name and movie_count), per_page and after
+    (the next_cursor of the previous page). POST takes {"name": ...}.
+
+    :return: JSON response with a page of users, or the new user with status 201.
+    """
+    try:
+        if request.method == 'POST':
+            data = request.get_json(silent=True)
+            name = data.get('name') if isinstance(data, dict) else None
+            if not isinstance(name, str) or not name.strip():
+                return jsonify({'error': "'name' must be a non-empty string"}), 400
+            user_id = app.data_manager.add_user(name.strip())
+            return jsonify({'id': user_id, 'name': name.strip()}), 201
+
+        fields = api_fields(API_USER_FIELDS)
+        _, per_page, after, _ = get_pagination_args(default_per_page=30)
+        users = app.data_manager.get_users_page(per_page=per_page, after=after,
+                                                with_movie_counts='movie_count' in fields)
+        return jsonify(api_page(users, fields))
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    except SQLAlchemyError as e:
+        app.logger.error(f"Database error occurred in the users API: {e}")
+        return jsonify({'error': 'Database error occurred'}), 500
+
+
+@app.route('/api/users/<int:user_id>')
+def api_user(user_id):
+    """
+    Route to get a user as JSON.
+
+    :param user_id: The unique identifier of the user.
+    :return: JSON response with the user's id and name (or the requested fields), or 404.
+    """
+    try:
+        fields = api_fields(('id', 'name'))
+        user = app.data_manager.get_user_by_id(user_id)
+        if user is None:
+            return jsonify({'error': f'User with ID {user_id} not found'}), 404
+        return jsonify(project(user, fields))
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    except SQLAlchemyError as e:
+        app.logger.error(f"Database error occurred while fetching user {user_id}: {e}")
+        return jsonify({'error': 'Database error occurred'}), 500
+
+
+@app.route('/api/users/<int:user_id>/recommendations')
+@conditional(lambda user_id: ['recommendations', f'user:{user_id}'])
+def api_user_recommendations(user_id):
+    """
+    Route to get a user's similar users and recommended movies as JSON.
+
+    The lists are precomputed by the recommendation refresher; 'pending' is
+    true while a refresh of this user is queued. Accepts limit (at most 100).
+
+    :param user_id: The unique identifier of the user.
+    :return: JSON response with similar_users, movies and pending, or 404.
+    """
+    try:
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 100)
+        if app.data_manager.get_user_by_id(user_id) is None:
+            return jsonify({'error': f'User with ID {user_id} not found'}), 404
+        recommendations = app.data_manager.get_recommendations(user_id, limit=limit)
+        return jsonify({
+            'user_id': user_id,
+            'similar_users': [user._asdict() for user in recommendations['similar_users']],
+            'movies': [movie._asdict() for movie in recommendations['movies']],
+            'pending': recommendations['pending']
+        })
+    except SQLAlchemyError as e:
+        app.logger.error(f"Database error occurred while fetching recommendations for user {user_id}: {e}")
+        return jsonify({'error': 'Database error occurred'}), 500
+
+
+@app.route('/api/users/<int:user_id>/movies', methods=['GET', 'POST'])
+def api_user_movies(user_id):
+    """
+    Route to list a user's movies as JSON, or to add one.
+
+    GET accepts fields, per_page and after. POST takes name, director, year
+    and rating; no OMDb lookup is made.
+
+    :param user_id: The unique identifier of the user.
+    :return: JSON response with a page of movies, or the new movie's id with status 201.
+    """
+    try:
+        if request.method == 'POST':
+            movie = validate_movie(request.get_json(silent=True))
+            if app.data_manager.get_user_by_id(user_id) is None:
+                return jsonify({'error': f'User with ID {user_id} not found'}), 404
+            movie_id = app.data_manager.add_movie(user_id=user_id, movie_name=movie['name'],
+                                                  director=movie['director'], year=movie['year'],
+                                                  rating=movie['rating'])
+            return jsonify(dict(movie, id=movie_id, user_id=user_id)), 201
+
+        fields = api_fields(API_MOVIE_FIELDS)
+        if app.data_manager.get_user_by_id(user_id) is None:
+            return jsonify({'error': f'User with ID {user_id} not found'}), 404
+        _, per_page, after, _ = get_pagination_args(default_per_page=20)
+        movies = app.data_manager.get_user_movies_page(user_id, per_page=per_page, after=after)
+        return jsonify(api_page(movies, fields))
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    except SQLAlchemyError as e:
+        app.logger.error(f"Database error occurred in the movies API for user {user_id}: {e}")
+        return jsonify({'error': 'Database error occurred'}), 500
+
+
+@app.route('/api/users/<int:user_id>/movies/<int:movie_id>', methods=['GET', 'PATCH', 'DELETE'])
+def api_user_movie(user_id, movie_id):
+    """
+    Route to get, partially update or delete one of a user's movies.
+
+    PATCH takes any of name, director, year and rating and runs a single
+    UPDATE matching both ids; DELETE runs a single DELETE. Neither loads the
+    movie first: a movie of another user is reported as not found.
+
+    :param user_id: The unique identifier of the user.
+    :param movie_id: The unique identifier of the movie.
+    :return: JSON response with the movie for GET, an empty 204 response
+        for PATCH and DELETE, or 404.
+    """
+    not_found = {'error': f'Movie with ID {movie_id} not found for user {user_id}'}
+    try:
+        if request.method == 'PATCH':
+            values = validate_movie(request.get_json(silent=True), partial=True)
+            if not app.data_manager.update_movie(user_id=user_id, movie_id=movie_id, **values):
+                return jsonify(not_found), 404
+            return '', 204
+        if request.method == 'DELETE':
+            if not app.data_manager.delete_movie(user_id=user_id, movie_id=movie_id):
+                return jsonify(not_found), 404
+            return '', 204
+
+        fields = api_fields(API_MOVIE_FIELDS)
+        movie = app.data_manager.get_movie_by_id(movie_id)
+        if movie is None or movie.user_id != user_id:
+            return jsonify(not_found), 404
+        return jsonify(project(movie, fields))
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    except SQLAlchemyError as e:
+        app.logger.error(f"Database error occurred in the movies API for movie {movie_id}: {e}")
+        return jsonify({'error': 'Database error occurred'}), 500
+
+
+@app.route('/api/users/<int:user_id>/movies/batch', methods=['POST'])
+def api_user_movies_batch(user_id):
+    """
+    Route to create, update and delete several of a user's movies in one transaction.
+
+    The body is {"create": [movie, ...], "update": [{"id": ..., field: value}, ...],
+    "delete": [id, ...]}; every list is optional. If any movie to update or
+    delete is not found for the user, nothing is changed.
+
+    :param user_id: The unique identifier of the user.
+    :return: JSON response with the created ids and the numbers of updated
+        and deleted movies, 400 for an invalid batch or 404.
+    """
+    try:
+        create, update, delete = validate_batch(request.get_json(silent=True))
+        if app.data_manager.get_user_by_id(user_id) is None:
+            return jsonify({'error': f'User with ID {user_id} not found'}), 404
+        return jsonify(app.data_manager.apply_movie_changes(user_id, create=create, update=update, delete=delete))
+    except ValidationError as e:
+        return jsonify({'error': str(e)}), 400
+    except BatchOperationError as e:
+        return jsonify({'error': str(e), 'operation': e.operation, 'index': e.index}), 404
+    except SQLAlchemyError as e:
+        app.logger.error(f"Database error occurred in a movie batch for user {user_id}: {e}")
+        return jsonify({'error': 'Database error occurred'}), 500
@@ -0,0 +1,84 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',        # readers no longer block on writers
+    'synchronous': 'NORMAL',      # durable enough with WAL, far fewer fsyncs
+    'busy_timeout': 5000,         # milliseconds to wait on a locked database
+    'cache_size': -20000,         # negative means KiB, so ~20 MB page cache
+    'mmap_size': 268435456,       # 256 MB memory-mapped I/O
+    'temp_store': 'MEMORY'
+}
+
+DEFAULT_POOL_OPTIONS = {
+    'pool_size': 10,
+    'max_overflow': 10,
+    'pool_timeout': 10,
+    'pool_recycle': 3600
+}
+
+
+def is_file_database(uri):
+    """
+    Check whether a database URI points to an SQLite file.
+
+    :param uri: The SQLAlchemy database URI.
+    :return: True for a file-backed SQLite database, False otherwise.
+    """
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+
+def configure_engine_options(app):
+    """
+    Fill in SQLALCHEMY_ENGINE_OPTIONS with an explicit connection pool.
+
+    Must be called before ``db.init_app``. Options already present in the
+    configuration win over the defaults, and the pool sizes can be tuned
+    with SQLITE_POOL_SIZE, SQLITE_MAX_OVERFLOW and SQLITE_POOL_TIMEOUT.
+
+    :param app: The Flask application instance.
+    """
+    config = app.config
+    if not config.get('SQLITE_PROFILE_ENABLED', True) or not is_file_database(config['SQLALCHEMY_DATABASE_URI']):
+        return
+
+    options = dict(DEFAULT_POOL_OPTIONS)
+    options['pool_size'] = config.get('SQLITE_POOL_SIZE', options['pool_size'])
+    options['max_overflow'] = config.get('SQLITE_MAX_OVERFLOW', options['max_overflow'])
+    options['pool_timeout'] = config.get('SQLITE_POOL_TIMEOUT', options['pool_timeout'])
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+
+def get_pragmas(app):
+    """
+    Build the pragmas to apply on every connection.
+
+    :param app: The Flask application instance.
+    :return: The default pragmas updated with the SQLITE_PRAGMAS setting.
+    """
+    pragmas = dict(DEFAULT_PRAGMAS)
+    pragmas.update(app.config.get('SQLITE_PRAGMAS') or {})
+    return pragmas
+
+
+def register_pragmas(engine, pragmas):
+    """
+    Apply the pragmas to every new DBAPI connection of the engine.
+
+    :param engine: The SQLAlchemy engine.
+    :param pragmas: A dictionary of pragma names to values; None values are skipped.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                if value is not None:
+                    cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
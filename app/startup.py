@@ -0,0 +1,111 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+
+
+class LazyProxy:
+    """
+    Stand-in for an object that is only built when it is first used.
+
+    The factory runs once, under a lock, on the first attribute access;
+    every later access goes straight to the built object.
+    """
+
+    def __init__(self, factory):
+        """
+        Initialize the proxy.
+
+        :param factory: A callable without arguments returning the object.
+        """
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        """
+        Whether the object has been built yet.
+        """
+        return self._instance is not None
+
+    def get(self):
+        """
+        Build the object if needed and return it.
+
+        :return: The object returned by the factory.
+        """
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+class SchemaInitializer:
+    """
+    Runs the database schema initialization once per process, on demand.
+
+    With deferred initialization, ``create_app`` does not touch the database
+    at all; the first request (or background worker) to need it runs
+    ``init_db`` while the others wait on the lock.
+    """
+
+    def __init__(self, app, init):
+        """
+        Initialize the schema initializer.
+
+        :param app: The Flask application instance.
+        :param init: The function initializing the database, called with the app.
+        """
+        self.app = app
+        self._init = init
+        self._done = False
+        self._lock = threading.Lock()
+
+    def ensure(self):
+        """
+        Initialize the schema unless this process already did.
+        """
+        if self._done:
+            return
+        with self._lock:
+            if not self._done:
+                self._init(self.app)
+                self._done = True
+
+
+def configure_logging(level='INFO', queued=True):
+    """
+    Configure the root logger, optionally behind a non-blocking queue.
+
+    With ``queued``, the root logger only has a QueueHandler: a request that
+    logs puts the record on an in-memory queue and returns, and a background
+    QueueListener thread formats it and writes it to stderr. The listener is
+    stopped, flushing the queue, when the process exits.
+
+    :param level: The root log level, e.g. 'INFO' or 'DEBUG'.
+    :param queued: Write records from a background thread instead of the caller.
+    :return: The QueueListener, or None when logging is not queued.
+    """
+    root = logging.getLogger()
+    root.setLevel(level)
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+
+    if not queued:
+        root.addHandler(handler)
+        return None
+
+    records = queue.SimpleQueue()
+    root.addHandler(logging.handlers.QueueHandler(records))
+    listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -0,0 +1,39 @@
+import os
+from jinja2 import FileSystemBytecodeCache
+
+
+def configure_templates(app):
+    """
+    Give the Jinja environment a bytecode cache shared by every worker.
+
+    Compiled templates are written to JINJA_BYTECODE_CACHE_DIR (the system
+    temporary directory by default) and reused by later processes, which
+    then skip parsing and compiling the template sources. Entries are keyed
+    on a checksum of the source, so an edited template is compiled again.
+    Must run before the environment is first used.
+
+    :param app: The Flask application instance.
+    """
+    if not app.config.get('JINJA_BYTECODE_CACHE_ENABLED', True):
+        return
+    directory = app.config.get('JINJA_BYTECODE_CACHE_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    app.jinja_options = dict(app.jinja_options, bytecode_cache=FileSystemBytecodeCache(directory))
+
+
+def precompile_templates(app):
+    """
+    Load every template into the environment's cache at startup.
+
+    A cold worker otherwise compiles (or reads the bytecode of) each
+    template on its first request. Together with TEMPLATES_AUTO_RELOAD off,
+    outside debug mode, templates are never checked for changes afterwards.
+
+    :param app: The Flask application instance.
+    :return: The number of templates loaded.
+    """
+    names = app.jinja_env.list_templates(extensions=('html',))
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
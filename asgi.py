@@ -0,0 +1,12 @@
+from app import create_app
+from app.asgi import create_asgi_app
+from app.startup import configure_logging
+from config import Config
+
+
+# Configure logging; records are written by a background thread unless LOG_QUEUE_ENABLED is False
+configure_logging(level=getattr(Config, 'LOG_LEVEL', 'INFO'), queued=getattr(Config, 'LOG_QUEUE_ENABLED', True))
+
+
+# Serve with: uvicorn asgi:application
+application = create_asgi_app(create_app())
@@ -0,0 +1,453 @@
+"""
+Benchmark every route of the application on a seeded scratch database.
+
+The harness seeds a database with benchmarks.seed, starts the OMDb stub and
+the application in a separate process, then sends ``--requests`` requests
+to each route from ``--concurrency`` clients. Latency percentiles,
+throughput, errors and the server's memory use are written to a JSON file,
+and ``--compare`` prints the change against an earlier run:
+
+    python -m benchmarks.harness --users 1000 --movies-per-user 50 --output results.json
+    python -m benchmarks.harness --compare results.json --output after.json
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import requests
+from benchmarks.load_test import free_port, percentile
+from benchmarks.omdb_stub import OMDbStub
+from benchmarks.seed import ADMIN_TOKEN, seed_database
+
+Route = namedtuple('Route', ['name', 'endpoint', 'method', 'expected', 'build'])
+
+IMPORT_BODY = ''.join(f"Imported Movie {n},Director {n},{1990 + n},{5 + n % 5}.0\n" for n in range(20))
+
+
+class Workload:
+    """
+    Picks the users, movies and form data of each request deterministically.
+
+    Every client thread gets its own random generator derived from the seed.
+    Deletes are handed out from a shared sequence so no movie is deleted
+    twice, and updates only touch the first half of each user's movies,
+    which deletes never reach.
+    """
+
+    def __init__(self, users, movies_per_user, seed):
+        """
+        Initialize the workload.
+
+        :param users: The number of seeded users.
+        :param movies_per_user: The number of movies per seeded user.
+        :param seed: Seed of the random generators.
+        """
+        self.users = users
+        self.movies_per_user = movies_per_user
+        self.seed = seed
+        self._deletes = itertools.count()
+        self._lock = threading.Lock()
+
+    def rng(self, route, client):
+        """
+        Build the random generator of one client of one route.
+
+        :param route: The route name.
+        :param client: The client number.
+        :return: A seeded random.Random.
+        """
+        return random.Random(f"{self.seed}:{route}:{client}")
+
+    def user_id(self, rng):
+        return rng.randint(1, self.users)
+
+    def movie_id(self, rng):
+        """
+        Pick a movie that is never deleted, with its owner.
+
+        :param rng: The client's random generator.
+        :return: A (user_id, movie_id) tuple.
+        """
+        user_id = self.user_id(rng)
+        offset = rng.randint(1, max(1, self.movies_per_user // 2))
+        return user_id, (user_id - 1) * self.movies_per_user + offset
+
+    def deletable_movie(self):
+        """
+        Hand out the next movie to delete, taken from the end of each user's list.
+
+        :return: A (user_id, movie_id) tuple.
+        """
+        with self._lock:
+            number = next(self._deletes)
+        user_id = number % self.users + 1
+        return user_id, user_id * self.movies_per_user - number // self.users
+
+
+def build_routes():
+    """
+    Describe how to call every route of the application.
+
+    Reads come first so they are measured against the freshly seeded data.
+
+    :return: A list of Route.
+    """
+    def movie_form(rng):
+        return {'name': f"Benchmark Movie {rng.randint(1, 10 ** 6)}", 'director': 'Bench Director',
+                'year': str(rng.randint(1950, 2024)), 'rating': f"{rng.uniform(1, 10):.1f}"}
+
+    def add_movie(w, rng):
+        user_id = w.user_id(rng)
+        # Mostly new titles, so the OMDb cache does not hide the stub's latency
+        return f'/users/{user_id}/add_movie', {'data': {'selected_user_id': str(user_id),
+                                                        'name': f"Benchmark Title {rng.randint(1, 10 ** 6)}"}}
+
+    def update_movie(w, rng):
+        user_id, movie_id = w.movie_id(rng)
+        return f'/users/{user_id}/update_movie/{movie_id}', {'data': movie_form(rng)}
+
+    def delete_movie(w, rng):
+        user_id, movie_id = w.deletable_movie()
+        return f'/users/{user_id}/delete_movie/{movie_id}', {}
+
+    def update_form(w, rng):
+        user_id, movie_id = w.movie_id(rng)
+        return f'/users/{user_id}/update_movie/{movie_id}', {}
+
+    def movie_json(rng):
+        return {'name': f"Benchmark Movie {rng.randint(1, 10 ** 6)}", 'director': 'Bench Director',
+                'year': rng.randint(1950, 2024), 'rating': round(rng.uniform(1, 10), 1)}
+
+    def api_patch_movie(w, rng):
+        user_id, movie_id = w.movie_id(rng)
+        return f'/api/users/{user_id}/movies/{movie_id}', {'json': {'rating': round(rng.uniform(1, 10), 1)}}
+
+    def api_delete_movie(w, rng):
+        user_id, movie_id = w.deletable_movie()
+        return f'/api/users/{user_id}/movies/{movie_id}', {}
+
+    def api_batch(w, rng):
+        user_id, movie_id = w.movie_id(rng)
+        return f'/api/users/{user_id}/movies/batch', {'json': {
+            'create': [movie_json(rng) for _ in range(2)],
+            'update': [{'id': movie_id, 'rating': round(rng.uniform(1, 10), 1)}]}}
+
+    def import_movies(w, rng):
+        return f'/api/users/{w.user_id(rng)}/movies/import', {
+            'data': IMPORT_BODY.encode(), 'headers': {'Content-Type': 'text/csv'}}
+
+    return [
+        Route('home', 'home', 'GET', 200, lambda w, rng: ('/', {})),
+        Route('list_users', 'list_users', 'GET', 200,
+              lambda w, rng: (f'/users?page={rng.randint(1, 5)}', {})),
+        Route('list_users_search', 'list_users', 'GET', 200,
+              lambda w, rng: (f'/users?q={rng.choice("ABCDEFGHKLMNRSTWYZ")}', {})),
+        Route('user_movies', 'user_movies', 'GET', 200, lambda w, rng: (f'/users/{w.user_id(rng)}', {})),
+        Route('add_user_form', 'add_user', 'GET', 200, lambda w, rng: ('/add_user', {})),
+        Route('add_movie_form', 'add_movie', 'GET', 200,
+              lambda w, rng: (f'/users/{w.user_id(rng)}/add_movie', {})),
+        Route('update_movie_form', 'update_movie', 'GET', 200, update_form),
+        Route('recent_movies', 'recent_movies', 'GET', 200, lambda w, rng: ('/api/recent_movies', {})),
+        Route('user_statistics', 'user_statistics', 'GET', 200, lambda w, rng: ('/api/user_statistics', {})),
+        Route('dashboard', 'dashboard', 'GET', 200, lambda w, rng: ('/api/dashboard', {})),
+        Route('search_movies', 'search', 'GET', 200,
+              lambda w, rng: (f'/api/search?q={rng.choice(("night", "star", "gold", "ret", "win"))}', {})),
+        Route('search_users', 'search', 'GET', 200,
+              lambda w, rng: (f'/api/search?type=users&q={rng.choice(("ada", "knuth", "gra", "wir"))}', {})),
+        Route('omdb_metrics', 'omdb_metrics', 'GET', 200, lambda w, rng: ('/api/omdb/metrics', {})),
+        Route('data_cache_stats', 'data_cache_stats', 'GET', (200, 404),
+              lambda w, rng: ('/api/data_cache/stats', {})),
+        Route('fragment_cache_stats', 'fragment_cache_stats', 'GET', (200, 404),
+              lambda w, rng: ('/api/fragment_cache/stats', {})),
+        Route('metrics', 'metrics', 'GET', 200, lambda w, rng: ('/metrics', {})),
+        Route('export_user_movies_json', 'export_user_movies', 'GET', 200,
+              lambda w, rng: (f'/api/users/{w.user_id(rng)}/movies.json', {})),
+        Route('export_user_movies_csv_gzip', 'export_user_movies', 'GET', 200,
+              lambda w, rng: (f'/api/users/{w.user_id(rng)}/movies.csv?gzip=1', {})),
+        Route('export_database', 'export_database', 'GET', 200,
+              lambda w, rng: ('/api/admin/export.ndjson', {'headers': {'X-Admin-Token': ADMIN_TOKEN}})),
+        Route('api_users', 'api_users', 'GET', 200,
+              lambda w, rng: ('/api/users?fields=id,name,movie_count', {})),
+        Route('api_user', 'api_user', 'GET', 200, lambda w, rng: (f'/api/users/{w.user_id(rng)}', {})),
+        Route('api_user_movies', 'api_user_movies', 'GET', 200,
+              lambda w, rng: (f'/api/users/{w.user_id(rng)}/movies?fields=id,name,year', {})),
+        Route('api_user_movie', 'api_user_movie', 'GET', 200,
+              lambda w, rng: ('/api/users/{}/movies/{}'.format(*w.movie_id(rng)), {})),
+        Route('api_user_recommendations', 'api_user_recommendations', 'GET', 200,
+              lambda w, rng: (f'/api/users/{w.user_id(rng)}/recommendations', {})),
+        Route('trigger_error', 'trigger_error', 'GET', 500, lambda w, rng: ('/trigger-error', {})),
+        Route('add_user', 'add_user', 'POST', 302,
+              lambda w, rng: ('/add_user', {'data': {'name': f"Bench User {rng.randint(1, 10 ** 6)}"}})),
+        Route('add_movie', 'add_movie', 'POST', 302, add_movie),
+        Route('update_movie', 'update_movie', 'POST', 302, update_movie),
+        Route('delete_movie', 'delete_movie', 'POST', 302, delete_movie),
+        Route('import_movies', 'import_user_movies', 'POST', 200, import_movies),
+        Route('api_add_user', 'api_users', 'POST', 201,
+              lambda w, rng: ('/api/users', {'json': {'name': f"Bench User {rng.randint(1, 10 ** 6)}"}})),
+        Route('api_add_movie', 'api_user_movies', 'POST', 201,
+              lambda w, rng: (f'/api/users/{w.user_id(rng)}/movies', {'json': movie_json(rng)})),
+        Route('api_patch_movie', 'api_user_movie', 'PATCH', 204, api_patch_movie),
+        Route('api_delete_movie', 'api_user_movie', 'DELETE', 204, api_delete_movie),
+        Route('api_movies_batch', 'api_user_movies_batch', 'POST', 200, api_batch),
+    ]
+
+
+def uncovered_endpoints(app, routes):
+    """
+    Find application endpoints the benchmark does not exercise.
+
+    :param app: The Flask application.
+    :param routes: The benchmark routes.
+    :return: A sorted list of endpoint names.
+    """
+    endpoints = {rule.endpoint for rule in app.url_map.iter_rules()} - {'static'}
+    return sorted(endpoints - {route.endpoint for route in routes})
+
+
+def server_memory(pid):
+    """
+    Read the resident memory of a process from /proc.
+
+    :param pid: The process id.
+    :return: A dictionary with rss_kb and peak_rss_kb, or None where /proc is unavailable.
+    """
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            fields = dict(line.split(':', 1) for line in status if ':' in line)
+    except OSError:
+        return None
+    return {'rss_kb': int(fields['VmRSS'].split()[0]), 'peak_rss_kb': int(fields['VmHWM'].split()[0])}
+
+
+def start_server(db_path, omdb_url, mode, config, timeout=60):
+    """
+    Start the application in a separate process and wait until it answers.
+
+    :param db_path: The seeded database file.
+    :param omdb_url: Base URL of the OMDb stub.
+    :param mode: 'wsgi' or 'asgi'.
+    :param config: Extra config overrides.
+    :param timeout: Seconds to wait for the server to come up.
+    :return: A tuple of (process, base_url).
+    """
+    port = free_port()
+    command = [sys.executable, '-m', 'benchmarks.server', db_path, '--port', str(port),
+               '--omdb-url', omdb_url, '--mode', mode, '--config', json.dumps(config)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"The server exited with status {process.returncode}")
+        try:
+            requests.get(base_url + '/api/omdb/metrics', timeout=1)
+            return process, base_url
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"The server did not start within {timeout} seconds")
+
+
+def run_route(base_url, route, workload, count, concurrency):
+    """
+    Send a fixed number of requests to one route.
+
+    :param base_url: The server's base URL.
+    :param route: The Route to exercise.
+    :param workload: The Workload picking request parameters.
+    :param count: The number of requests.
+    :param concurrency: Number of concurrent clients.
+    :return: A dictionary with request and error counts, throughput and
+        latency percentiles in milliseconds.
+    """
+    expected = route.expected if isinstance(route.expected, tuple) else (route.expected,)
+    shares = [count // concurrency + (1 if n < count % concurrency else 0) for n in range(concurrency)]
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def client(number):
+        nonlocal errors
+        rng = workload.rng(route.name, number)
+        session = requests.Session()
+        own, failed = [], 0
+        for _ in range(shares[number]):
+            path, kwargs = route.build(workload, rng)
+            started = time.perf_counter()
+            try:
+                response = session.request(route.method, base_url + path, allow_redirects=False,
+                                            timeout=60, **kwargs)
+                response.content  # Include the (possibly streamed) body in the timing
+                ok = response.status_code in expected
+            except requests.RequestException:
+                ok = False
+            own.append(time.perf_counter() - started)
+            if not ok:
+                failed += 1
+        with lock:
+            latencies.extend(own)
+            errors += failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(client, range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def git_revision():
+    """
+    Identify the code being benchmarked.
+
+    :return: The current commit hash (with '-dirty' for local changes), or None outside git.
+    """
+    try:
+        revision = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                               text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return revision + ('-dirty' if dirty else '')
+
+
+def run_benchmark(users=200, movies_per_user=20, seed=42, requests_per_route=200, concurrency=8,
+                  mode='wsgi', omdb_latency=0.05, config=None, only=None, db_path=None):
+    """
+    Seed a database, start the servers and benchmark every route.
+
+    :param users: The number of seeded users.
+    :param movies_per_user: The number of movies per seeded user.
+    :param seed: Seed of the data generator and the request parameters.
+    :param requests_per_route: Requests sent to each route.
+    :param concurrency: Number of concurrent clients.
+    :param mode: 'wsgi' or 'asgi'.
+    :param omdb_latency: Seconds the OMDb stub waits before answering.
+    :param config: Extra config overrides for the application, e.g. {'DATA_CACHE_ENABLED': True}.
+    :param only: Optional list of route names to run.
+    :param db_path: Where to create the scratch database; a temporary file by default.
+    :return: A JSON-serializable dictionary of results.
+    """
+    config = config or {}
+    routes = [route for route in build_routes() if not only or route.name in only]
+    with tempfile.TemporaryDirectory(prefix='movieweb-bench-') as scratch:
+        db_path = db_path or os.path.join(scratch, 'bench.db')
+        seeded = seed_database(db_path, users=users, movies_per_user=movies_per_user, seed=seed)
+
+        from app import create_app
+        from benchmarks.seed import scratch_config
+        missing = uncovered_endpoints(create_app(scratch_config(db_path)), build_routes())
+        if missing:
+            print(f"Warning: endpoints without a benchmark: {', '.join(missing)}", file=sys.stderr)
+
+        stub = OMDbStub(latency=omdb_latency).start()
+        process, base_url = start_server(db_path, stub.url, mode, config)
+        workload = Workload(users, movies_per_user, seed)
+        results = {}
+        try:
+            baseline_memory = server_memory(process.pid)
+            for route in routes:
+                results[route.name] = run_route(base_url, route, workload, requests_per_route, concurrency)
+                results[route.name]['memory'] = server_memory(process.pid)
+                print(f"{route.name:<20} {results[route.name]['p50_ms']:>8} ms p50 "
+                      f"{results[route.name]['throughput']:>8} req/s", file=sys.stderr)
+            final_memory = server_memory(process.pid)
+        finally:
+            process.terminate()
+            process.wait(10)
+            stub.stop()
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'mode': mode,
+            'seed': seed,
+            'users': seeded['users'],
+            'movies': seeded['movies'],
+            'requests_per_route': requests_per_route,
+            'concurrency': concurrency,
+            'omdb_latency': omdb_latency,
+            'config': config,
+        },
+        'memory': {'start': baseline_memory, 'end': final_memory},
+        'routes': results,
+    }
+
+
+def compare(baseline, current):
+    """
+    Format the change of each route's latency and throughput between two runs.
+
+    :param baseline: Results of the earlier run.
+    :param current: Results of the later run.
+    :return: The report as a list of lines.
+    """
+    def change(old, new):
+        return f"{(new - old) / old * 100:+.1f}%" if old else 'n/a'
+
+    lines = [f"{'route':<20} {'p50 ms':>16} {'p95 ms':>16} {'req/s':>18}"]
+    for name, new in current['routes'].items():
+        old = baseline['routes'].get(name)
+        if old is None:
+            lines.append(f"{name:<20} (not in baseline)")
+            continue
+        lines.append(f"{name:<20} {new['p50_ms']:>8} {change(old['p50_ms'], new['p50_ms']):>7} "
+                     f"{new['p95_ms']:>8} {change(old['p95_ms'], new['p95_ms']):>7} "
+                     f"{new['throughput']:>10} {change(old['throughput'], new['throughput']):>7}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--movies-per-user', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=200, help='requests per route')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--mode', choices=('wsgi', 'asgi'), default='wsgi')
+    parser.add_argument('--omdb-latency', type=float, default=0.05, help='seconds per OMDb stub answer')
+    parser.add_argument('--config', default='{}', help='JSON object of extra config overrides')
+    parser.add_argument('--routes', nargs='+', help='only run these routes')
+    parser.add_argument('--db', help='keep the scratch database at this path')
+    parser.add_argument('--output', default='benchmark-results.json', help='where to write the JSON results')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(users=args.users, movies_per_user=args.movies_per_user, seed=args.seed,
+                            requests_per_route=args.requests, concurrency=args.concurrency, mode=args.mode,
+                            omdb_latency=args.omdb_latency, config=json.loads(args.config), only=args.routes,
+                            db_path=args.db)
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            print('\n'.join(compare(json.load(baseline), results)))
+
+
+if __name__ == '__main__':
+    main()
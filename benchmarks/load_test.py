@@ -0,0 +1,173 @@
+"""
+Compare the sync (Flask/WSGI) and async (ASGI) read paths under concurrent dashboard pollers.
+
+Each server is started in its own process on the configured database, then
+``--concurrency`` clients poll /api/recent_movies and /api/user_statistics
+back to back for ``--duration`` seconds. Run from the repository root:
+
+    python -m benchmarks.load_test --concurrency 200 --duration 20
+"""
+import argparse
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+ENDPOINTS = ('/api/recent_movies', '/api/user_statistics')
+
+SERVERS = {
+    # The current deployment: Werkzeug's threaded WSGI server, one thread per request
+    'sync': [sys.executable, '-c',
+             "from werkzeug.serving import run_simple; from app import create_app; "
+             "run_simple('127.0.0.1', {port}, create_app(), threaded=True)"],
+    # The ASGI application: the dashboard endpoints run on uvicorn's event loop
+    'async': [sys.executable, '-m', 'uvicorn', 'asgi:application', '--host', '127.0.0.1', '--port', '{port}',
+              '--log-level', 'warning'],
+}
+
+
+def free_port():
+    """
+    Find a free TCP port on the loopback interface.
+
+    :return: The port number.
+    """
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, port, timeout=30):
+    """
+    Start a server process and wait until it answers.
+
+    :param mode: 'sync' or 'async'.
+    :param port: The port to listen on.
+    :param timeout: Seconds to wait for the server to come up.
+    :return: The server's Popen object.
+    """
+    command = [part.replace('{port}', str(port)) for part in SERVERS[mode]]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f'http://127.0.0.1:{port}{ENDPOINTS[0]}', timeout=1)
+            return process
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"The {mode} server did not start within {timeout} seconds")
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of a list of numbers.
+
+    :param values: The sorted values.
+    :param fraction: The percentile as a fraction, e.g. 0.95.
+    :return: The value at that rank, or 0.0 for an empty list.
+    """
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def poll(base_url, concurrency, duration):
+    """
+    Poll the dashboard endpoints from many concurrent clients.
+
+    :param base_url: The server's base URL.
+    :param concurrency: Number of concurrent pollers.
+    :param duration: Seconds to keep polling.
+    :return: A dictionary with request counts, throughput and latency percentiles in milliseconds.
+    """
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def poller(number):
+        nonlocal errors
+        session = requests.Session()
+        session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        own, failed = [], 0
+        while time.monotonic() < deadline:
+            path = ENDPOINTS[number % len(ENDPOINTS)]
+            number += 1
+            started = time.perf_counter()
+            try:
+                ok = session.get(base_url + path, timeout=30).status_code == 200
+            except requests.RequestException:
+                ok = False
+            if ok:
+                own.append(time.perf_counter() - started)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(own)
+            errors += failed
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(poller, range(concurrency)))
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def run(modes, concurrency, duration):
+    """
+    Benchmark each server mode in turn.
+
+    :param modes: The modes to compare, e.g. ('sync', 'async').
+    :param concurrency: Number of concurrent pollers.
+    :param duration: Seconds to poll each server.
+    :return: A dictionary mapping each mode to its results.
+    """
+    results = {}
+    for mode in modes:
+        port = free_port()
+        process = start_server(mode, port)
+        try:
+            results[mode] = poll(f'http://127.0.0.1:{port}', concurrency, duration)
+        finally:
+            process.terminate()
+            process.wait(10)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--modes', nargs='+', choices=sorted(SERVERS), default=['sync', 'async'])
+    parser.add_argument('--concurrency', type=int, default=100, help='concurrent pollers')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per server')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args(argv)
+
+    results = run(args.modes, args.concurrency, args.duration)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.concurrency} pollers, {args.duration:g}s per server")
+    print(f"{'mode':<6} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for mode, result in results.items():
+        print(f"{mode:<6} {result['requests']:>9} {result['errors']:>7} {result['throughput']:>8} "
+              f"{result['p50_ms']:>8} {result['p95_ms']:>8} {result['p99_ms']:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+A local stand-in for the OMDb API with deterministic answers and configurable latency.
+
+Titles starting with "Unknown" are answered with OMDb's "Movie not found!"
+error; every other title gets details derived from a hash of the title.
+Run from the repository root:
+
+    python -m benchmarks.omdb_stub --port 8765 --latency 0.05
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def stub_payload(title):
+    """
+    Build the OMDb answer for a title.
+
+    :param title: The requested title.
+    :return: A dictionary shaped like an OMDb response.
+    """
+    if not title or title.lower().startswith('unknown'):
+        return {'Response': 'False', 'Error': 'Movie not found!'}
+    number = int(hashlib.sha1(title.lower().encode()).hexdigest()[:8], 16)
+    return {
+        'Response': 'True',
+        'Title': title,
+        'Director': f"Director {number % 500}",
+        'Year': str(1950 + number % 75),
+        'imdbRating': f"{1 + number % 90 / 10:.1f}",
+        'imdbID': f"tt{number % 10 ** 7:07d}",
+    }
+
+
+class OMDbStub:
+    """
+    A threaded HTTP server answering OMDb title lookups.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0):
+        """
+        Initialize the stub server.
+
+        :param host: The interface to listen on.
+        :param port: The port to listen on; 0 picks a free one.
+        :param latency: Seconds to wait before answering, to mimic the real API.
+        """
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                title = parse_qs(urlparse(self.path).query).get('t', [''])[0]
+                with stub._lock:
+                    stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                body = json.dumps(stub_payload(title)).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """
+        The base URL to use as OMDB_BASE_URL.
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        """
+        Serve requests in a background thread.
+
+        :return: The stub itself, for chaining.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, name='omdb-stub', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving and close the socket.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per answer')
+    args = parser.parse_args(argv)
+
+    stub = OMDbStub(args.host, args.port, args.latency)
+    print(f"OMDb stub listening on {stub.url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub._server.server_close()
+
+
+if __name__ == '__main__':
+    main()
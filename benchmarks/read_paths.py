@@ -0,0 +1,126 @@
+"""
+Compare the ORM and Core (record) read paths behind the list views.
+
+Seeds a scratch database, then times each pair of data manager calls in
+the same process, with a fresh session per call as in a request, and
+records the peak memory allocated by one call. Run from the repository root:
+
+    python -m benchmarks.read_paths --users 2000 --movies-per-user 200 --per-page 100
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from benchmarks.seed import scratch_config, seed_database
+
+
+def build_cases(data_manager, user_id, per_page):
+    """
+    Describe the ORM and Core call of every list view.
+
+    :param data_manager: The SQLiteDataManager.
+    :param user_id: The user whose movies are listed.
+    :param per_page: The page size of the paginated views.
+    :return: A list of (name, orm_call, core_call) tuples.
+    """
+    from app.data_manager.sqlite_data_manager import Movie
+
+    return [
+        ('list_users',
+         lambda: data_manager.get_users_page(per_page=per_page, with_movie_counts=True).items,
+         lambda: data_manager.get_user_summaries_page(per_page=per_page).items),
+        ('user_movies',
+         lambda: data_manager.get_user_movies_page(user_id, per_page=per_page).items,
+         lambda: data_manager.get_user_movie_records_page(user_id, per_page=per_page).items),
+        ('recent_movies',
+         lambda: Movie.query.order_by(Movie.id.desc()).limit(3).all(),
+         lambda: data_manager.get_recent_movies(3)),
+    ]
+
+
+def measure(call, iterations):
+    """
+    Time a call and measure the memory it allocates.
+
+    :param call: The function to run; its result is touched attribute by attribute like a template would.
+    :param iterations: The number of timed calls.
+    :return: A dictionary with the median and mean time in milliseconds and the peak allocation in KiB.
+    """
+    from app import db
+
+    def run():
+        for item in call():
+            for field in ('id', 'name'):
+                getattr(item, field)
+        db.session.remove()
+
+    run()  # warm up statement caches
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'median_ms': round(statistics.median(timings), 3), 'mean_ms': round(statistics.mean(timings), 3),
+            'peak_kib': round(peak / 1024, 1)}
+
+
+def run_comparison(path, users, movies_per_user, per_page, iterations, seed=42):
+    """
+    Seed a database and compare both read paths on it.
+
+    :param path: Path of the scratch SQLite file.
+    :param users: The number of users to seed.
+    :param movies_per_user: The number of movies per user.
+    :param per_page: The page size of the paginated views.
+    :param iterations: The number of timed calls per path.
+    :param seed: Seed of the random generator.
+    :return: A dictionary of results per view.
+    """
+    from app import create_app
+
+    seed_database(path, users=users, movies_per_user=movies_per_user, seed=seed)
+    app = create_app(dict(scratch_config(path), INSTRUMENTATION_ENABLED=False, DATA_CACHE_ENABLED=False))
+    results = {}
+    with app.app_context():
+        for name, orm_call, core_call in build_cases(app.data_manager, users // 2, per_page):
+            orm = measure(orm_call, iterations)
+            core = measure(core_call, iterations)
+            results[name] = {'orm': orm, 'core': core,
+                             'speedup': round(orm['median_ms'] / core['median_ms'], 2) if core['median_ms'] else None}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--movies-per-user', type=int, default=200)
+    parser.add_argument('--per-page', type=int, default=100)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--database', help='scratch SQLite file (default: a temporary file)')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.database or os.path.join(directory, 'read_paths.db')
+        results = run_comparison(path, args.users, args.movies_per_user, args.per_page, args.iterations)
+
+    print(f"{'view':<16}{'ORM ms':>10}{'Core ms':>10}{'speedup':>10}{'ORM KiB':>10}{'Core KiB':>10}")
+    for name, result in results.items():
+        print(f"{name:<16}{result['orm']['median_ms']:>10}{result['core']['median_ms']:>10}"
+              f"{result['speedup']:>9}x{result['orm']['peak_kib']:>10}{result['core']['peak_kib']:>10}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'arguments': vars(args), 'results': results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Seed a scratch SQLite database with deterministic synthetic users and movies.
+
+The same arguments always produce the same rows, with ids assigned in order:
+user ``u`` (1-based) owns movies ``(u - 1) * movies_per_user + 1`` to
+``u * movies_per_user``, each linking to a title drawn from a catalog shared
+by every user (by default a fifth as many titles as movies). Run from the
+repository root:
+
+    python -m benchmarks.seed /tmp/bench.db --users 1000 --movies-per-user 50
+"""
+import argparse
+import os
+import random
+from sqlalchemy import insert
+from app.omdb.client import normalize_title
+
+FIRST_NAMES = ('Ada', 'Alan', 'Barbara', 'Claude', 'Dennis', 'Edsger', 'Frances', 'Grace', 'Guido', 'Hedy',
+               'Ken', 'Linus', 'Margaret', 'Niklaus', 'Radia', 'Sophie', 'Tim', 'Whitfield', 'Yukihiro', 'Zoe')
+LAST_NAMES = ('Allen', 'Berners', 'Codd', 'Dijkstra', 'Easley', 'Floyd', 'Goldberg', 'Hopper', 'Iverson',
+              'Johnson', 'Knuth', 'Lamport', 'Liskov', 'McCarthy', 'Naur', 'Perlman', 'Ritchie', 'Thompson',
+              'Wilson', 'Wirth')
+TITLE_WORDS = ('Night', 'Return', 'Empire', 'Shadow', 'River', 'Last', 'Silent', 'Golden', 'City', 'Storm',
+               'Garden', 'Iron', 'Echo', 'Winter', 'Summer', 'Glass', 'Paper', 'Secret', 'Lost', 'Star',
+               'Ocean', 'Machine', 'Dream', 'Fire', 'Mountain', 'Midnight', 'Crimson', 'Northern', 'Velvet',
+               'Hidden')
+
+BATCH_SIZE = 5000
+ADMIN_TOKEN = 'benchmark'
+
+
+def scratch_config(path, omdb_url=None):
+    """
+    Build the configuration overrides pointing the app at a scratch database.
+
+    :param path: Path of the SQLite file.
+    :param omdb_url: Base URL of the OMDb server to use, e.g. a local stub.
+    :return: A dictionary for create_app(config_overrides=...).
+    """
+    overrides = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.abspath(path)}",
+        'AUTO_MIGRATE': True,
+        'OMDB_ENRICHMENT_MODE': 'sync',
+        'ENRICHMENT_WORKERS_AUTOSTART': False,
+        'RECOMMENDATIONS_AUTOSTART': False,
+        'ADMIN_TOKEN': ADMIN_TOKEN,
+    }
+    if omdb_url:
+        overrides['OMDB_BASE_URL'] = omdb_url
+        overrides['OMDB_API_KEY'] = 'benchmark'
+    return overrides
+
+
+def generate_users(count, rng):
+    """
+    Generate user rows.
+
+    :param count: The number of users.
+    :param rng: A seeded random.Random.
+    :return: A generator of dictionaries with id and name.
+    """
+    for user_id in range(1, count + 1):
+        yield {'id': user_id, 'name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {user_id}"}
+
+
+def generate_titles(count, rng):
+    """
+    Generate the rows of the titles catalog, each a distinct film (normalized name and year).
+
+    :param count: The number of titles.
+    :param rng: A seeded random.Random.
+    :return: A generator of dictionaries matching the titles table.
+    """
+    seen = set()
+    while len(seen) < count:
+        name = ' '.join(rng.sample(TITLE_WORDS, rng.randint(1, 3)))
+        director = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        year, rating = rng.randint(1950, 2024), round(rng.uniform(1.0, 10.0), 1)
+        if (normalize_title(name), year) in seen:
+            continue
+        seen.add((normalize_title(name), year))
+        yield {
+            'id': len(seen),
+            'title_key': normalize_title(name),
+            'name': name,
+            'director': director,
+            'year': year,
+            'rating': rating,
+            'enrichment_status': 'complete',
+        }
+
+
+def generate_movies(users, movies_per_user, titles, rng):
+    """
+    Generate movie rows for every user.
+
+    :param users: The number of users.
+    :param movies_per_user: The number of movies each user owns.
+    :param titles: The number of titles in the catalog.
+    :param rng: A seeded random.Random.
+    :return: A generator of dictionaries matching the movies table.
+    """
+    movie_id = 0
+    for user_id in range(1, users + 1):
+        if movies_per_user <= titles:
+            title_ids = rng.sample(range(1, titles + 1), movies_per_user)
+        else:
+            title_ids = rng.choices(range(1, titles + 1), k=movies_per_user)
+        for title_id in title_ids:
+            movie_id += 1
+            yield {'id': movie_id, 'user_id': user_id, 'title_id': title_id}
+
+
+def insert_batches(session, table, rows):
+    """
+    Insert rows with executemany in fixed-size batches.
+
+    :param session: The SQLAlchemy session.
+    :param table: The target table.
+    :param rows: An iterable of row dictionaries.
+    :return: The number of rows inserted.
+    """
+    count = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            session.execute(insert(table), batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        session.execute(insert(table), batch)
+        count += len(batch)
+    return count
+
+
+def seed_database(path, users=1000, movies_per_user=20, seed=42, titles=None):
+    """
+    Create a fresh database file and fill it with synthetic data.
+
+    The schema is created the same way the application does (by the
+    migrations), so FTS indexes, statistics and data versions are all in place.
+
+    :param path: Path of the SQLite file; an existing file is replaced.
+    :param users: The number of users.
+    :param movies_per_user: The number of movies per user.
+    :param seed: Seed of the random generator.
+    :param titles: The number of titles in the catalog; a fifth of the number of movies by default.
+    :return: A dictionary with the number of users, movies and titles inserted.
+    """
+    from app import create_app, db
+    from app.data_manager.sqlite_data_manager import User, Movie, Title
+
+    titles = titles or max(1, users * movies_per_user // 5)
+
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    app = create_app(scratch_config(path))
+    rng = random.Random(seed)
+    with app.app_context():
+        user_count = insert_batches(db.session, User.__table__, generate_users(users, rng))
+        title_count = insert_batches(db.session, Title.__table__, generate_titles(titles, rng))
+        movie_count = insert_batches(db.session, Movie.__table__,
+                                     generate_movies(users, movies_per_user, title_count, rng))
+        db.session.commit()
+        app.data_manager.rebuild_statistics()
+        db.engine.dispose()
+    return {'users': user_count, 'movies': movie_count, 'titles': title_count}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path', help='SQLite file to create')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--movies-per-user', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--titles', type=int, help='catalog size (default: a fifth of the movies)')
+    args = parser.parse_args(argv)
+
+    counts = seed_database(args.path, users=args.users, movies_per_user=args.movies_per_user, seed=args.seed,
+                           titles=args.titles)
+    print(f"Seeded {counts['users']} users and {counts['movies']} movies of {counts['titles']} titles "
+          f"into {args.path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""
+Run the application on a scratch database for benchmarking.
+
+    python -m benchmarks.server /tmp/bench.db --port 5001 --omdb-url http://127.0.0.1:8765/ --mode wsgi
+"""
+import argparse
+import json
+import logging
+from benchmarks.seed import scratch_config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('path', help='SQLite file seeded with benchmarks.seed')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--omdb-url', help='base URL of the OMDb stub')
+    parser.add_argument('--mode', choices=('wsgi', 'asgi'), default='wsgi',
+                        help="Werkzeug's threaded server or uvicorn with the ASGI app")
+    parser.add_argument('--config', default='{}', help='JSON object of extra config overrides')
+    args = parser.parse_args(argv)
+
+    # Request logging would dominate the timings
+    logging.basicConfig(level=logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    from app import create_app
+    overrides = scratch_config(args.path, args.omdb_url)
+    overrides.update(json.loads(args.config))
+    app = create_app(overrides)
+
+    if args.mode == 'asgi':
+        import uvicorn
+        from app.asgi import create_asgi_app
+        uvicorn.run(create_asgi_app(app), host=args.host, port=args.port, log_level='warning')
+    else:
+        from werkzeug.serving import run_simple
+        run_simple(args.host, args.port, app, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Report import times and create_app() cold-start time, eager versus fast startup.
+
+Each measurement runs in a fresh interpreter. The import report parses the
+output of ``python -X importtime`` for a full ``create_app()`` and lists the
+packages taking longest to import; the cold-start timing compares the default
+(eager) startup with FAST_STARTUP on a seeded scratch database. Run from the
+repository root:
+
+    python -m benchmarks.startup --runs 10 --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from benchmarks.seed import scratch_config, seed_database
+
+COLD_START = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "from app import create_app\n"
+    "imported = time.perf_counter()\n"
+    "app = create_app(json.loads(sys.argv[1]))\n"
+    "created = time.perf_counter()\n"
+    "print(json.dumps({'import_ms': (imported - started) * 1000, 'create_app_ms': (created - imported) * 1000,\n"
+    "                  'modules': len(sys.modules), 'requests_loaded': 'requests' in sys.modules}))\n"
+)
+
+
+def parse_importtime(output):
+    """
+    Parse the report written to stderr by ``python -X importtime``.
+
+    :param output: The stderr text.
+    :return: A list of (module, self_us, cumulative_us, depth) tuples in import order.
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+
+def import_report(config, top=15):
+    """
+    Measure the import time of everything create_app() loads, per top-level package.
+
+    :param config: Configuration overrides for create_app().
+    :param top: The number of packages to list.
+    :return: A dictionary with the total and the packages whose own modules took longest to import.
+    """
+    code = f"from app import create_app; create_app({config!r})"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                            check=True)
+    modules = parse_importtime(result.stderr)
+    packages = {}
+    for name, self_us, _, _ in modules:
+        package = name.split('.')[0]
+        packages[package] = packages.get(package, 0) + self_us
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        'total_ms': round(sum(self_us for _, self_us, _, _ in modules) / 1000, 1),
+        'modules': len(modules),
+        'slowest': [{'package': name, 'self_ms': round(us / 1000, 1)} for name, us in slowest]
+    }
+
+
+def cold_start(config, runs):
+    """
+    Time imports and create_app() in fresh interpreters.
+
+    :param config: Configuration overrides for create_app().
+    :param runs: The number of interpreters to start.
+    :return: A dictionary with the median import and create_app times.
+    """
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-c', COLD_START, json.dumps(config)], capture_output=True,
+                                text=True, check=True)
+        samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {
+        'import_ms': round(statistics.median(sample['import_ms'] for sample in samples), 1),
+        'create_app_ms': round(statistics.median(sample['create_app_ms'] for sample in samples), 1),
+        'modules': samples[-1]['modules'],
+        'requests_loaded': samples[-1]['requests_loaded']
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--movies-per-user', type=int, default=20)
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'startup.db')
+        seed_database(path, users=args.users, movies_per_user=args.movies_per_user)
+        base = scratch_config(path)
+        modes = {'eager': dict(base, FAST_STARTUP=False), 'fast': dict(base, FAST_STARTUP=True)}
+        results = {mode: {'imports': import_report(config, args.top), 'cold_start': cold_start(config, args.runs)}
+                   for mode, config in modes.items()}
+
+    for mode, result in results.items():
+        cold, imports = result['cold_start'], result['imports']
+        print(f"{mode}: imports {cold['import_ms']} ms, create_app {cold['create_app_ms']} ms, "
+              f"{cold['modules']} modules, requests loaded: {cold['requests_loaded']}")
+        print(f"  -X importtime total {imports['total_ms']} ms over {imports['modules']} modules; slowest:")
+        for item in imports['slowest']:
+            print(f"    {item['package']:<24}{item['self_ms']:>10} ms")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'arguments': vars(args), 'results': results}, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,34 +1,63 @@
 document.addEventListener('DOMContentLoaded', function() {
     console.log("Dashboard script loaded");
 
-    fetch('/api/recent_movies')
-        .then(response => {
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
+    function renderRecentMovies(movies) {
+        const recentMoviesList = document.getElementById('recent-movies-list');
+        recentMoviesList.innerHTML = '';
+        movies.forEach(movie => {
+            const listItem = document.createElement('li');
+            listItem.textContent = `${movie.name} (Directed by ${movie.director}, ${movie.year})`;
+            recentMoviesList.appendChild(listItem);
+        });
+    }
+
+    function renderStatistics(data) {
+        document.getElementById('total-users').textContent = `Total Users: ${data.total_users}`;
+        document.getElementById('total-movies').textContent = `Total Movies: ${data.total_movies}`;
+        document.getElementById('recent-activity').textContent = `Recent Activity: ${data.recent_activity} new movies added this year`;
+    }
+
+    function renderDashboard(data) {
+        renderRecentMovies(data.recent_movies);
+        renderStatistics(data.statistics);
+    }
+
+    function showError() {
+        document.getElementById('recent-movies-list').innerHTML = '<li>Error loading recent movies</li>';
+        document.getElementById('total-users').textContent = 'Error loading total users';
+        document.getElementById('total-movies').textContent = 'Error loading total movies';
+        document.getElementById('recent-activity').textContent = 'Error loading recent activity';
+    }
+
+    // Open dashboards are kept up to date by the server instead of polling.
+    // The stream starts with a snapshot, so a reconnect never misses a change.
+    function subscribe() {
+        if (!window.EventSource) {
+            return;
+        }
+        const events = new EventSource('/api/dashboard/events');
+        events.addEventListener('snapshot', event => {
+            renderDashboard(JSON.parse(event.data));
+        });
+        events.addEventListener('delta', event => {
+            const delta = JSON.parse(event.data);
+            console.log("Dashboard delta received:", delta);
+            if (delta.recent_movies) {
+                renderRecentMovies(delta.recent_movies);
             }
-            return response.json();
-        })
-        .then(data => {
-            console.log("Recent movies data fetched:", data);
-            if (data.error) {
-                console.error(data.error);
-                document.getElementById('recent-movies-list').innerHTML = '<li>Error loading recent movies</li>';
-            } else {
-                const recentMoviesList = document.getElementById('recent-movies-list');
-                recentMoviesList.innerHTML = '';
-                data.forEach(movie => {
-                    const listItem = document.createElement('li');
-                    listItem.textContent = `${movie.name} (Directed by ${movie.director}, ${movie.year})`;
-                    recentMoviesList.appendChild(listItem);
-                });
+            if (delta.statistics) {
+                renderStatistics(delta.statistics);
             }
-        })
-        .catch(error => {
-            console.error('Error fetching recent movies:', error);
-            document.getElementById('recent-movies-list').innerHTML = '<li>Error loading recent movies</li>';
         });
+        events.onerror = () => {
+            // EventSource retries by itself; a closed source means the server has no stream
+            if (events.readyState === EventSource.CLOSED) {
+                console.log("Dashboard updates are not available");
+            }
+        };
+    }
 
-    fetch('/api/user_statistics')
+    fetch('/api/dashboard')
         .then(response => {
             if (!response.ok) {
                 throw new Error(`HTTP error! status: ${response.status}`);
@@ -36,22 +65,17 @@ document.addEventListener('DOMContentLoaded', function() {
             return response.json();
         })
         .then(data => {
-            console.log("User statistics data fetched:", data);
+            console.log("Dashboard data fetched:", data);
             if (data.error) {
                 console.error(data.error);
-                document.getElementById('total-users').textContent = 'Error loading total users';
-                document.getElementById('total-movies').textContent = 'Error loading total movies';
-                document.getElementById('recent-activity').textContent = 'Error loading recent activity';
+                showError();
             } else {
-                document.getElementById('total-users').textContent = `Total Users: ${data.total_users}`;
-                document.getElementById('total-movies').textContent = `Total Movies: ${data.total_movies}`;
-                document.getElementById('recent-activity').textContent = `Recent Activity: ${data.recent_activity} new movies added this year`;
+                renderDashboard(data);
             }
+            subscribe();
         })
         .catch(error => {
-            console.error('Error fetching user statistics:', error);
-            document.getElementById('total-users').textContent = 'Error loading total users';
-            document.getElementById('total-movies').textContent = 'Error loading total movies';
-            document.getElementById('recent-activity').textContent = 'Error loading recent activity';
+            console.error('Error fetching dashboard:', error);
+            showError();
         });
 });
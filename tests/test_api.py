@@ -0,0 +1,67 @@
+import pytest
+
+
+@pytest.fixture
+def users(app):
+    with app.app_context():
+        manager = app.data_manager
+        ada, grace = manager.add_user('Ada'), manager.add_user('Grace')
+        heat = manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+        alien = manager.add_movie(grace, 'Alien', 'Ridley Scott', 1979, 8.5)
+    return {'ada': ada, 'grace': grace, 'heat': heat, 'alien': alien}
+
+
+def ratings(client, user_id):
+    return {movie['name']: movie['rating'] for movie in client.get(f'/api/users/{user_id}/movies').get_json()['items']}
+
+
+def test_fields_select_the_returned_attributes(client, users):
+    movies = client.get(f"/api/users/{users['ada']}/movies?fields=name,year").get_json()
+    assert movies['items'] == [{'name': 'Heat', 'year': 1995}]
+
+    user = client.get('/api/users?fields=name,movie_count').get_json()['items'][0]
+    assert user == {'name': 'Ada', 'movie_count': 1}
+
+    movie = client.get(f"/api/users/{users['ada']}/movies/{users['heat']}?fields=rating").get_json()
+    assert movie == {'rating': 8.3}
+
+
+def test_unknown_fields_are_rejected(client, users):
+    response = client.get(f"/api/users/{users['ada']}/movies?fields=name,budget")
+
+    assert response.status_code == 400
+    assert 'budget' in response.get_json()['error']
+
+
+def test_movies_of_another_user_are_not_found(client, users):
+    url = f"/api/users/{users['ada']}/movies/{users['alien']}"
+
+    assert client.get(url).status_code == 404
+    assert client.patch(url, json={'rating': 1.0}).status_code == 404
+    assert client.delete(url).status_code == 404
+    assert ratings(client, users['grace']) == {'Alien': 8.5}
+
+
+def test_a_failing_batch_changes_nothing(client, users):
+    response = client.post(f"/api/users/{users['ada']}/movies/batch", json={
+        'create': [{'name': 'Ran', 'director': 'Akira Kurosawa', 'year': 1985, 'rating': 8.2}],
+        'update': [{'id': users['heat'], 'rating': 1.0}],
+        'delete': [users['alien']]
+    })
+
+    assert response.status_code == 404
+    assert response.get_json()['operation'] == 'delete'
+    assert ratings(client, users['ada']) == {'Heat': 8.3}
+    assert ratings(client, users['grace']) == {'Alien': 8.5}
+
+
+def test_a_batch_applies_every_change(client, users):
+    response = client.post(f"/api/users/{users['ada']}/movies/batch", json={
+        'create': [{'name': 'Ran', 'director': 'Akira Kurosawa', 'year': 1985, 'rating': 8.2}],
+        'update': [{'id': users['heat'], 'rating': 9.0}]
+    })
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert len(body['created']) == 1 and body['updated'] == 1 and body['deleted'] == 0
+    assert ratings(client, users['ada']) == {'Heat': 9.0, 'Ran': 8.2}
@@ -0,0 +1,54 @@
+import asyncio
+import json
+import pytest
+from app.asgi import create_asgi_app
+
+
+def asgi_get(asgi, path, headers=()):
+    """
+    Send one GET request through the ASGI application.
+
+    :return: The status, the headers and the body.
+    """
+    async def main():
+        sent = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'',
+                 'headers': [(name.encode(), value.encode()) for name, value in headers]}
+        await asgi(scope, receive, send)
+        await asgi.data_manager.dispose()
+        return sent
+
+    start, body = asyncio.run(main())
+    return start['status'], {name.decode(): value.decode() for name, value in start['headers']}, body['body']
+
+
+@pytest.fixture
+def asgi(app):
+    with app.app_context():
+        manager = app.data_manager
+        ada, grace = manager.add_user('Ada'), manager.add_user('Grace')
+        manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+        manager.add_movies(grace, [{'name': 'Alien', 'director': 'Ridley Scott', 'year': 1979, 'rating': 8.5},
+                                   {'name': 'Ran', 'director': 'Akira Kurosawa', 'year': 1985, 'rating': 8.2}])
+    return create_asgi_app(app)
+
+
+@pytest.mark.parametrize('path', ['/api/recent_movies', '/api/user_statistics', '/api/dashboard'])
+def test_async_endpoints_answer_like_the_flask_views(client, asgi, path):
+    expected = client.get(path)
+
+    status, headers, body = asgi_get(asgi, path)
+
+    assert status == expected.status_code == 200
+    assert json.loads(body) == expected.get_json()
+    assert headers['etag'] == expected.headers['ETag']
+
+    status, _, body = asgi_get(asgi, path, [('if-none-match', headers['etag'])])
+    assert (status, body) == (304, b'')
@@ -0,0 +1,110 @@
+import pytest
+from app.cache import InMemoryCacheBackend
+from app.data_manager.caching_data_manager import CachingDataManager
+from app.data_manager.data_manager_interface import BatchOperationError
+
+
+@pytest.fixture
+def backend():
+    return InMemoryCacheBackend()
+
+
+@pytest.fixture
+def app(make_app, backend):
+    return make_app(DATA_CACHE_ENABLED=True, DATA_CACHE_BACKEND=backend)
+
+
+def other_process(app, backend):
+    """
+    A second caching manager over the same database and shared backend, as in another worker.
+    """
+    return CachingDataManager(app.data_manager.data_manager, backend=backend)
+
+
+def test_reads_are_cached(app):
+    with app.app_context():
+        manager = app.data_manager
+        ada = manager.add_user('Ada')
+        manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+
+        first = manager.get_user_movies(ada)
+        assert manager.get_user_movies(ada) is first
+        assert [movie.name for movie in first] == ['Heat']
+        stats = manager.cache_stats()
+        assert (stats['local_hits'], stats['misses']) == (1, 1)
+
+
+def test_missing_rows_are_not_cached(app):
+    with app.app_context():
+        manager = app.data_manager
+        assert manager.get_movie_by_id(1) is None
+        assert manager.get_movie_by_id(1) is None
+        assert manager.cache_stats()['misses'] == 2
+
+
+def test_other_processes_read_through_the_shared_backend(app, backend):
+    with app.app_context():
+        ada = app.data_manager.add_user('Ada')
+        movie_id = app.data_manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+        app.data_manager.get_movie_by_id(movie_id)
+
+        other = other_process(app, backend)
+        assert other.get_movie_by_id(movie_id).name == 'Heat'
+        assert other.cache_stats()['shared_hits'] == 1
+
+
+def test_writes_invalidate_the_entries_they_affect(app, backend):
+    with app.app_context():
+        manager = app.data_manager
+        ada, grace = manager.add_user('Ada'), manager.add_user('Grace')
+        movie_id = manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+        manager.add_movie(grace, 'Alien', 'Ridley Scott', 1979, 8.5)
+        manager.get_movie_by_id(movie_id), manager.get_user_movies(ada), manager.get_user_movies(grace)
+
+        manager.update_movie(ada, movie_id, rating=9.0)
+
+        assert manager.get_movie_by_id(movie_id).rating == 9.0
+        assert [movie.rating for movie in manager.get_user_movies(ada)] == [9.0]
+        assert other_process(app, backend).get_movie_by_id(movie_id).rating == 9.0
+        # Grace's list was left alone
+        hits = manager.cache_stats()['local_hits']
+        manager.get_user_movies(grace)
+        assert manager.cache_stats()['local_hits'] == hits + 1
+
+        manager.delete_movie(ada, movie_id)
+        assert manager.get_movie_by_id(movie_id) is None
+        assert manager.get_user_movies(ada) == ()
+
+
+def test_enrichment_invalidates_every_user_sharing_the_title(app):
+    with app.app_context():
+        manager = app.data_manager
+        ada, grace = manager.add_user('Ada'), manager.add_user('Grace')
+        manager.add_pending_movie(ada, 'Brazil')
+        manager.add_pending_movie(grace, 'Brazil')
+        assert [movie.enrichment_status for movie in manager.get_user_movies(grace)] == ['pending']
+        job, = manager.claim_enrichment_jobs()
+
+        manager.complete_enrichment(job['id'], 'Terry Gilliam', 1985, 7.9)
+
+        for user_id in (ada, grace):
+            movie, = manager.get_user_movies(user_id)
+            assert (movie.director, movie.year, movie.enrichment_status) == ('Terry Gilliam', 1985, 'complete')
+
+
+def test_failed_batch_still_invalidates(app):
+    with app.app_context():
+        manager = app.data_manager
+        ada = manager.add_user('Ada')
+        movie_id = manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+        manager.get_movie_by_id(movie_id), manager.get_user_movies(ada)
+        invalidations = manager.cache_stats()['invalidations']
+
+        with pytest.raises(BatchOperationError):
+            manager.apply_movie_changes(ada, update=[{'id': movie_id, 'rating': 1.0}], delete=[999])
+
+        assert manager.cache_stats()['invalidations'] > invalidations
+        misses = manager.cache_stats()['misses']
+        assert manager.get_movie_by_id(movie_id).rating == 8.3
+        assert [movie.rating for movie in manager.get_user_movies(ada)] == [8.3]
+        assert manager.cache_stats()['misses'] == misses + 2
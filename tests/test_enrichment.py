@@ -0,0 +1,146 @@
+import sqlite3
+import time
+import pytest
+from app.omdb.client import MovieNotFoundError, OMDbUnavailableError
+
+
+def jobs(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT title, status, attempts FROM enrichment_jobs ORDER BY id').fetchall()
+    finally:
+        conn.close()
+
+
+class FakeOMDb:
+    """
+    Answers lookups from a dictionary of payloads; other titles are not found.
+    """
+
+    def __init__(self, payloads, available=True):
+        self.payloads = payloads
+        self.available = available
+
+    def lookup(self, title, rate_limiter=None):
+        if not self.available:
+            raise OMDbUnavailableError('OMDb is down')
+        if title not in self.payloads:
+            raise MovieNotFoundError('Movie not found!')
+        return self.payloads[title]
+
+
+@pytest.fixture
+def async_app(make_app):
+    app = make_app(OMDB_ENRICHMENT_MODE='async', ENRICHMENT_RETRY_BACKOFF=60.0)
+    app.omdb_client = FakeOMDb({'Brazil': {'Director': 'Terry Gilliam', 'Year': '1985', 'imdbRating': '7.9'}})
+    return app
+
+
+def test_one_job_per_title(app, tmp_path):
+    with app.app_context():
+        ada, grace = app.data_manager.add_user('Ada'), app.data_manager.add_user('Grace')
+        app.data_manager.add_pending_movie(ada, 'Brazil')
+        app.data_manager.add_pending_movie(grace, 'brazil')
+        app.data_manager.add_pending_movie(grace, 'Alien')
+
+    assert jobs(tmp_path / 'test.db') == [('Brazil', 'queued', 0), ('Alien', 'queued', 0)]
+
+
+def test_claimed_jobs_are_leased(app, tmp_path):
+    with app.app_context():
+        manager = app.data_manager
+        manager.add_pending_movie(manager.add_user('Ada'), 'Brazil')
+
+        claimed, = manager.claim_enrichment_jobs(lease=60)
+        assert (claimed['title'], claimed['attempts']) == ('Brazil', 1)
+        assert manager.claim_enrichment_jobs() == []
+
+        # The lease of a worker that died has run out
+        conn = sqlite3.connect(tmp_path / 'test.db')
+        with conn:
+            conn.execute('UPDATE enrichment_jobs SET locked_until = ?', (time.time() - 1,))
+        conn.close()
+        reclaimed, = manager.claim_enrichment_jobs()
+        assert (reclaimed['id'], reclaimed['attempts']) == (claimed['id'], 2)
+
+
+def test_complete_updates_every_movie_of_the_title(app, tmp_path):
+    with app.app_context():
+        manager = app.data_manager
+        ada, grace = manager.add_user('Ada'), manager.add_user('Grace')
+        first, second = manager.add_pending_movie(ada, 'Brazil'), manager.add_pending_movie(grace, 'Brazil')
+        assert manager.get_statistics(0)['movies_in_year'] == 2
+        job, = manager.claim_enrichment_jobs()
+
+        affected = manager.complete_enrichment(job['id'], 'Terry Gilliam', 1985, 7.9, imdb_id='tt0088846')
+
+        assert sorted(affected) == [(ada, first), (grace, second)]
+        assert jobs(tmp_path / 'test.db') == []
+        movie = manager.get_movie_by_id(second)
+        assert (movie.director, movie.year, movie.rating, movie.enrichment_status) == \
+               ('Terry Gilliam', 1985, 7.9, 'complete')
+        assert manager.get_statistics(0)['movies_in_year'] == 0
+        assert manager.get_statistics(1985)['movies_in_year'] == 2
+        assert manager.complete_enrichment(job['id'], 'Terry Gilliam', 1985, 7.9) == []
+
+
+def test_failed_attempt_is_retried_later(app, tmp_path):
+    with app.app_context():
+        manager = app.data_manager
+        movie_id = manager.add_pending_movie(manager.add_user('Ada'), 'Brazil')
+        job, = manager.claim_enrichment_jobs()
+
+        assert manager.fail_enrichment(job['id'], 'timeout', retry_at=time.time() + 3600) == []
+
+        assert jobs(tmp_path / 'test.db') == [('Brazil', 'queued', 1)]
+        assert manager.claim_enrichment_jobs() == []
+        assert manager.get_movie_by_id(movie_id).enrichment_status == 'pending'
+
+
+def test_given_up_job_marks_the_movies_failed(app, tmp_path):
+    with app.app_context():
+        manager = app.data_manager
+        ada = manager.add_user('Ada')
+        movie_id = manager.add_pending_movie(ada, 'Brazil')
+        job, = manager.claim_enrichment_jobs()
+
+        assert manager.fail_enrichment(job['id'], 'not found') == [(ada, movie_id)]
+
+        assert jobs(tmp_path / 'test.db') == [('Brazil', 'failed', 1)]
+        assert manager.get_movie_by_id(movie_id).enrichment_status == 'failed'
+
+
+def test_worker_stores_omdb_details(async_app):
+    with async_app.app_context():
+        movie_id = async_app.data_manager.add_pending_movie(async_app.data_manager.add_user('Ada'), 'Brazil')
+
+    assert async_app.enrichment_worker.run_once()
+    assert not async_app.enrichment_worker.run_once()
+
+    with async_app.app_context():
+        movie = async_app.data_manager.get_movie_by_id(movie_id)
+        assert (movie.director, movie.year, movie.rating, movie.enrichment_status) == \
+               ('Terry Gilliam', 1985, 7.9, 'complete')
+
+
+def test_worker_gives_up_on_unknown_titles(async_app, tmp_path):
+    with async_app.app_context():
+        movie_id = async_app.data_manager.add_pending_movie(async_app.data_manager.add_user('Ada'), 'Unknown Film')
+
+    assert async_app.enrichment_worker.run_once()
+
+    assert jobs(tmp_path / 'test.db') == [('Unknown Film', 'failed', 1)]
+    with async_app.app_context():
+        assert async_app.data_manager.get_movie_by_id(movie_id).enrichment_status == 'failed'
+
+
+def test_worker_retries_when_omdb_fails(async_app, tmp_path):
+    async_app.omdb_client.available = False
+    with async_app.app_context():
+        movie_id = async_app.data_manager.add_pending_movie(async_app.data_manager.add_user('Ada'), 'Brazil')
+
+    assert async_app.enrichment_worker.run_once()
+
+    assert jobs(tmp_path / 'test.db') == [('Brazil', 'queued', 1)]
+    with async_app.app_context():
+        assert async_app.data_manager.get_movie_by_id(movie_id).enrichment_status == 'pending'
@@ -0,0 +1,180 @@
+import asyncio
+import json
+from app.asgi import CLOSED, DashboardFeed, create_asgi_app
+from app.events import OVERFLOW, EventBroker
+
+
+def test_broker_delivers_to_every_subscriber():
+    async def main():
+        broker = EventBroker()
+        first, second = broker.subscribe(), broker.subscribe()
+        broker.publish({'scopes': ['users']})
+        second.close()
+        broker.publish({'scopes': ['movies']})
+        await asyncio.sleep(0)
+        return first.drain(), second.drain()
+
+    assert asyncio.run(main()) == ([{'scopes': ['users']}, {'scopes': ['movies']}], [{'scopes': ['users']}])
+
+
+def test_slow_subscriber_gets_an_overflow_marker():
+    async def main():
+        broker = EventBroker(maxsize=3)
+        subscription = broker.subscribe()
+        for number in range(10):
+            broker.publish({'number': number})
+        await asyncio.sleep(0)
+        missed = subscription.drain()
+        broker.publish({'number': 10})
+        await asyncio.sleep(0)
+        return missed, await subscription.get()
+
+    missed, following = asyncio.run(main())
+    assert OVERFLOW in missed and len(missed) <= 3
+    assert following == {'number': 10}
+
+
+def test_committed_writes_are_published(app):
+    async def main():
+        subscription = app.event_broker.subscribe()
+        with app.app_context():
+            manager = app.data_manager
+            user_id = manager.add_user('Ada')
+            manager.add_movie(user_id, 'Brazil', 'Terry Gilliam', 1985, 7.9)
+            try:
+                manager.update_movie(user_id, 999999, name='Missing')
+            except Exception:
+                pass
+        await asyncio.sleep(0)
+        subscription.close()
+        return subscription.drain()
+
+    users, movies = asyncio.run(main())
+    assert users == {'scopes': ['users'], 'statistics': {'total_users': 1}}
+    assert movies['scopes'] == ['movies', 'user:1']
+    assert movies['statistics']['total_movies'] == 1
+
+
+def test_feed_queue_overflows_and_closes():
+    queue = asyncio.Queue(2)
+    for _ in range(3):
+        DashboardFeed.offer(queue, b'message')
+    assert queue.qsize() == 1 and queue.get_nowait() is OVERFLOW
+
+    for _ in range(2):
+        DashboardFeed.offer(queue, b'message')
+    DashboardFeed.offer(queue, CLOSED)
+    assert queue.qsize() == 1 and queue.get_nowait() is CLOSED
+
+
+def test_dashboard(client, app):
+    with app.app_context():
+        user_id = app.data_manager.add_user('Ada')
+        app.data_manager.add_movie(user_id, 'Brazil', 'Terry Gilliam', 1985, 7.9)
+
+    data = client.get('/api/dashboard').get_json()
+
+    assert data['statistics']['total_users'] == 1
+    assert data['statistics']['total_movies'] == 1
+    assert [movie['name'] for movie in data['recent_movies']] == ['Brazil']
+
+
+def stream_dashboard(app, asgi, during):
+    """
+    Open the dashboard stream, run a coroutine, then disconnect.
+
+    :return: The ASGI messages sent, and the clients still connected afterwards.
+    """
+    async def main():
+        sent, disconnect = [], asyncio.Event()
+
+        async def receive():
+            await disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        stream = asyncio.create_task(asgi.stream(receive, send))
+        await asyncio.sleep(0.2)
+        assert asgi.feed.client_count == 1
+        await during()
+        await asyncio.sleep(0.2)
+        disconnect.set()
+        await stream
+        clients = asgi.feed.client_count
+        await asgi.feed.stop()
+        await asgi.data_manager.dispose()
+        return sent, clients
+
+    return asyncio.run(main())
+
+
+def received_events(sent):
+    """
+    Decode the Server-Sent Events of a stream into (event, data) tuples.
+    """
+    events = []
+    for message in sent[1:]:
+        for block in message['body'].split(b'\n\n'):
+            lines = dict(line.split(b': ', 1) for line in block.split(b'\n') if line.startswith((b'event', b'data')))
+            if b'event' in lines:
+                events.append((lines[b'event'].decode(), json.loads(lines[b'data'])))
+    return events
+
+
+def shown_statistics(events):
+    """
+    The statistics a dashboard shows after applying the events as static/js/dashboard.js does.
+    """
+    statistics = None
+    for event, data in events:
+        statistics = data['statistics'] if 'statistics' in data else statistics
+    return statistics
+
+
+def test_dashboard_stream(make_app):
+    app = make_app(DASHBOARD_STREAM_KEEPALIVE=0.05)
+    asgi = create_asgi_app(app)
+
+    async def add_user():
+        with app.app_context():
+            await asyncio.to_thread(app.data_manager.add_user, 'Ada')
+
+    sent, clients = stream_dashboard(app, asgi, add_user)
+
+    assert clients == 0
+    assert sent[0]['status'] == 200
+    assert (b'content-type', b'text/event-stream') in sent[0]['headers']
+    bodies = [message['body'] for message in sent[1:]]
+    assert bodies[0].startswith(b'retry: 5000\nevent: snapshot\n')
+    assert b': keepalive\n\n' in bodies
+    events = received_events(sent)
+    assert [event for event, _ in events] == ['snapshot', 'delta']
+    assert events[1][1] == {'statistics': {'total_users': 1, 'total_movies': 0, 'recent_activity': 0}}
+
+
+def test_write_before_the_snapshot_is_counted_once(make_app):
+    app = make_app()
+    asgi = create_asgi_app(app)
+    snapshot = asgi.feed.snapshot
+
+    async def write_then_snapshot():
+        # The write commits after the client is connected but before its snapshot is read
+        with app.app_context():
+            user_id = await asyncio.to_thread(app.data_manager.add_user, 'Ada')
+            await asyncio.to_thread(app.data_manager.add_movie, user_id, 'Heat', 'Michael Mann', 1995, 8.3)
+        asgi.feed.snapshot = snapshot
+        return await snapshot()
+
+    async def nothing():
+        pass
+
+    asgi.feed.snapshot = write_then_snapshot
+    sent, _ = stream_dashboard(app, asgi, nothing)
+
+    events = received_events(sent)
+    assert [event for event, _ in events][:1] == ['snapshot']
+    assert shown_statistics(events) == {'total_users': 1, 'total_movies': 1, 'recent_activity': 0}
+    assert [movie['name'] for _, data in events if 'recent_movies' in data for movie in data['recent_movies']][-1:] \
+        == ['Heat']
@@ -0,0 +1,48 @@
+import csv
+import gzip
+import io
+import json
+import pytest
+
+
+@pytest.fixture
+def seeded(make_app):
+    app = make_app(ADMIN_TOKEN='secret')
+    with app.app_context():
+        user_id = app.data_manager.add_user('Ada')
+        app.data_manager.add_movies(user_id, [{'name': 'Heat', 'director': 'Michael Mann', 'year': 1995, 'rating': 8.3},
+                                              {'name': 'Alien', 'director': 'Ridley Scott', 'year': 1979, 'rating': 8.5}])
+    return app, user_id
+
+
+def test_user_movies_export(seeded):
+    app, user_id = seeded
+
+    response = app.test_client().get(f'/api/users/{user_id}/movies.csv')
+
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == f'attachment; filename="user-{user_id}-movies.csv"'
+    rows = list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+    assert [row[rows[0].index('name')] for row in rows[1:]] == ['Heat', 'Alien']
+
+
+def test_gzip_export_is_a_gz_file(seeded):
+    app, user_id = seeded
+
+    response = app.test_client().get(f'/api/users/{user_id}/movies.ndjson?gzip=1')
+
+    assert response.mimetype == 'application/gzip'
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Content-Disposition'] == f'attachment; filename="user-{user_id}-movies.ndjson.gz"'
+    lines = gzip.decompress(response.data).decode().splitlines()
+    assert [json.loads(line)['name'] for line in lines] == ['Heat', 'Alien']
+
+
+def test_admin_export_requires_the_token(seeded):
+    app, _ = seeded
+    client = app.test_client()
+
+    assert client.get('/api/admin/export.ndjson').status_code == 403
+    response = client.get('/api/admin/export.ndjson', headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 200
+    assert len(response.data.splitlines()) == 3
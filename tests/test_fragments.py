@@ -0,0 +1,39 @@
+def fragment_stats(app):
+    stats = app.fragment_cache.stats()
+    return stats['hits'], stats['misses']
+
+
+def test_fragments_are_rendered_again_when_their_data_changes(app, client):
+    with app.app_context():
+        manager = app.data_manager
+        ada, grace = manager.add_user('Ada'), manager.add_user('Grace')
+        manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+
+    client.get(f'/users/{ada}')
+    assert 'Heat' in client.get(f'/users/{ada}').get_data(as_text=True)
+    assert fragment_stats(app) == (1, 1)
+
+    # Another user's movies leave Ada's grid alone
+    with app.app_context():
+        manager.add_movie(grace, 'Alien', 'Ridley Scott', 1979, 8.5)
+    client.get(f'/users/{ada}')
+    assert fragment_stats(app) == (2, 1)
+
+    with app.app_context():
+        manager.add_movie(ada, 'Ran', 'Akira Kurosawa', 1985, 8.2)
+    assert 'Ran' in client.get(f'/users/{ada}').get_data(as_text=True)
+    assert fragment_stats(app) == (2, 2)
+
+
+def test_user_list_follows_movie_counts(app, client):
+    with app.app_context():
+        ada = app.data_manager.add_user('Ada')
+
+    client.get('/users')
+    client.get('/users')
+    assert fragment_stats(app) == (1, 1)
+
+    with app.app_context():
+        app.data_manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+    client.get('/users')
+    assert fragment_stats(app) == (1, 2)
@@ -0,0 +1,76 @@
+import sqlite3
+import pytest
+from app.data_manager.sqlite_data_manager import User
+
+
+def add_user(manager, name):
+    manager.add_user(name)
+    return User.query.filter_by(name=name).one().id
+
+
+@pytest.fixture
+def seeded(app):
+    with app.app_context():
+        ada = add_user(app.data_manager, 'Ada')
+        grace = add_user(app.data_manager, 'Grace')
+        app.data_manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+    return app, ada, grace
+
+
+def test_matching_etag_is_answered_with_304(seeded):
+    app, ada, _ = seeded
+    client = app.test_client()
+
+    response = client.get(f'/users/{ada}')
+    assert response.status_code == 200 and response.headers['ETag']
+
+    cached = client.get(f'/users/{ada}', headers={'If-None-Match': response.headers['ETag']})
+    assert cached.status_code == 304
+    assert cached.data == b''
+    assert cached.headers['ETag'] == response.headers['ETag']
+
+
+def test_if_modified_since_is_answered_with_304(seeded, tmp_path):
+    app, ada, _ = seeded
+    client = app.test_client()
+    # Last-Modified is only sent once the newest write is in an earlier second
+    conn = sqlite3.connect(tmp_path / 'test.db')
+    with conn:
+        conn.execute('UPDATE data_versions SET updated_at = updated_at - 10')
+    conn.close()
+
+    response = client.get(f'/users/{ada}')
+
+    cached = client.get(f'/users/{ada}', headers={'If-Modified-Since': response.headers['Last-Modified']})
+    assert cached.status_code == 304
+
+
+def test_write_changes_the_etag_of_its_scope_only(seeded):
+    app, ada, grace = seeded
+    client = app.test_client()
+    ada_etag = client.get(f'/users/{ada}').headers['ETag']
+    grace_etag = client.get(f'/users/{grace}').headers['ETag']
+
+    with app.app_context():
+        app.data_manager.add_movie(ada, 'Alien', 'Ridley Scott', 1979, 8.5)
+
+    response = client.get(f'/users/{ada}', headers={'If-None-Match': ada_etag})
+    assert response.status_code == 200 and b'Alien' in response.data
+    assert client.get(f'/users/{grace}', headers={'If-None-Match': grace_etag}).status_code == 304
+
+
+def test_query_string_is_part_of_the_etag(seeded):
+    app, ada, _ = seeded
+    client = app.test_client()
+    etag = client.get(f'/users/{ada}').headers['ETag']
+
+    assert client.get(f'/users/{ada}?per_page=50', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_errors_are_not_given_validators(seeded):
+    app, *_ = seeded
+
+    response = app.test_client().get('/users/999999')
+
+    assert response.status_code >= 400
+    assert 'ETag' not in response.headers
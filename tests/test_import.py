@@ -0,0 +1,25 @@
+import json
+
+
+def test_import_commits_batches_and_reports_malformed_lines(app, client):
+    with app.app_context():
+        ada = app.data_manager.add_user('Ada')
+    body = '\n'.join([
+        json.dumps({'name': 'Heat', 'director': 'Michael Mann', 'year': 1995, 'rating': 8.3}),
+        '{"name": "Alien", "director": ',
+        json.dumps({'name': 'Ran', 'director': 'Akira Kurosawa', 'year': 1985, 'rating': 8.2}),
+        json.dumps({'name': 'Brazil', 'director': 'Terry Gilliam', 'year': 'soon', 'rating': 7.9}),
+        json.dumps({'name': 'Solaris', 'director': 'Andrei Tarkovsky', 'year': 1972, 'rating': 8.0}),
+    ]) + '\n'
+
+    response = client.post(f'/api/users/{ada}/movies/import?format=jsonl&batch_size=2', data=body)
+
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(event['type'], event.get('line')) for event in events] == [
+        ('error', 2), ('progress', None), ('error', 4), ('progress', None), ('progress', None), ('done', None)
+    ]
+    assert events[0]['error'].startswith('Invalid JSON')
+    assert [event['imported'] for event in events if event['type'] == 'progress'] == [1, 2, 3]
+    assert events[-1] == {'type': 'done', 'imported': 3, 'failed': 2}
+    with app.app_context():
+        assert sorted(movie.name for movie in app.data_manager.get_user_movies(ada)) == ['Heat', 'Ran', 'Solaris']
@@ -0,0 +1,52 @@
+import re
+import pytest
+from app.instrumentation import QueryBudgetExceeded
+
+
+def test_responses_carry_server_timing(app, client):
+    with app.app_context():
+        ada = app.data_manager.add_user('Ada')
+        app.data_manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+
+    header = client.get(f'/users/{ada}').headers['Server-Timing']
+
+    names = [metric.split(';')[0] for metric in header.split(', ')]
+    assert names == ['sql', 'render', 'total']
+    queries = int(re.search(r'sql;dur=[\d.]+;desc="(\d+) queries"', header).group(1))
+    assert queries >= 1
+
+
+def test_metrics_count_requests_sql_and_templates(app, client):
+    with app.app_context():
+        ada = app.data_manager.add_user('Ada')
+    client.get(f'/users/{ada}')
+    client.get(f'/users/{ada}')
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200 and response.mimetype == 'text/plain'
+    body = response.get_data(as_text=True)
+    assert 'movieweb_http_requests_total{method="GET",endpoint="user_movies",status="200"} 2' in body
+    assert re.search(r'^movieweb_sql_query_duration_seconds_count [1-9]', body, re.MULTILINE)
+    assert 'movieweb_template_render_duration_seconds_count{template="user_movies.html"} 2' in body
+
+
+def test_query_budget_raises_when_asked(make_app):
+    app = make_app(QUERY_BUDGET=1, QUERY_BUDGET_RAISE=True)
+    with app.app_context():
+        ada = app.data_manager.add_user('Ada')
+
+    with pytest.raises(QueryBudgetExceeded, match=r'over the budget of 1'):
+        app.test_client().get(f'/users/{ada}')
+
+
+def test_query_budget_is_reported_otherwise(make_app):
+    app = make_app(QUERY_BUDGET=1)
+    with app.app_context():
+        ada = app.data_manager.add_user('Ada')
+    client = app.test_client()
+
+    assert client.get(f'/users/{ada}').status_code == 200
+
+    body = client.get('/metrics').get_data(as_text=True)
+    assert 'movieweb_query_budget_exceeded_total{endpoint="user_movies"} 1' in body
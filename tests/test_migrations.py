@@ -0,0 +1,187 @@
+import shutil
+import sqlite3
+from conftest import ROOT
+from sqlalchemy import create_engine
+from app import db
+from app import migrations
+
+
+def build_database(path, version, rows=()):
+    """
+    Create a database at an older schema version, the way that version's code left it.
+
+    :param path: Path of the SQLite file.
+    :param version: The schema version to stop at.
+    :param rows: SQL statements run once the schema is in place, e.g. inserts.
+    """
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as conn:
+        migrations.create_baseline(conn)
+        for number, _, func in migrations.MIGRATIONS:
+            if number <= version:
+                func(conn)
+        conn.exec_driver_sql(f'PRAGMA user_version = {version}')
+        for statement in rows:
+            conn.exec_driver_sql(statement)
+    engine.dispose()
+
+
+def schema(path):
+    """
+    Read the tables and indexes of a database file.
+
+    :param path: Path of the SQLite file.
+    :return: A tuple of (user_version, {table: [columns]}, set of index names).
+    """
+    conn = sqlite3.connect(path)
+    try:
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        tables = {name: [row[1] for row in conn.execute(f'PRAGMA table_info({name})')]
+                  for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        indexes = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    finally:
+        conn.close()
+    return version, tables, indexes
+
+
+V0_ROWS = (
+    "INSERT INTO users (id, name) VALUES (1, 'Ada'), (2, 'Grace')",
+    "INSERT INTO movies (id, user_id, name, director, year, rating) VALUES "
+    "(1, 1, 'Heat', 'Michael Mann', 1995, 8.3), (2, 2, 'Heat', 'Michael Mann', 1995, 8.3), "
+    "(3, 2, 'Alien', 'Ridley Scott', 1979, 8.5)",
+)
+
+
+def test_new_database_matches_the_models(make_app, tmp_path):
+    path = tmp_path / 'new.db'
+    app = make_app(path)
+
+    version, tables, indexes = schema(path)
+    assert version == migrations.head_version()
+    with app.app_context():
+        for table in db.metadata.sorted_tables:
+            assert sorted(tables[table.name]) == sorted(column.name for column in table.columns), table.name
+    assert 'ix_titles_year' in indexes
+
+
+def test_upgrade_from_v0(make_app, tmp_path):
+    path = tmp_path / 'v0.db'
+    build_database(path, 0, V0_ROWS)
+
+    app = make_app(path)
+
+    version, tables, indexes = schema(path)
+    assert version == migrations.head_version()
+    assert 'title_id' in tables['movies'] and 'movie_id' not in tables['enrichment_jobs']
+    assert {'ix_titles_year', 'ix_movies_user_id_id', 'ix_users_name'} <= indexes
+    with app.app_context():
+        movies = sorted(app.data_manager.get_user_movies(2), key=lambda movie: movie.id)
+        assert [(movie.id, movie.name, movie.year) for movie in movies] == [(2, 'Heat', 1995), (3, 'Alien', 1979)]
+        assert app.data_manager.get_statistics(1995) == {'total_users': 2, 'total_movies': 3, 'movies_in_year': 2}
+        results, _ = app.data_manager.search('hea')
+        assert sorted(result['id'] for result in results) == [1, 2]
+
+
+def test_upgrade_shipped_database(make_app, tmp_path):
+    path = tmp_path / 'database.db'
+    shutil.copy(f"{ROOT}/data/database.db", path)
+    before = sqlite3.connect(path).execute('SELECT COUNT(*) FROM movies').fetchone()[0]
+
+    app = make_app(path)
+
+    assert schema(path)[0] == migrations.head_version()
+    with app.app_context():
+        assert app.data_manager.get_statistics(2000)['total_movies'] == before
+
+
+def test_upgrade_keeps_enrichment_jobs(make_app, tmp_path):
+    path = tmp_path / 'v6.db'
+    build_database(path, 6, V0_ROWS + (
+        "INSERT INTO movies (id, user_id, name, director, year, rating, enrichment_status) "
+        "VALUES (4, 1, 'Brazil', 'Unknown', 0, 0, 'pending'), (5, 2, 'Brazil', 'Unknown', 0, 0, 'pending')",
+        "INSERT INTO enrichment_jobs (id, movie_id, title, status, attempts, next_attempt_at) "
+        "VALUES (1, 4, 'Brazil', 'queued', 0, 0), (2, 5, 'Brazil', 'queued', 0, 0)",
+    ))
+
+    make_app(path)
+
+    conn = sqlite3.connect(path)
+    jobs = conn.execute('SELECT j.id, t.name FROM enrichment_jobs j JOIN titles t ON t.id = j.title_id').fetchall()
+    assert jobs == [(1, 'Brazil')]
+    assert conn.execute('SELECT COUNT(DISTINCT title_id) FROM movies WHERE id IN (4, 5)').fetchone() == (1,)
+
+
+def test_upgrade_after_tables_were_created_ahead(make_app, tmp_path):
+    # An earlier upgrade() created the newest model tables before running the
+    # migrations, then failed in migration 7; its empty leftovers are replaced
+    path = tmp_path / 'v6.db'
+    build_database(path, 6, V0_ROWS)
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        'DROP TABLE enrichment_jobs;'
+        'CREATE TABLE enrichment_jobs (id INTEGER PRIMARY KEY, title_id INTEGER NOT NULL, title VARCHAR(100) NOT NULL, '
+        'status VARCHAR(20) NOT NULL, attempts INTEGER NOT NULL, next_attempt_at FLOAT NOT NULL, '
+        'locked_until FLOAT, last_error TEXT);'
+        'CREATE TABLE titles (id INTEGER PRIMARY KEY, title_key VARCHAR(100) NOT NULL, name VARCHAR(100) NOT NULL);'
+    )
+    conn.close()
+
+    app = make_app(path)
+
+    assert schema(path)[0] == migrations.head_version()
+    with app.app_context():
+        movies = app.data_manager.get_user_movies(2)
+        assert sorted(movie.name for movie in movies) == ['Alien', 'Heat']
+
+
+def test_upgrade_is_idempotent(make_app, tmp_path):
+    path = tmp_path / 'v0.db'
+    build_database(path, 0, V0_ROWS)
+    make_app(path)
+
+    engine = create_engine(f"sqlite:///{path}")
+    assert migrations.upgrade(engine) == []
+    engine.dispose()
+
+
+def test_upgrade_merges_the_titles_of_a_film(make_app, tmp_path):
+    path = tmp_path / 'v7.db'
+    build_database(path, 7, (
+        "INSERT INTO users (id, name) VALUES (1, 'Ada'), (2, 'Grace')",
+        "INSERT INTO titles (id, title_key, name, director, year, rating, enrichment_status, imdb_id) VALUES "
+        "(1, 'brazil', 'Brazil', '', 0, 0, 'pending', NULL), (2, 'brazil', 'brazil', '', 0, 0, 'pending', NULL), "
+        "(3, 'heat', 'Heat', 'Michael Mann', 1995, 8.3, 'complete', NULL), "
+        "(4, 'heat', 'Heat', 'Michael Mann', 1995, 7.0, 'complete', 'tt0113277')",
+        "INSERT INTO movies (id, user_id, title_id) VALUES (1, 1, 1), (2, 2, 2), (3, 1, 3), (4, 2, 4)",
+        "INSERT INTO enrichment_jobs (id, title_id, title, status, attempts, next_attempt_at) "
+        "VALUES (1, 1, 'Brazil', 'queued', 0, 0), (2, 2, 'brazil', 'queued', 0, 0)",
+    ))
+
+    make_app(path)
+
+    conn = sqlite3.connect(path)
+    assert conn.execute('SELECT id, imdb_id FROM titles ORDER BY id').fetchall() == [(1, None), (3, 'tt0113277')]
+    assert conn.execute('SELECT id, title_id, name, rating FROM movies ORDER BY id').fetchall() == [
+        (1, 1, None, None), (2, 1, 'brazil', None), (3, 3, None, None), (4, 3, None, 7.0)
+    ]
+    assert conn.execute('SELECT id, title_id FROM enrichment_jobs').fetchall() == [(1, 1)]
+
+
+def test_upgrade_indexes_the_details_users_gave(make_app, tmp_path):
+    path = tmp_path / 'v8.db'
+    build_database(path, 8, (
+        "INSERT INTO users (id, name) VALUES (1, 'Ada'), (2, 'Grace')",
+        "INSERT INTO titles (id, title_key, name, director, year, rating, enrichment_status) "
+        "VALUES (1, 'heat', 'Heat', 'Michael Mann', 1995, 8.3, 'complete')",
+        "INSERT INTO movies (id, user_id, title_id, name, director) VALUES (1, 1, 1, 'HEAT', 'M. Mann'), "
+        "(2, 2, 1, NULL, NULL)",
+    ))
+
+    app = make_app(path)
+
+    with app.app_context():
+        results, _ = app.data_manager.search('m mann')
+        assert [(result['id'], result['name']) for result in results if result['director'] == 'M. Mann'] == \
+               [(1, 'HEAT')]
+        results, _ = app.data_manager.search('michael')
+        assert [result['id'] for result in results] == [2]
@@ -0,0 +1,154 @@
+import pytest
+from sqlalchemy import create_engine
+from app.migrations import add_omdb_cache_table
+from app.omdb.breaker import CircuitBreaker
+from app.omdb.cache import OMDbCacheStore
+from app.omdb.client import OMDbClient, OMDbError, MovieNotFoundError, OMDbUnavailableError
+from benchmarks.omdb_stub import OMDbStub
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self.payload
+
+
+class FakeSession:
+    """
+    Answers every request with the next of a list of responses, the last one repeated.
+    """
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = 0
+
+    def get(self, url, params=None, timeout=None):
+        self.requests += 1
+        return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+
+@pytest.fixture
+def stub():
+    stub = OMDbStub().start()
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def store(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'omdb.db'}")
+    with engine.begin() as conn:
+        add_omdb_cache_table(conn)
+    yield OMDbCacheStore(engine)
+    engine.dispose()
+
+
+def make_client(session=None, **kwargs):
+    client = OMDbClient('test', max_retries=0, backoff=0, **kwargs)
+    if session is not None:
+        client._session = session
+    return client
+
+
+def test_hits_are_cached(stub, store):
+    client = make_client(base_url=stub.url, store=store)
+
+    first = client.lookup('The Matrix')
+    assert client.lookup('  the matrix ') == first
+    assert stub.requests == 1
+
+    # A new process finds the answer in the persistent store
+    assert make_client(base_url=stub.url, store=store).lookup('The Matrix') == first
+    assert stub.requests == 1
+
+
+def test_not_found_is_cached(stub, store):
+    client = make_client(base_url=stub.url, store=store)
+
+    for _ in range(2):
+        with pytest.raises(MovieNotFoundError):
+            client.lookup('Unknown Film')
+    assert stub.requests == 1
+    assert store.get('unknown film')[0]['Error'] == 'Movie not found!'
+
+
+@pytest.mark.parametrize('answer', [
+    FakeResponse({'Response': 'False', 'Error': 'Invalid API key!'}),
+    FakeResponse({'Response': 'False', 'Error': 'Request limit reached!'}),
+    FakeResponse({'Response': 'False', 'Error': 'Invalid API key!'}, status_code=401),
+    FakeResponse({'Response': 'False', 'Error': 'Something went wrong.'}),
+])
+def test_other_errors_are_not_cached(answer, store):
+    session = FakeSession(answer, FakeResponse({'Response': 'True', 'Title': 'Heat'}))
+    client = make_client(session, store=store)
+
+    with pytest.raises(OMDbError) as raised:
+        client.lookup('Heat')
+
+    assert not isinstance(raised.value, MovieNotFoundError)
+    assert store.get('heat') is None
+    assert client.lookup('Heat')['Title'] == 'Heat'
+    assert session.requests == 2
+
+
+def test_stored_errors_are_ignored(store):
+    store.set('heat', {'Response': 'False', 'Error': 'Request limit reached!'}, 3600)
+    client = make_client(FakeSession(FakeResponse({'Response': 'True', 'Title': 'Heat'})), store=store)
+
+    assert client.lookup('Heat')['Title'] == 'Heat'
+
+
+def test_transient_errors_are_retried():
+    session = FakeSession(FakeResponse({}, status_code=503), FakeResponse({'Response': 'True', 'Title': 'Heat'}))
+    client = OMDbClient('test', max_retries=1, backoff=0)
+    client._session = session
+
+    assert client.lookup('Heat')['Title'] == 'Heat'
+    assert session.requests == 2
+    assert client.metrics()['calls']['retried'] == 1
+
+
+def test_breaker_opens_after_failures():
+    now = [0.0]
+    session = FakeSession(FakeResponse({'Response': 'False', 'Error': 'Request limit reached!'}),
+                          FakeResponse({'Response': 'True', 'Title': 'Heat'}))
+    client = make_client(session, breaker=CircuitBreaker(failure_threshold=1, reset_timeout=10,
+                                                         timer=lambda: now[0]))
+
+    with pytest.raises(OMDbError):
+        client.lookup('Heat')
+    with pytest.raises(OMDbUnavailableError):
+        client.lookup('Heat')
+    assert session.requests == 1
+    assert client.metrics()['breaker']['state'] == 'open'
+
+    now[0] = 11.0
+    assert client.lookup('Heat')['Title'] == 'Heat'
+    assert client.metrics()['breaker']['state'] == 'closed'
+
+
+def test_half_open_breaker_lets_one_trial_through():
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, timer=lambda: now[0])
+
+    breaker.record_failure()
+    assert breaker.state == 'closed' and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open' and not breaker.allow()
+
+    now[0] = 10.0
+    assert breaker.state == 'half_open'
+    assert breaker.allow() and not breaker.allow()
+
+    # A failed trial re-opens the breaker for another reset_timeout
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    now[0] = 19.0
+    assert not breaker.allow()
+    now[0] = 20.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.failures == 0 and breaker.allow()
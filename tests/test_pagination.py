@@ -0,0 +1,88 @@
+import re
+import pytest
+from sqlalchemy import event
+from app import db
+
+
+@pytest.fixture
+def seeded(make_app):
+    app = make_app(FRAGMENT_CACHE_ENABLED=False)
+    with app.app_context():
+        user_id = app.data_manager.add_user('Ada')
+        app.data_manager.add_movies(user_id, [{'name': f'Film {number}', 'director': 'Someone', 'year': 2000,
+                                               'rating': 5.0} for number in range(45)])
+    return app, user_id
+
+
+def record_statements(app):
+    statements = []
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement.lower()))
+    return statements
+
+
+def page_links(html):
+    return re.findall(r'class="page-link" href="([^"]+)"', html.replace('&amp;', '&'))
+
+
+def test_pages_link_to_their_neighbours_with_cursors(seeded):
+    app, user_id = seeded
+    client = app.test_client()
+
+    first = client.get(f'/users/{user_id}').get_data(as_text=True)
+    links = page_links(first)
+    assert len(links) == 1 and 'after=' in links[0] and 'page=2' in links[0]
+
+    second = client.get(links[0]).get_data(as_text=True)
+    assert 'Film 20' in second and 'Film 19' not in second and 'Film 40' not in second
+    first_link, prev_link, next_link = page_links(second)
+    assert 'after=' not in first_link and 'before=' not in first_link
+    assert 'before=' in prev_link and 'after=' in next_link
+
+    back = client.get(prev_link).get_data(as_text=True)
+    assert 'Film 0' in back and 'Film 20' not in back
+
+
+def test_cursor_pages_run_no_count(seeded):
+    app, user_id = seeded
+    statements = record_statements(app)
+
+    response = app.test_client().get(f'/users/{user_id}?after=20&page=2')
+
+    assert response.status_code == 200
+    assert '<span class="page-link">2 of 3</span>' in response.get_data(as_text=True)
+    assert [statement for statement in statements if 'movies.id > ?' in statement]
+    assert not [statement for statement in statements if 'count(' in statement]
+
+
+def test_bare_page_numbers_are_capped(seeded):
+    app, user_id = seeded
+    statements = record_statements(app)
+
+    response = app.test_client().get(f'/users/{user_id}?per_page=1&page=1000000')
+
+    assert response.status_code == 200
+    assert 'Film 9<' in response.get_data(as_text=True)
+    assert [statement for statement in statements if 'offset' in statement]
+    assert not [statement for statement in statements if 'count(' in statement]
+
+
+def test_api_total_comes_from_the_statistics(seeded):
+    app, user_id = seeded
+    client = app.test_client()
+    statements = record_statements(app)
+
+    first = client.get(f'/api/users/{user_id}/movies?per_page=20').get_json()
+    assert first['total'] == 45 and len(first['items']) == 20
+
+    second = client.get(f"/api/users/{user_id}/movies?per_page=20&after={first['next_cursor']}").get_json()
+    assert second['total'] == 45 and second['items'][0]['name'] == 'Film 20'
+    assert not [statement for statement in statements if 'count(' in statement]
+
+    with app.app_context():
+        movie_id = second['items'][0]['id']
+        app.data_manager.delete_movie(user_id, movie_id)
+        app.data_manager.add_movie(user_id, 'Film 45', 'Someone', 2000, 5.0)
+        app.data_manager.add_movie(user_id, 'Film 46', 'Someone', 2000, 5.0)
+    assert client.get(f'/api/users/{user_id}/movies').get_json()['total'] == 46
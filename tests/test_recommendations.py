@@ -0,0 +1,60 @@
+import pytest
+from app.recommendations import RatingMatrix, RecommendationRefresher
+
+
+def test_users_are_compared_on_the_titles_they_share():
+    # Titles 1 and 2 are both named 'Heat': the 1995 film and its 1986 namesake
+    matrix = RatingMatrix.from_ratings([
+        (1, 1, 'Heat', 8.0), (1, 3, 'Alien', 6.0),
+        (2, 1, 'heat', 8.0), (2, 3, 'Alien', 6.0), (2, 4, 'Brazil', 9.0),
+        (3, 2, 'Heat', 8.0), (3, 5, 'Ran', 7.0),
+    ])
+
+    similar = matrix.similar_users(1, top_k=5)
+
+    assert [other for other, _ in similar] == [2]
+    assert similar[0][1] == pytest.approx(100 / (10 * 181 ** 0.5), abs=1e-6)
+    assert matrix.similar_users(3, top_k=5) == []
+
+
+def test_movies_are_scored_by_similarity_and_rating():
+    matrix = RatingMatrix.from_ratings([
+        (1, 1, 'Heat', 8.0),
+        (2, 1, 'Heat', 8.0), (2, 2, 'Heat', 6.0), (2, 3, 'Brazil', 0.0),
+        (3, 1, 'Heat', 8.0), (3, 2, 'heat', 10.0),
+    ])
+
+    movies = matrix.recommend_movies(1, [(2, 0.5), (3, 0.25)], limit=5)
+
+    # The user's own title is left out, but not another film of the same name
+    assert movies == [(2, 'Heat', 0.55, 2), (3, 'Brazil', 0.25, 1)]
+
+
+def test_refresher_applies_the_queue(make_app):
+    app = make_app()
+    refresher = RecommendationRefresher.from_config(app)
+    with app.app_context():
+        manager = app.data_manager
+        ada, grace = manager.add_user('Ada'), manager.add_user('Grace')
+        manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+        manager.add_movie(grace, 'Heat', 'Michael Mann', 1995, 8.3)
+        manager.add_movie(grace, 'Alien', 'Ridley Scott', 1979, 8.5)
+        assert sorted(manager.get_recommendation_queue()[0]) == [ada, grace]
+
+    assert refresher.run_once() == 2
+    with app.app_context():
+        assert manager.get_recommendation_queue()[0] == []
+        result = manager.get_recommendations(ada)
+        assert [user.name for user in result['similar_users']] == ['Grace']
+        assert [movie.name for movie in result['movies']] == ['Alien']
+        assert not result['pending']
+
+        manager.add_movie(ada, 'Alien', 'Ridley Scott', 1979, 8.5)
+        assert manager.get_recommendation_queue()[0] == [ada]
+        assert manager.get_recommendations(ada)['pending']
+
+    # Grace lists Ada as similar, so she is recomputed with her
+    assert refresher.run_once() == 2
+    assert refresher.run_once() == 0
+    with app.app_context():
+        assert manager.get_recommendations(ada)['movies'] == []
@@ -0,0 +1,23 @@
+from app.data_manager.records import MovieRecord, UserSummary, movie_record
+
+
+def test_core_pages_return_named_tuples(app):
+    with app.app_context():
+        manager = app.data_manager
+        ada, grace = manager.add_user('Ada'), manager.add_user('Grace')
+        manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+        manager.add_movies(ada, [{'name': 'Alien', 'director': 'Ridley Scott', 'year': 1979, 'rating': 8.5},
+                                 {'name': 'Ran', 'director': 'Akira Kurosawa', 'year': 1985, 'rating': 8.2}])
+
+        users = manager.get_user_summaries_page(per_page=1)
+        assert users.items == [UserSummary(ada, 'Ada', 3)] and type(users.items[0]) is UserSummary
+        assert manager.get_user_summaries_page(after=users.next_cursor).items == [UserSummary(grace, 'Grace', 0)]
+
+        movies = manager.get_user_movie_records_page(ada, per_page=2)
+        assert all(type(movie) is MovieRecord for movie in movies)
+        assert movies.items == [movie_record(movie) for movie in manager.get_user_movies_page(ada, per_page=2)]
+        assert movies.items[0] == (movies.items[0].id, ada, 'Heat', 'Michael Mann', 1995, 8.3, 'complete')
+
+        recent = manager.get_recent_movies(2)
+        assert all(type(movie) is MovieRecord for movie in recent)
+        assert [movie.name for movie in recent] == ['Ran', 'Alien']
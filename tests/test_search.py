@@ -0,0 +1,110 @@
+import sqlite3
+from app.data_manager.pagination import encode_cursor
+
+
+def search(client, query, kind='movies', **params):
+    return client.get('/api/search', query_string=dict(params, q=query, type=kind)).get_json()
+
+
+def names(body):
+    return [result['name'] for result in body['results']]
+
+
+def test_words_match_as_prefixes(client, app):
+    with app.app_context():
+        ada = app.data_manager.add_user('Ada')
+        app.data_manager.add_movie(ada, 'The Godfather', 'Francis Ford Coppola', 1972, 9.2)
+        app.data_manager.add_movie(ada, 'Amélie', 'Jean-Pierre Jeunet', 2001, 8.3)
+
+    assert names(search(client, 'godf')) == ['The Godfather']
+    assert names(search(client, 'fran copp')) == ['The Godfather']
+    assert names(search(client, 'amelie')) == ['Amélie']
+    assert search(client, '!!')['results'] == []
+
+
+def test_name_matches_rank_above_director_matches(client, app):
+    with app.app_context():
+        ada = app.data_manager.add_user('Ada')
+        app.data_manager.add_movie(ada, 'Heat', 'Scott Hicks', 1995, 7.0)
+        app.data_manager.add_movie(ada, 'Scott Pilgrim', 'Edgar Wright', 2010, 7.5)
+
+    assert names(search(client, 'scott')) == ['Scott Pilgrim', 'Heat']
+
+
+def test_index_follows_writes(client, app):
+    with app.app_context():
+        manager = app.data_manager
+        ada = manager.add_user('Ada')
+        movie_id = manager.add_movie(ada, 'Solaris', 'Andrei Tarkovsky', 1972, 8.1)
+        assert names(search(client, 'solaris')) == ['Solaris']
+
+        # A new year moves the movie to another title, and the old one leaves the index
+        manager.update_movie(ada, movie_id, name='Stalker', year=1979)
+        assert search(client, 'solaris')['results'] == []
+        assert names(search(client, 'stalker')) == ['Stalker']
+
+        manager.delete_movie(ada, movie_id)
+        assert search(client, 'stalker')['results'] == []
+
+
+def test_users_are_searched_by_name(client, app):
+    with app.app_context():
+        for name in ('Grace Hopper', 'Ada Lovelace', 'Alan Turing'):
+            app.data_manager.add_user(name)
+
+    assert names(search(client, 'a', kind='users')) == ['Ada Lovelace', 'Alan Turing']
+    assert names(search(client, 'hop', kind='users')) == ['Grace Hopper']
+
+
+def test_fts_index_matches_the_titles_table(app, tmp_path):
+    with app.app_context():
+        ada = app.data_manager.add_user('Ada')
+        app.data_manager.add_movies(ada, [{'name': f'Film {number}', 'director': 'Someone', 'year': 2000,
+                                           'rating': 5.0} for number in range(10)])
+
+    conn = sqlite3.connect(tmp_path / 'test.db')
+    try:
+        conn.execute("INSERT INTO titles_fts (titles_fts) VALUES ('integrity-check')")
+        assert conn.execute("SELECT COUNT(*) FROM titles_fts WHERE titles_fts MATCH 'film'").fetchone() == (10,)
+    finally:
+        conn.close()
+
+
+def test_cursor_fetches_the_following_results(client, app):
+    with app.app_context():
+        ada = app.data_manager.add_user('Ada')
+        app.data_manager.add_movies(ada, [{'name': f'Night {number}', 'director': 'Someone', 'year': 2000,
+                                           'rating': 5.0} for number in range(5)])
+
+    first = search(client, 'night', limit=3)
+    second = search(client, 'night', limit=3, cursor=first['next_cursor'])
+
+    assert len(first['results']) == 3 and len(second['results']) == 2
+    assert second['next_cursor'] is None
+    assert set(names(first)).isdisjoint(names(second))
+    assert client.get('/api/search?q=night&cursor=' + encode_cursor(['x'])).status_code == 400
+
+
+def test_movies_are_found_by_the_details_their_user_gave(client, app, tmp_path):
+    with app.app_context():
+        manager = app.data_manager
+        ada, grace = manager.add_user('Ada'), manager.add_user('Grace')
+        movie_id = manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+        manager.add_movie(grace, 'Heat', 'Michael Mann', 1995, 8.3)
+
+        manager.update_movie(ada, movie_id, name='HEAT', director='M. Mann')
+        assert [(result['user_id'], result['name'], result['director']) for result in search(client, 'm mann')
+                ['results'] if result['user_id'] == ada] == [(ada, 'HEAT', 'M. Mann')]
+        assert [result['user_id'] for result in search(client, 'michael')['results']] == [grace]
+        assert sorted(result['user_id'] for result in search(client, 'heat')['results']) == [ada, grace]
+
+        # A new director on the title shows through a movie overriding only the name
+        manager.update_movie(ada, movie_id, director='Michael Mann')
+        conn = sqlite3.connect(tmp_path / 'test.db')
+        with conn:
+            conn.execute("UPDATE titles SET director = 'Michael Kenneth Mann'")
+        conn.close()
+        assert sorted(result['user_id'] for result in search(client, 'kenneth heat')['results']) == [ada, grace]
+
+        manager.delete_movie(ada, movie_id)
+        assert [result['user_id'] for result in search(client, 'heat')['results']] == [grace]
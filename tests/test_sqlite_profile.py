@@ -0,0 +1,23 @@
+from app import db
+
+
+def read_pragmas(app, *names):
+    with app.app_context():
+        db.engine.dispose()
+        with db.engine.connect() as conn:
+            return {name: conn.exec_driver_sql(f'PRAGMA {name}').scalar() for name in names}
+
+
+def test_new_connections_get_the_pragmas(app):
+    pragmas = read_pragmas(app, 'journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'temp_store')
+
+    assert pragmas == {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000, 'cache_size': -20000,
+                       'temp_store': 2}
+
+
+def test_configured_pragmas_override_the_defaults(make_app):
+    app = make_app(SQLITE_PRAGMAS={'cache_size': -4000, 'temp_store': None})
+
+    pragmas = read_pragmas(app, 'cache_size', 'temp_store', 'synchronous')
+
+    assert pragmas == {'cache_size': -4000, 'temp_store': 0, 'synchronous': 1}
@@ -0,0 +1,65 @@
+import sqlite3
+
+
+def counted(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {
+            'total_users': conn.execute('SELECT COUNT(*) FROM users').fetchone()[0],
+            'total_movies': conn.execute('SELECT COUNT(*) FROM movies').fetchone()[0],
+            'movies_in_year': conn.execute(
+                'SELECT COUNT(*) FROM movies m JOIN titles t ON t.id = m.title_id WHERE t.year = 1995'
+            ).fetchone()[0]
+        }
+    finally:
+        conn.close()
+
+
+def stored(path):
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute('SELECT name, value FROM statistics WHERE value != 0'))
+    finally:
+        conn.close()
+
+
+def test_statistics_follow_every_write(app, tmp_path):
+    path = tmp_path / 'test.db'
+    with app.app_context():
+        manager = app.data_manager
+        ada, grace = manager.add_user('Ada'), manager.add_user('Grace')
+        heat = manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+        manager.add_movies(grace, [{'name': 'Heat', 'director': 'Michael Mann', 'year': 1995, 'rating': 8.3},
+                                   {'name': 'Alien', 'director': 'Ridley Scott', 'year': 1979, 'rating': 8.5}])
+        assert manager.get_statistics(1995) == counted(path) == {'total_users': 2, 'total_movies': 3,
+                                                                 'movies_in_year': 2}
+
+        manager.update_movie(ada, heat, year=1979)
+        assert manager.get_statistics(1995) == counted(path)
+
+        manager.apply_movie_changes(grace, create=[{'name': 'Ran', 'director': 'Akira Kurosawa', 'year': 1995,
+                                                    'rating': 8.2}], delete=[heat + 1])
+        manager.delete_movie(ada, heat)
+        assert manager.get_statistics(1995) == counted(path) == {'total_users': 2, 'total_movies': 2,
+                                                                 'movies_in_year': 1}
+        assert stored(path)[f'user_movies:{grace}'] == 2
+
+
+def test_rebuild_repairs_drift(app, tmp_path):
+    path = tmp_path / 'test.db'
+    with app.app_context():
+        manager = app.data_manager
+        ada = manager.add_user('Ada')
+        manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+        manager.add_movie(ada, 'Alien', 'Ridley Scott', 1979, 8.5)
+        expected = stored(path)
+
+        conn = sqlite3.connect(path)
+        conn.execute("DELETE FROM statistics WHERE name = 'movies_year:1979'")
+        conn.execute("UPDATE statistics SET value = 42 WHERE name = 'total_movies'")
+        conn.commit()
+        conn.close()
+
+        manager.rebuild_statistics()
+        assert stored(path) == expected
+        assert manager.get_statistics(1995) == counted(path)
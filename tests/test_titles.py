@@ -0,0 +1,119 @@
+import sqlite3
+from sqlalchemy import event
+from app import db
+from test_migrations import build_database
+
+
+def count_titles(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM titles').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def movie_details(movie):
+    return movie.name, movie.director, movie.year, movie.rating
+
+
+def test_users_share_a_title_and_keep_their_own_details(app, tmp_path):
+    with app.app_context():
+        manager = app.data_manager
+        ada, grace = manager.add_user('Ada'), manager.add_user('Grace')
+        first = manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+        second = manager.add_movie(grace, 'heat', 'M. Mann', 1995, 9.0)
+
+        assert count_titles(tmp_path / 'test.db') == 1
+        assert movie_details(manager.get_movie_by_id(first)) == ('Heat', 'Michael Mann', 1995, 8.3)
+        assert movie_details(manager.get_movie_by_id(second)) == ('heat', 'M. Mann', 1995, 9.0)
+        records = manager.get_user_movie_records_page(grace).items
+        assert [movie_details(record) for record in records] == [('heat', 'M. Mann', 1995, 9.0)]
+
+
+def test_editing_details_keeps_the_title(app, tmp_path):
+    with app.app_context():
+        manager = app.data_manager
+        ada, grace = manager.add_user('Ada'), manager.add_user('Grace')
+        first = manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+        second = manager.add_movie(grace, 'Heat', 'Michael Mann', 1995, 8.3)
+
+        assert manager.update_movie(grace, second, rating=6.0, director='Mann')
+
+        assert count_titles(tmp_path / 'test.db') == 1
+        assert movie_details(manager.get_movie_by_id(first)) == ('Heat', 'Michael Mann', 1995, 8.3)
+        assert movie_details(manager.get_movie_by_id(second)) == ('Heat', 'Mann', 1995, 6.0)
+
+
+def test_editing_details_is_one_conditional_update(app, tmp_path):
+    with app.app_context():
+        manager = app.data_manager
+        ada, grace = manager.add_user('Ada'), manager.add_user('Grace')
+        movie_id = manager.add_movie(ada, 'Heat', 'Michael Mann', 1995, 8.3)
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement.lower()))
+
+        assert manager.update_movie(ada, movie_id, name='HEAT', rating=9.0, year=1995)
+        movie_statements = [statement for statement in statements if 'movies' in statement.split('where')[0]]
+        assert len(movie_statements) == 1 and movie_statements[0].startswith('update movies')
+
+        assert not manager.update_movie(grace, movie_id, rating=1.0)
+        assert manager.update_movie(ada, movie_id, rating=8.3)
+
+    conn = sqlite3.connect(tmp_path / 'test.db')
+    try:
+        assert conn.execute('SELECT name, director, rating FROM movies').fetchall() == [('HEAT', None, None)]
+    finally:
+        conn.close()
+
+
+def test_editing_the_year_moves_to_another_title(app, tmp_path):
+    with app.app_context():
+        manager = app.data_manager
+        ada = manager.add_user('Ada')
+        movie_id = manager.add_movie(ada, 'Solaris', 'Andrei Tarkovsky', 1972, 8.1)
+        manager.update_movie(ada, movie_id, rating=7.5)
+
+        assert manager.update_movie(ada, movie_id, year=2002, director='Steven Soderbergh')
+
+        assert count_titles(tmp_path / 'test.db') == 1
+        assert movie_details(manager.get_movie_by_id(movie_id)) == ('Solaris', 'Steven Soderbergh', 2002, 7.5)
+        assert manager.get_statistics(1972)['movies_in_year'] == 0
+        assert manager.get_statistics(2002)['movies_in_year'] == 1
+
+
+def test_enrichment_merges_into_an_existing_title(app, tmp_path):
+    with app.app_context():
+        manager = app.data_manager
+        ada, grace = manager.add_user('Ada'), manager.add_user('Grace')
+        known = manager.add_movie(ada, 'Alien', 'Ridley Scott', 1979, 8.0)
+        pending = manager.add_pending_movie(grace, 'Alien')
+        job, = manager.claim_enrichment_jobs()
+
+        affected = manager.complete_enrichment(job['id'], 'Ridley Scott', 1979, 8.5, imdb_id='tt0078748')
+
+        assert affected == [(grace, pending)]
+        assert count_titles(tmp_path / 'test.db') == 1
+        assert movie_details(manager.get_movie_by_id(known)) == ('Alien', 'Ridley Scott', 1979, 8.0)
+        assert movie_details(manager.get_movie_by_id(pending)) == ('Alien', 'Ridley Scott', 1979, 8.5)
+        assert manager.get_movie_by_id(pending).enrichment_status == 'complete'
+        assert manager.get_statistics(1979)['movies_in_year'] == 2
+
+
+def test_upgrade_keeps_each_users_details(make_app, tmp_path):
+    path = tmp_path / 'v0.db'
+    build_database(path, 0, (
+        "INSERT INTO users (id, name) VALUES (1, 'Ada'), (2, 'Grace')",
+        "INSERT INTO movies (id, user_id, name, director, year, rating) VALUES "
+        "(1, 1, 'Heat', 'Michael Mann', 1995, 8.3), (2, 2, 'HEAT', 'Mann', 1995, 7.0), "
+        "(3, 2, 'Heat', 'Michael Mann', 1986, 6.0)",
+    ))
+
+    app = make_app(path)
+
+    assert count_titles(path) == 2
+    with app.app_context():
+        movies = sorted(app.data_manager.iter_movies())
+        assert [movie_details(movie) for movie in movies] == [
+            ('Heat', 'Michael Mann', 1995, 8.3), ('HEAT', 'Mann', 1995, 7.0), ('Heat', 'Michael Mann', 1986, 6.0)
+        ]